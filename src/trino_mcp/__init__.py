@@ -10,4 +10,21 @@ from .client import TrinoClient
 from .config import TrinoConfig, load_config
 from .utils import is_read_only_query
 
-__all__ = ["TrinoClient", "TrinoConfig", "load_config", "is_read_only_query", "__version__"]
+__all__ = [
+    "AsyncTrinoClient",
+    "TrinoClient",
+    "TrinoConfig",
+    "load_config",
+    "is_read_only_query",
+    "__version__",
+]
+
+
+def __getattr__(name):
+    # AsyncTrinoClient pulls in httpx, which the server only needs with
+    # ASYNC_CLIENT enabled, so it is imported on first access.
+    if name == "AsyncTrinoClient":
+        from .async_client import AsyncTrinoClient
+
+        return AsyncTrinoClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
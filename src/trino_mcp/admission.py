@@ -0,0 +1,313 @@
+"""Admission queue that makes tool calls wait for a free query slot."""
+
+import asyncio
+import bisect
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, Hashable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUEUE_ORDERINGS = ("fifo", "priority")
+
+# Tool calls are admitted per class, each with its own slots and queue, so
+# a long export never holds up metadata lookups.
+CONCURRENCY_CLASSES = ("metadata", "read", "write", "export")
+
+
+class AdmissionError(Exception):
+    """Raised when a call cannot be given a query slot."""
+
+
+class QueueFullError(AdmissionError):
+    """Raised when the queue already holds ``max_depth`` waiting calls."""
+
+    def __init__(self, message: str, depth: int):
+        super().__init__(message)
+        self.depth = depth
+
+
+class QueueTimeoutError(AdmissionError):
+    """Raised when no slot became free within ``max_wait_seconds``."""
+
+    def __init__(self, message: str, position: int, waited: float):
+        super().__init__(message)
+        self.position = position
+        self.waited = waited
+
+
+class RateLimitError(AdmissionError):
+    """Raised when a session calls tools faster than its rate limit."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Slot:
+    """A granted query slot. Leaving the ``async with`` block releases it."""
+
+    def __init__(self, queue: "AdmissionQueue", session: Hashable):
+        self._queue = queue
+        self._session = session
+        self._released = False
+
+    async def __aenter__(self) -> "Slot":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        self.release()
+
+    def release(self) -> None:
+        """Give the slot back. Safe to call more than once."""
+        if not self._released:
+            self._released = True
+            self._queue._release(self._session)
+
+
+class _Session:
+    """Admission state of one session. ``waiters`` are ordered next first."""
+
+    __slots__ = ("waiters", "held", "vtime", "weight")
+
+    def __init__(self, vtime: float):
+        self.waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self.held = 0
+        self.vtime = vtime
+        self.weight = 1.0
+
+
+class AdmissionQueue:
+    """Bounded, per-session fair wait queue in front of ``slots`` concurrent query slots.
+
+    A call that finds every slot taken waits in line instead of being
+    rejected, up to ``max_wait_seconds``; at most ``max_depth`` calls may
+    wait at once. A freed slot is handed straight to a waiting call, so a
+    newly arriving call never overtakes the queue.
+
+    Calls are grouped by session (e.g. one MCP client connection). Slots
+    are shared between waiting sessions by weighted fair queuing: each
+    admission advances its session's virtual time by ``1 / weight``, and
+    the next slot goes to the waiting session that is furthest behind, so
+    one chatty session cannot starve the others. A session that was idle
+    rejoins at the current virtual time rather than with saved-up credit.
+    With ``session_max_concurrent`` a session never holds more slots than
+    that, even when others are free.
+
+    Within a session calls are admitted in arrival order, or with
+    ``ordering="priority"`` lowest priority value first (arrival order
+    among equals).
+
+    With ``max_depth`` or ``max_wait_seconds`` of 0 calls are rejected
+    as soon as they cannot be admitted. ``name`` describes the slots in
+    error messages, e.g. ``"read query"``.
+
+    The queue is not thread-safe; use it from the event loop only.
+    """
+
+    def __init__(
+        self,
+        slots: int,
+        max_depth: int = 0,
+        max_wait_seconds: float = 0,
+        ordering: str = "fifo",
+        name: str = "query",
+        session_max_concurrent: int = 0,
+    ):
+        if ordering not in QUEUE_ORDERINGS:
+            raise ValueError(f"Unsupported queue ordering: {ordering}")
+        self.name = name
+        self.slots = max(slots, 1)
+        self.max_depth = max_depth
+        self.max_wait_seconds = max_wait_seconds
+        self.ordering = ordering
+        self.session_max_concurrent = session_max_concurrent
+        self._free = self.slots
+        self._depth = 0
+        self._sessions: Dict[Hashable, _Session] = {}
+        # Virtual time of the most recent admission.
+        self._vclock = 0.0
+        self._arrivals = itertools.count()
+
+    @property
+    def depth(self) -> int:
+        """Number of calls waiting for a slot."""
+        return self._depth
+
+    @property
+    def in_use(self) -> int:
+        """Number of slots currently held."""
+        return self.slots - self._free
+
+    def locked(self, session: Hashable = None) -> bool:
+        """Whether a new call from *session* would have to wait."""
+        state = self._sessions.get(session)
+        return self._free == 0 or (state is not None and self._at_limit(state))
+
+    def _at_limit(self, state: _Session) -> bool:
+        return 0 < self.session_max_concurrent <= state.held
+
+    def _session(self, session: Hashable, weight: float) -> _Session:
+        state = self._sessions.get(session)
+        if state is None:
+            # Sessions (re)join at the current virtual time, so one that was
+            # idle gets no credit for the time it did not compete.
+            state = self._sessions[session] = _Session(self._vclock)
+        state.weight = max(weight, 1e-3)
+        return state
+
+    def _forget_if_idle(self, session: Hashable) -> None:
+        state = self._sessions.get(session)
+        if state is not None and not state.waiters and not state.held:
+            del self._sessions[session]
+
+    async def acquire(
+        self, priority: int = 0, session: Hashable = None, weight: float = 1.0
+    ) -> Slot:
+        """Wait for a free slot for *session* and return it.
+
+        Args:
+            priority: Order among the session's waiting calls with
+                ``ordering="priority"``; lower goes first.
+            session: Key of the calling session; ``None`` for a single
+                anonymous session.
+            weight: The session's share of the slots relative to others.
+
+        Raises:
+            QueueFullError: If ``max_depth`` calls are already waiting.
+            QueueTimeoutError: If no slot became free in ``max_wait_seconds``.
+        """
+        state = self._session(session, weight)
+        if self._free > 0 and not self._at_limit(state):
+            self._grant(state)
+            return Slot(self, session)
+        if self.max_wait_seconds <= 0 or self._depth >= self.max_depth:
+            held = state.held
+            self._forget_if_idle(session)
+            if self._free > 0:
+                message = (
+                    f"This session already holds {held} concurrent {self.name} slot(s), "
+                    "its limit."
+                )
+            else:
+                message = (
+                    f"All {self.slots} concurrent {self.name} slot(s) are in use and "
+                    f"{self._depth} call(s) are already waiting."
+                )
+            raise QueueFullError(message, self._depth)
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority if self.ordering == "priority" else 0, next(self._arrivals), future)
+        bisect.insort(state.waiters, entry)
+        self._depth += 1
+        logger.info(
+            "No %s slot free; queued at position %d of this session's %d (%d waiting in total)",
+            self.name,
+            state.waiters.index(entry) + 1,
+            len(state.waiters),
+            self._depth,
+        )
+        started = time.monotonic()
+        try:
+            await asyncio.wait({future}, timeout=self.max_wait_seconds)
+        except BaseException:
+            self._leave(session, entry)
+            raise
+        if future.done():
+            return Slot(self, session)
+
+        position = state.waiters.index(entry) + 1
+        waiting = len(state.waiters)
+        self._leave(session, entry)
+        raise QueueTimeoutError(
+            f"No {self.name} slot became free within {self.max_wait_seconds:g} second(s); "
+            f"the call was still at position {position} of {waiting} in this session's queue "
+            f"({self._depth + 1} call(s) waiting in total).",
+            position,
+            time.monotonic() - started,
+        )
+
+    def _grant(self, state: _Session) -> None:
+        """Give *state* a slot and advance its virtual time."""
+        self._free -= 1
+        state.held += 1
+        self._vclock = max(self._vclock, state.vtime)
+        state.vtime += 1 / state.weight
+
+    def _leave(self, session: Hashable, entry: Tuple[int, int, asyncio.Future]) -> None:
+        """Withdraw a waiting call, passing on a slot it was granted meanwhile."""
+        future = entry[2]
+        if future.done() and not future.cancelled():
+            self._release(session)
+            return
+        future.cancel()
+        self._sessions[session].waiters.remove(entry)
+        self._depth -= 1
+        self._forget_if_idle(session)
+
+    def _release(self, session: Hashable) -> None:
+        """Return a slot held by *session* and hand free slots to waiting sessions."""
+        self._free += 1
+        self._sessions[session].held -= 1
+        self._dispatch()
+        self._forget_if_idle(session)
+
+    def _dispatch(self) -> None:
+        """Admit waiting calls while slots are free, furthest-behind session first."""
+        while self._free > 0:
+            eligible = [
+                (state.vtime, key)
+                for key, state in self._sessions.items()
+                if state.waiters and not self._at_limit(state)
+            ]
+            if not eligible:
+                return
+            key = min(eligible, key=lambda item: item[0])[1]
+            state = self._sessions[key]
+            _, _, future = state.waiters.pop(0)
+            self._depth -= 1
+            self._grant(state)
+            future.set_result(None)
+
+
+class RateLimiter:
+    """Token-bucket rate limit per session.
+
+    Each session may make ``burst`` calls at once and ``rate`` calls per
+    second on average. Buckets that have refilled completely are dropped
+    once many sessions have been seen, so idle sessions cost nothing.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        # session -> (tokens, time.monotonic() of last update)
+        self._buckets: Dict[Hashable, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, session: Hashable = None) -> float:
+        """Take a token for *session*.
+
+        Returns:
+            0 if the call may proceed, otherwise the seconds until a token
+            becomes available.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if len(self._buckets) > 1024:
+                self._prune(now)
+            tokens, updated = self._buckets.get(session, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens < 1:
+                self._buckets[session] = (tokens, now)
+                return (1 - tokens) / self.rate
+            self._buckets[session] = (tokens - 1, now)
+            return 0.0
+
+    def _prune(self, now: float) -> None:
+        """Drop buckets that are full again. Caller holds the lock."""
+        for session, (tokens, updated) in list(self._buckets.items()):
+            if tokens + (now - updated) * self.rate >= self.burst:
+                del self._buckets[session]
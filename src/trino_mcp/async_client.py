@@ -0,0 +1,436 @@
+"""Asyncio Trino client speaking the REST statement protocol directly."""
+
+import asyncio
+import json
+import logging
+import urllib.parse
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+import httpx
+import requests
+import trino
+import trino.auth
+from trino import constants, exceptions
+from trino.client import TrinoRequest
+from trino.dbapi import ColumnDescription
+from trino.mapper import RowMapperFactory
+
+from .cache import MetadataCache
+from .client import _NO_OUTPUT_STATUS, TrinoClient, watermark_query
+from .config import TrinoConfig
+from .snapshot import SchemaSnapshot, snapshot_query
+from .spool import RowSpool
+from .utils import limit_query
+
+logger = logging.getLogger(__name__)
+
+
+# Attempts per HTTP request when Trino answers 429/502/503/504 or, for
+# nextUri polls, when the connection drops. Mirrors trino's own default.
+_MAX_ATTEMPTS = 3
+_RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+
+class _RequestsAuth(httpx.Auth):
+    """Apply a ``requests`` auth callable (as installed by trino auth) to httpx.
+
+    trino's ``Authentication.set_http_session()`` puts a ``requests``
+    ``AuthBase`` on the session; this replays it on an equivalent prepared
+    request for every outgoing httpx request and copies the headers it set.
+    The callable runs on the event loop, which is fine for static
+    credentials and for token credentials that cache their tokens.
+    """
+
+    def __init__(self, auth: Any):
+        self._auth = auth
+
+    def auth_flow(self, request: httpx.Request):
+        prepared = requests.Request(
+            request.method, str(request.url), headers=dict(request.headers)
+        ).prepare()
+        prepared = self._auth(prepared)
+        for name, value in prepared.headers.items():
+            if request.headers.get(name) != value:
+                request.headers[name] = value
+        yield request
+
+
+class AsyncTrinoClient:
+    """Asyncio counterpart of :class:`TrinoClient` for reading results.
+
+    Queries are submitted to ``/v1/statement`` and their ``nextUri`` pages
+    polled on a shared ``httpx.AsyncClient``, so an in-flight query costs a
+    coroutine rather than a thread and one event loop can drive hundreds of
+    them. Queries carry the same watermark, session properties and client
+    timeout as :class:`TrinoClient`, and row values are decoded with the
+    trino client's own row mappers.
+
+    Each call is an independent, autocommit statement: session changes made
+    by ``SET SESSION`` are not carried over to later calls. OAuth2
+    authentication is not supported because its redirect flow is tied to
+    ``requests``; use :class:`TrinoClient` for it.
+    """
+
+    def __init__(
+        self,
+        config: TrinoConfig,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        metadata_cache: Optional[MetadataCache] = None,
+        schema_snapshot: Optional[SchemaSnapshot] = None,
+    ):
+        """Initialize the client.
+
+        Args:
+            config: Connection configuration.
+            transport: Optional httpx transport, e.g. a mock in tests.
+            metadata_cache: Optional cache for metadata lookups, typically
+                shared with a ``TrinoClient`` so both see the same entries
+                and invalidations.
+            schema_snapshot: Snapshot that answers ``describe_table()``;
+                pass a ``TrinoClient``'s to share it. A new one by default.
+        """
+        if isinstance(config.auth, trino.auth.OAuth2Authentication):
+            raise ValueError(
+                "AsyncTrinoClient does not support OAuth2 authentication; "
+                "use TrinoClient instead"
+            )
+        self.config = config
+        self.metadata_cache = metadata_cache
+        self.schema_snapshot = schema_snapshot if schema_snapshot is not None else SchemaSnapshot()
+        kwargs = dict(config.additional_kwargs or {})
+        self.base_url = f"{config.http_scheme}://{config.host}:{config.port}"
+        self._headers = self._build_headers(kwargs.get("http_headers"))
+        self.http_client = httpx.AsyncClient(
+            auth=self._build_auth(),
+            verify=kwargs.get("verify", True),
+            timeout=constants.DEFAULT_REQUEST_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=None,
+                max_keepalive_connections=config.http_pool_maxsize,
+            ),
+            transport=transport,
+        )
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client and its keep-alive sockets."""
+        await self.http_client.aclose()
+
+    async def __aenter__(self) -> "AsyncTrinoClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.aclose()
+
+    def _build_auth(self) -> Optional[httpx.Auth]:
+        """Translate the configured trino authentication into an httpx auth."""
+        if self.config.auth is None:
+            return None
+        session = requests.Session()
+        self.config.auth.set_http_session(session)
+        return _RequestsAuth(session.auth) if session.auth is not None else None
+
+    def _build_headers(self, extra_headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+        """Build the ``X-Trino-*`` headers sent with every statement."""
+        headers = {
+            constants.HEADER_USER: self.config.user,
+            constants.HEADER_SOURCE: constants.DEFAULT_SOURCE,
+            constants.HEADER_CLIENT_CAPABILITIES: constants.CLIENT_CAPABILITIES,
+            "user-agent": f"{constants.CLIENT_NAME}/{trino.__version__}",
+        }
+        if self.config.catalog:
+            headers[constants.HEADER_CATALOG] = self.config.catalog
+        if self.config.schema:
+            headers[constants.HEADER_SCHEMA] = self.config.schema
+        if self.config.session_properties:
+            headers[constants.HEADER_SESSION] = ",".join(
+                f"{name}={urllib.parse.quote(str(value))}"
+                for name, value in self.config.session_properties.items()
+            )
+        headers.update(extra_headers or {})
+        return headers
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> Dict[str, Any]:
+        """Send one protocol request and return its decoded JSON status.
+
+        Retries on Trino's transient status codes; ``nextUri`` polls are
+        also retried when the connection fails, since they are idempotent.
+
+        Raises:
+            exceptions.HttpError: For non-retryable HTTP errors.
+            exceptions.TrinoQueryError: If Trino reports a query error.
+        """
+        for attempt in range(1, _MAX_ATTEMPTS + 1):
+            try:
+                response = await self.http_client.request(method, url, **kwargs)
+            except (httpx.ConnectError, httpx.ReadError, httpx.RemoteProtocolError) as e:
+                # A statement POST may already have started the query, so it
+                # is only resent when the connection was never established.
+                retryable = method == "GET" or isinstance(e, httpx.ConnectError)
+                if not retryable or attempt == _MAX_ATTEMPTS:
+                    raise
+                logger.debug("Retrying %s %s after connection error", method, url)
+            else:
+                if response.status_code not in _RETRY_STATUS_CODES or attempt == _MAX_ATTEMPTS:
+                    break
+                logger.debug("Retrying %s %s after HTTP %s", method, url, response.status_code)
+            await asyncio.sleep(0.1 * 2 ** (attempt - 1))
+
+        if response.status_code != 200:
+            if response.status_code == 502:
+                raise exceptions.Http502Error("error 502: bad gateway")
+            if response.status_code == 503:
+                raise exceptions.Http503Error("error 503: service unavailable")
+            if response.status_code == 504:
+                raise exceptions.Http504Error("error 504: gateway timeout")
+            raise exceptions.HttpError(
+                f"error {response.status_code}"
+                + (f": {response.content!r}" if response.content else "")
+            )
+        if not response.text.strip():
+            raise exceptions.TrinoConnectionError(
+                "received empty response from server (status 200)"
+            )
+        status = json.loads(response.text)
+        if status.get("error"):
+            raise TrinoRequest._process_error(status["error"], status.get("id"))
+        return status
+
+    async def _cancel_query(self, query_id: Optional[str], next_uri: Optional[str]) -> None:
+        """Cancel a running query on the Trino server, ignoring failures."""
+        urls = [next_uri] if next_uri else []
+        if query_id:
+            urls.append(f"{self.base_url}/v1/query/{query_id}")
+        for url in urls:
+            try:
+                resp = await self.http_client.delete(url, timeout=5)
+                logger.debug("Direct cancel DELETE %s → %s", url, resp.status_code)
+            except Exception:
+                logger.debug("Cancel via REST API failed", exc_info=True)
+
+    async def _run_statement(
+        self, query: str, state: Dict[str, Optional[str]], max_rows: Optional[int] = None
+    ) -> Tuple[Optional[List[Any]], Optional[List[tuple]]]:
+        """Submit *query* and poll ``nextUri`` until every row has arrived.
+
+        ``state`` is updated with the query id and next URI so the caller
+        can cancel the query. If this coroutine is cancelled (timeout or a
+        disconnecting caller) the query is cancelled on the server as well.
+        With *max_rows*, polling stops and the query is cancelled once more
+        than that many rows have arrived.
+        """
+        try:
+            status = await self._request(
+                "POST",
+                f"{self.base_url}/v1/statement",
+                content=query.encode("utf-8"),
+                headers=self._headers,
+            )
+            description = None
+            mapper = None
+            rows: List[tuple] = []
+            while True:
+                state["query_id"] = status.get("id")
+                state["next_uri"] = status.get("nextUri")
+                if description is None and status.get("columns"):
+                    columns = status["columns"]
+                    description = [ColumnDescription.from_column(col) for col in columns]
+                    mapper = RowMapperFactory().create(
+                        columns=columns, legacy_primitive_types=False
+                    )
+                if status.get("data"):
+                    rows.extend(tuple(row) for row in mapper.map(status["data"]))
+                if not state["next_uri"]:
+                    break
+                if max_rows is not None and len(rows) > max_rows:
+                    await self._cancel_query(state["query_id"], state["next_uri"])
+                    break
+                status = await self._request("GET", state["next_uri"])
+        except asyncio.CancelledError:
+            await self._cancel_query(state.get("query_id"), state.get("next_uri"))
+            raise
+        if description is None:
+            return None, None
+        return description, rows
+
+    async def _execute(
+        self, query: str, max_rows: Optional[int] = None
+    ) -> Tuple[Optional[List[str]], Optional[List[tuple]]]:
+        """Execute a watermarked query and return its column names and rows.
+
+        Async equivalent of ``TrinoClient._execute_cursor()``, with the same
+        ``query_timeout_minutes`` deadline over execution and fetching.
+        With *max_rows*, fetching stops soon after that many rows arrived;
+        the rows fetched so far (possibly more) are returned.
+
+        Returns:
+            A tuple of (columns, rows), or (None, None) for statements that
+            produce no output.
+
+        Raises:
+            QueryTimeoutError: If the query exceeds the configured timeout.
+        """
+        statement = watermark_query(self.config, query)
+        state: Dict[str, Optional[str]] = {"query_id": None, "next_uri": None}
+        timeout_minutes = self.config.query_timeout_minutes
+        try:
+            if timeout_minutes > 0:
+                description, rows = await asyncio.wait_for(
+                    self._run_statement(statement, state, max_rows), timeout=timeout_minutes * 60
+                )
+            else:
+                description, rows = await self._run_statement(statement, state, max_rows)
+        except asyncio.TimeoutError:
+            raise TrinoClient._timeout_error(timeout_minutes, state["query_id"]) from None
+        if self.metadata_cache is not None:
+            self.metadata_cache.invalidate_query(query, self.config.catalog, self.config.schema)
+        self.schema_snapshot.invalidate_query(query, self.config.catalog, self.config.schema)
+        if description is None:
+            return None, None
+        return [col[0] for col in description], rows
+
+    async def execute_query(self, query: str) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        """Execute a SQL query and return results as Python data structures."""
+        columns, rows = await self._execute(query)
+        if columns is not None and rows is not None:
+            return [dict(zip(columns, row)) for row in rows]
+        return dict(_NO_OUTPUT_STATUS)
+
+    async def execute_query_json(self, query: str) -> str:
+        """Execute a SQL query and return results as a JSON string."""
+        result = await self.execute_query(query)
+        return json.dumps(result, default=str, indent=2)
+
+    async def fetch_rows(
+        self, query: str, max_rows: int
+    ) -> Tuple[Optional[List[str]], List[tuple], bool]:
+        """Execute a SQL query and fetch at most *max_rows* of its rows.
+
+        See ``TrinoClient.fetch_rows()``.
+        """
+        statement = limit_query(query, max_rows + 1) or query
+        columns, rows = await self._execute(statement, max_rows + 1)
+        if columns is None or rows is None:
+            return None, [], False
+        return columns, rows[:max_rows], len(rows) > max_rows
+
+    async def fetch_into(
+        self, query: str, spool: RowSpool, max_rows: int
+    ) -> Tuple[Optional[List[str]], bool]:
+        """Execute a SQL query and add at most *max_rows* of its rows to *spool*.
+
+        See ``TrinoClient.fetch_into()``. Rows are collected from the
+        response pages first and then moved into the spool.
+        """
+        columns, rows, truncated = await self.fetch_rows(query, max_rows)
+        if columns is None:
+            return None, False
+        if spool.extend(rows) < len(rows):
+            truncated = True
+        return columns, truncated
+
+    async def execute_query_json_limited(self, query: str, max_rows: int) -> Tuple[str, bool]:
+        """Execute a SQL query and return at most *max_rows* rows as a JSON string.
+
+        See ``TrinoClient.execute_query_json_limited()``.
+        """
+        columns, rows, truncated = await self.fetch_rows(query, max_rows)
+        if columns is None:
+            return json.dumps(dict(_NO_OUTPUT_STATUS), default=str, indent=2), False
+        result = [dict(zip(columns, row)) for row in rows]
+        return json.dumps(result, default=str, indent=2), truncated
+
+    def _qualify(self, catalog: str, schema: str) -> Tuple[str, str]:
+        catalog_name = catalog or self.config.catalog
+        schema_name = schema or self.config.schema
+        if not catalog_name or not schema_name:
+            raise ValueError("Both catalog and schema must be specified")
+        return catalog_name, schema_name
+
+    async def _execute_rows(self, query: str) -> List[Dict[str, Any]]:
+        data = await self.execute_query(query)
+        if isinstance(data, dict):
+            raise RuntimeError(f"Expected list of results from {query}, but got status dict: {data}")
+        return data
+
+    async def _cached_metadata(
+        self, kind: str, parts: Tuple[str, ...], loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Run a metadata lookup through the metadata cache, if enabled."""
+        if self.metadata_cache is None:
+            return await loader()
+        return await self.metadata_cache.aload(kind, parts, loader)
+
+    async def snapshot_schema(self, catalog: str, schema: Optional[str] = None) -> Tuple[int, int]:
+        """Load the columns of a whole schema (or catalog) in a single query.
+
+        See ``TrinoClient.snapshot_schema()``.
+        """
+        catalog_name = catalog or self.config.catalog
+        if not catalog_name:
+            raise ValueError("Catalog must be specified")
+        _, rows = await self._execute(snapshot_query(catalog_name, schema))
+        return self.schema_snapshot.load(catalog_name, rows or [], schema)
+
+    async def list_catalogs(self) -> List[str]:
+        """List all available catalogs."""
+
+        async def _load() -> List[str]:
+            return [row["Catalog"] for row in await self._execute_rows("SHOW CATALOGS")]
+
+        return list(await self._cached_metadata("catalogs", (), _load))
+
+    async def list_schemas(self, catalog: str) -> List[str]:
+        """List all schemas in a catalog."""
+        catalog_name = catalog or self.config.catalog
+        if not catalog_name:
+            raise ValueError("Catalog must be specified")
+
+        async def _load() -> List[str]:
+            data = await self._execute_rows(f"SHOW SCHEMAS FROM {catalog_name}")
+            return [row["Schema"] for row in data]
+
+        return list(await self._cached_metadata("schemas", (catalog_name,), _load))
+
+    async def list_tables(self, catalog: str, schema: str) -> List[str]:
+        """List all tables in a schema."""
+        catalog_name, schema_name = self._qualify(catalog, schema)
+        tables = self.schema_snapshot.tables(catalog_name, schema_name)
+        if tables is not None:
+            return tables
+
+        async def _load() -> List[str]:
+            data = await self._execute_rows(f"SHOW TABLES FROM {catalog_name}.{schema_name}")
+            return [row["Table"] for row in data]
+
+        return list(await self._cached_metadata("tables", (catalog_name, schema_name), _load))
+
+    async def describe_table(self, catalog: str, schema: str, table: str) -> str:
+        """Describe the structure of a table."""
+        catalog_name, schema_name = self._qualify(catalog, schema)
+        described = self.schema_snapshot.describe_json(catalog_name, schema_name, table)
+        if described is not None:
+            return described
+        return await self._cached_metadata(
+            "columns",
+            (catalog_name, schema_name, table),
+            lambda: self.execute_query_json(f"DESCRIBE {catalog_name}.{schema_name}.{table}"),
+        )
+
+    async def show_create_table(self, catalog: str, schema: str, table: str) -> str:
+        """Show the CREATE TABLE statement for a table."""
+        catalog_name, schema_name = self._qualify(catalog, schema)
+
+        async def _load() -> str:
+            data = await self._execute_rows(
+                f"SHOW CREATE TABLE {catalog_name}.{schema_name}.{table}"
+            )
+            return data[0]["Create Table"] if data else ""
+
+        return await self._cached_metadata("ddl", (catalog_name, schema_name, table), _load)
+
+    async def get_table_stats(self, catalog: str, schema: str, table: str) -> str:
+        """Get statistics for a table."""
+        catalog_name, schema_name = self._qualify(catalog, schema)
+        return await self.execute_query_json(
+            f"SHOW STATS FOR {catalog_name}.{schema_name}.{table}"
+        )
@@ -0,0 +1,257 @@
+"""In-process caches for query results and catalog metadata."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from .utils import changed_objects
+
+
+class ResultCache:
+    """Thread-safe TTL cache of query results with a byte-size LRU bound.
+
+    Values are result strings (e.g. the JSON returned to the caller). An
+    entry expires ``ttl_seconds`` after it was stored; when storing a new
+    entry would exceed ``max_bytes``, the least recently used entries are
+    evicted first. A single result larger than ``max_bytes`` is not cached.
+    """
+
+    def __init__(self, ttl_seconds: float, max_bytes: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        # key -> (value, size in bytes, expires_at); most recently used last.
+        self._entries: "OrderedDict[Hashable, Tuple[str, int, float]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the cached values."""
+        with self._lock:
+            return self._size
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """Return the cached value for *key*, or ``None`` if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: str) -> None:
+        """Store *value* under *key*, evicting least recently used entries."""
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            while self._entries and self._size + size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+            self._entries[key] = (value, size, time.monotonic() + self.ttl_seconds)
+            self._size += size
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key: Hashable) -> None:
+        """Remove *key*. Caller holds the lock."""
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+
+# Object types cached by MetadataCache and the shape of their keys.
+METADATA_KINDS = {
+    "catalogs": (),
+    "schemas": ("catalog",),
+    "tables": ("catalog", "schema"),
+    "columns": ("catalog", "schema", "table"),
+    "ddl": ("catalog", "schema", "table"),
+}
+
+
+class MetadataCache:
+    """Thread-safe TTL cache for catalog metadata lookups.
+
+    Entries are keyed by object type (see ``METADATA_KINDS``) and a tuple of
+    lower-cased identifiers, since Trino identifiers are case-insensitive.
+    Each type has its own TTL; a TTL of 0 disables caching for that type.
+    Lookups that fail with an error accepted by ``is_negative`` (e.g. "table
+    not found") are cached for ``negative_ttl_seconds`` and re-raise the
+    original error until they expire.
+
+    At most ``max_entries`` entries are kept; storing one more evicts
+    expired entries first, then the least recently used.
+
+    Use ``invalidate()`` to drop entries for a catalog, schema or table
+    after it changed.
+    """
+
+    def __init__(
+        self,
+        ttls: Dict[str, float],
+        negative_ttl_seconds: float = 0,
+        is_negative: Optional[Callable[[Exception], bool]] = None,
+        max_entries: int = 10_000,
+    ):
+        unknown = set(ttls) - set(METADATA_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown metadata cache types: {', '.join(sorted(unknown))}")
+        self.ttls = {kind: ttls.get(kind, 0) for kind in METADATA_KINDS}
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._is_negative = is_negative
+        self.max_entries = max_entries
+        # (kind, key) -> (value or error, is_error, expires_at); most recently
+        # used last.
+        self._entries: "OrderedDict[Tuple[str, Tuple[str, ...]], Tuple[Any, bool, float]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @staticmethod
+    def _key(kind: str, parts: Tuple[str, ...]) -> Tuple[str, Tuple[str, ...]]:
+        return kind, tuple(part.lower() for part in parts)
+
+    def _lookup(self, kind: str, parts: Tuple[str, ...]) -> Tuple[bool, Any]:
+        """Return ``(found, value)``; re-raises a negatively cached error."""
+        key = self._key(kind, parts)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            return False, None
+        value, is_error, _ = entry
+        if is_error:
+            raise value
+        return True, value
+
+    def _store(self, kind: str, parts: Tuple[str, ...], value: Any, is_error: bool) -> None:
+        ttl = self.negative_ttl_seconds if is_error else self.ttls[kind]
+        if ttl <= 0:
+            return
+        key = self._key(kind, parts)
+        now = time.monotonic()
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.max_entries:
+                for expired in [k for k, entry in self._entries.items() if entry[2] <= now]:
+                    del self._entries[expired]
+            while self._entries and len(self._entries) >= self.max_entries:
+                self._entries.popitem(last=False)
+            self._entries[key] = (value, is_error, now + ttl)
+
+    def _store_error(self, kind: str, parts: Tuple[str, ...], error: Exception) -> None:
+        if self._is_negative is not None and self._is_negative(error):
+            self._store(kind, parts, error, True)
+
+    def load(self, kind: str, parts: Tuple[str, ...], loader: Callable[[], Any]) -> Any:
+        """Return the cached value for ``(kind, parts)``, calling *loader* on a miss."""
+        found, value = self._lookup(kind, parts)
+        if found:
+            return value
+        try:
+            value = loader()
+        except Exception as e:
+            self._store_error(kind, parts, e)
+            raise
+        self._store(kind, parts, value, False)
+        return value
+
+    async def aload(
+        self, kind: str, parts: Tuple[str, ...], loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Async variant of ``load()`` for a coroutine *loader*."""
+        found, value = self._lookup(kind, parts)
+        if found:
+            return value
+        try:
+            value = await loader()
+        except Exception as e:
+            self._store_error(kind, parts, e)
+            raise
+        self._store(kind, parts, value, False)
+        return value
+
+    def invalidate(
+        self,
+        catalog: Optional[str] = None,
+        schema: Optional[str] = None,
+        table: Optional[str] = None,
+    ) -> int:
+        """Drop cached entries affected by a change to the given object.
+
+        A table change drops its columns and DDL plus its schema's table
+        list; a schema change drops everything in the schema plus the
+        catalog's schema list; a catalog change drops everything in the
+        catalog plus the catalog list. With no catalog the whole cache is
+        cleared. Arguments after the first ``None`` are ignored.
+
+        Returns:
+            The number of entries dropped.
+        """
+        parts = []
+        for part in (catalog, schema, table):
+            if part is None:
+                break
+            parts.append(part)
+
+        if not parts:
+            with self._lock:
+                dropped = len(self._entries)
+                self._entries.clear()
+            return dropped
+
+        _, target = self._key("", tuple(parts))
+        # The listing that contains the changed object changes as well.
+        parent = ("catalogs", "schemas", "tables")[len(target) - 1]
+
+        def affected(kind: str, key: Tuple[str, ...]) -> bool:
+            return key[: len(target)] == target or (kind == parent and key == target[:-1])
+
+        with self._lock:
+            stale = [entry for entry in self._entries if affected(*entry)]
+            for entry in stale:
+                del self._entries[entry]
+        return len(stale)
+
+    def invalidate_query(
+        self, query: str, catalog: Optional[str] = None, schema: Optional[str] = None
+    ) -> None:
+        """Drop entries for the objects a (DDL) query may have changed.
+
+        Unqualified names in *query* are resolved against the default
+        *catalog* and *schema*. If the affected objects cannot be determined
+        the whole cache is cleared.
+        """
+        if not len(self):
+            return
+        objects = changed_objects(query)
+        if objects is None:
+            self.invalidate()
+            return
+        for obj_catalog, obj_schema, obj_table in objects:
+            self.invalidate(obj_catalog or catalog, obj_schema or schema, obj_table)
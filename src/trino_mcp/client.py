@@ -1,36 +1,179 @@
 """Trino client for executing queries."""
 
-import csv
+import itertools
 import json
 import logging
-import os
+import queue
 import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 import trino
 from trino.dbapi import Connection, Cursor
 
 from . import __version__
-from .config import TrinoConfig
+from .cache import MetadataCache
+from .config import TrinoConfig, connection_pool_size
+from .export import check_output_path, open_output, record_batch_reader, write_file
+from .http_session import create_http_adapter, new_session
+from .pool import ConnectionPool
+from .search import SearchHit, SearchIndex
+from .snapshot import SchemaSnapshot, snapshot_query
+from .spool import RowSpool
+from .store import MetadataStore
+from .utils import limit_query
 
 logger = logging.getLogger(__name__)
 
 
+# Default number of rows pulled from the cursor per batch when streaming.
+DEFAULT_BATCH_SIZE = 10_000
+
+# Result reported for statements (DDL/DML) that produce no output rows.
+_NO_OUTPUT_STATUS = {
+    "status": "success",
+    "message": "Query executed successfully without output.",
+}
+
+# Number of fetched batches the background fetch thread may buffer ahead of
+# the consumer. Keeps peak memory at roughly (depth + 1) * batch_size rows.
+_STREAM_QUEUE_DEPTH = 2
+
+
+def watermark_query(config: TrinoConfig, query: str) -> str:
+    """Prepend the trino-mcp watermark comment for *config* to *query*."""
+    watermark_data: dict = {
+        "trino_mcp_version": __version__,
+        "user": config.user,
+    }
+    if config.custom_watermark:
+        watermark_data.update(sorted(config.custom_watermark.items()))
+    watermark = f"-- {json.dumps(watermark_data)} --\n"
+    return watermark + query
+
+
+def is_not_found_error(error: Exception) -> bool:
+    """Whether *error* is Trino reporting a missing catalog, schema or table."""
+    return isinstance(error, trino.exceptions.TrinoUserError) and str(
+        error.error_name
+    ).endswith("_NOT_FOUND")
+
+
 class QueryTimeoutError(Exception):
     """Raised when a query exceeds the configured timeout and is cancelled."""
 
 
+class ResultStream:
+    """Result of a query whose rows are fetched lazily from the cursor.
+
+    Iterating the stream yields lists of row tuples (batches) as Trino pages
+    arrive, so a consumer never holds more than a few batches in memory.
+    For DDL/DML statements that produce no output ``columns`` is ``None``
+    and the stream yields nothing.
+
+    Use as a context manager (or call ``close()``) so that an abandoned
+    stream stops fetching. Closing a stream before its last row has been
+    read also cancels the query on the Trino server, so a caller that only
+    wants the first rows does not leave the cluster computing the rest.
+    """
+
+    def __init__(
+        self,
+        description: Optional[List[Any]],
+        batches: Iterator[List[tuple]],
+        on_close: Optional[Callable[[], None]] = None,
+    ):
+        self.description = description
+        self.columns: Optional[List[str]] = (
+            [col[0] for col in description] if description else None
+        )
+        self._batches = batches
+        self._on_close = on_close
+        self._closed = False
+
+    def __iter__(self) -> Iterator[List[tuple]]:
+        return self._batches
+
+    def __enter__(self) -> "ResultStream":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def rows(self) -> Iterator[tuple]:
+        """Iterate over individual rows instead of batches."""
+        for batch in self._batches:
+            yield from batch
+
+    def close(self) -> None:
+        """Stop fetching further rows. Safe to call more than once."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._on_close is not None:
+            self._on_close()
+
+
 class TrinoClient:
     """Client for interacting with Trino."""
 
     def __init__(self, config: TrinoConfig):
-        """Initialize the Trino client."""
+        """Initialize the Trino client.
+
+        Queries run on connections checked out from a bounded pool with room
+        for every concurrency class's calls at once (see
+        ``connection_pool_size()``), so concurrent calls never share (or
+        swap out) a connection underneath each other. All connections send
+        their HTTP requests through one shared adapter, so keep-alive
+        sockets (and their TLS sessions) are reused across connections,
+        queries and REST cancels.
+
+        When ``metadata_cache_ttls`` enables it, catalog/schema/table
+        listings and table descriptions are served from a ``MetadataCache``,
+        which DDL run through this client invalidates.
+
+        When ``metadata_store_path`` is set, schema snapshots are also saved
+        to that SQLite file; call ``schema_snapshot.restore()`` to load them.
+        """
         self.config = config
-        self.connection = self._create_connection()
+        self.http_adapter = create_http_adapter(
+            pool_connections=config.http_pool_connections,
+            pool_maxsize=config.http_pool_maxsize,
+            retries=config.http_retries,
+        )
+        # Used for requests made outside a connection, e.g. REST cancels.
+        self.http_session = new_session(self.http_adapter)
+        self.pool = ConnectionPool(
+            self._create_connection,
+            max_size=connection_pool_size(config),
+            idle_timeout=config.connection_idle_timeout_seconds,
+        )
+        self.metadata_cache: Optional[MetadataCache] = None
+        if any(ttl > 0 for ttl in (config.metadata_cache_ttls or {}).values()):
+            self.metadata_cache = MetadataCache(
+                config.metadata_cache_ttls,
+                negative_ttl_seconds=config.metadata_cache_negative_ttl_seconds,
+                max_entries=config.metadata_cache_max_entries,
+                is_negative=is_not_found_error,
+            )
+        # Column listings loaded in bulk by snapshot_schema().
+        store = MetadataStore(config.metadata_store_path) if config.metadata_store_path else None
+        self.schema_snapshot = SchemaSnapshot(store)
+        self.search_index = SearchIndex(self.schema_snapshot)
+
+    def close(self) -> None:
+        """Close all pooled connections and their keep-alive sockets."""
+        self.pool.close()
+        self.http_session.close()
+        self.http_adapter.shutdown()
+        if self.schema_snapshot.store is not None:
+            self.schema_snapshot.store.close()
 
     def _create_connection(self) -> Connection:
         """Create a new Trino connection."""
+        kwargs = dict(self.config.additional_kwargs or {})
+        # trino ignores ``verify`` when given a session, so apply it here.
+        http_session = new_session(self.http_adapter, verify=kwargs.pop("verify", True))
         return trino.dbapi.connect(
             host=self.config.host,
             port=self.config.port,
@@ -40,17 +183,10 @@ class TrinoClient:
             http_scheme=self.config.http_scheme,
             auth=self.config.auth,
             session_properties=self.config.session_properties,
-            **(self.config.additional_kwargs or {}),
+            http_session=http_session,
+            **kwargs,
         )
 
-    def _reconnect(self) -> None:
-        """Close the existing connection and create a fresh one."""
-        try:
-            self.connection.close()
-        except Exception:
-            pass
-        self.connection = self._create_connection()
-
     def _add_watermark(self, query: str) -> str:
         """Add watermark comment to the query.
 
@@ -60,14 +196,93 @@ class TrinoClient:
         Returns:
             The query with watermark comment prepended
         """
-        watermark_data: dict = {
-            "trino_mcp_version": __version__,
-            "user": self.config.user,
-        }
-        if self.config.custom_watermark:
-            watermark_data.update(sorted(self.config.custom_watermark.items()))
-        watermark = f"-- {json.dumps(watermark_data)} --\n"
-        return watermark + query
+        return watermark_query(self.config, query)
+
+    def _open_cursor(self, query: str) -> Tuple[Connection, Cursor]:
+        """Execute a watermarked query on a pooled connection.
+
+        If the first attempt fails the connection is assumed to be stale
+        (e.g. an expired token), so it is discarded and the query retried
+        once on a fresh connection.
+
+        Returns:
+            The checked-out connection and the cursor positioned on the
+            query's result. The caller must release the connection to
+            ``self.pool`` once it has finished with the cursor.
+        """
+        watermarked_query = self._add_watermark(query)
+        connection = self.pool.acquire()
+        try:
+            cursor: Cursor = connection.cursor()
+            cursor.execute(watermarked_query)
+        except Exception:
+            # Connection may be stale — replace it and retry once.
+            self.pool.release(connection, discard=True)
+            connection = self.pool.acquire()
+            try:
+                cursor = connection.cursor()
+                cursor.execute(watermarked_query)
+            except BaseException:
+                self.pool.release(connection, discard=True)
+                raise
+        self._invalidate_changed(query)
+        return connection, cursor
+
+    def _invalidate_changed(self, query: str) -> None:
+        """Drop cached metadata and snapshot entries that *query* may have changed.
+
+        Every execution path calls this once the statement has executed
+        successfully, so DDL run through this client is never served stale
+        metadata afterwards — with or without a query timeout.
+        """
+        if self.metadata_cache is not None:
+            self.metadata_cache.invalidate_query(query, self.config.catalog, self.config.schema)
+        self.schema_snapshot.invalidate_query(query, self.config.catalog, self.config.schema)
+
+    def _cancel_query(self, cursor: Cursor) -> None:
+        """Cancel the query running on *cursor* on the Trino server.
+
+        ``cursor.cancel()`` relies on ``_next_uri`` which may not be set yet
+        if ``execute()`` is still in its initial HTTP request. It silently
+        no-ops when ``_next_uri`` is None, so we always also attempt a direct
+        REST API cancel as a reliable fallback.
+        """
+        query_id = getattr(cursor, "query_id", None)
+        try:
+            cursor.cancel()
+        except Exception:
+            logger.debug("cursor.cancel() raised", exc_info=True)
+
+        if query_id:
+            try:
+                scheme = self.config.http_scheme
+                host = self.config.host
+                port = self.config.port
+                url = f"{scheme}://{host}:{port}/v1/query/{query_id}"
+                # Re-use the connection's internal HTTP session so auth
+                # headers (OAuth2, Bearer, etc.) are included automatically.
+                # Either way the request goes through the shared adapter and
+                # reuses an open keep-alive socket instead of a new handshake.
+                http_session = getattr(
+                    getattr(cursor, "_request", None), "_http_session", None
+                )
+                if http_session is None:
+                    http_session = self.http_session
+                resp = http_session.delete(url, timeout=5)
+                logger.debug("Direct cancel DELETE %s → %s", url, resp.status_code)
+            except Exception:
+                logger.debug("Direct cancel via REST API failed", exc_info=True)
+
+    @staticmethod
+    def _timeout_error(timeout_minutes: float, query_id: Optional[str]) -> QueryTimeoutError:
+        """Build the error raised when a query is cancelled for exceeding the timeout."""
+        return QueryTimeoutError(
+            f"Query exceeded the {timeout_minutes}-minute timeout configured for this server "
+            f"and was cancelled (query_id={query_id or 'unknown'}). "
+            "Please revise your query to run faster — add WHERE filters, use LIMIT, "
+            "or avoid SELECT * on large tables. "
+            "If you need a longer timeout, increase QUERY_TIMEOUT_MINUTES."
+        )
 
     def _execute_cursor(
         self, query: str
@@ -98,21 +313,15 @@ class TrinoClient:
             return self._execute_cursor_with_timeout(query, timeout_minutes)
 
         # No timeout — execute directly (original behaviour)
-        watermarked_query = self._add_watermark(query)
+        connection, cursor = self._open_cursor(query)
         try:
-            cursor: Cursor = self.connection.cursor()
-            cursor.execute(watermarked_query)
-        except Exception:
-            # Connection may be stale — reconnect and retry once.
-            self._reconnect()
-            cursor = self.connection.cursor()
-            cursor.execute(watermarked_query)
-
-        if cursor.description:
-            columns = [col[0] for col in cursor.description]
-            rows = cursor.fetchall()
-            return columns, rows
-        return None, None
+            if cursor.description:
+                columns = [col[0] for col in cursor.description]
+                rows = cursor.fetchall()
+                return columns, rows
+            return None, None
+        finally:
+            self.pool.release(connection)
 
     def _execute_cursor_with_timeout(
         self, query: str, timeout_minutes: float
@@ -133,13 +342,16 @@ class TrinoClient:
         Raises:
             QueryTimeoutError: If the query exceeds the timeout.
         """
-        cursor: Cursor = self.connection.cursor()
+        connection = self.pool.acquire()
+        cursor: Cursor = connection.cursor()
         watermarked_query = self._add_watermark(query)
         result_holder: Dict[str, Any] = {}
+        timed_out = threading.Event()
 
         def _run() -> None:
             try:
                 cursor.execute(watermarked_query)
+                self._invalidate_changed(query)
                 desc = cursor.description
                 if desc:
                     result_holder["columns"] = [col[0] for col in desc]
@@ -149,6 +361,10 @@ class TrinoClient:
                     result_holder["rows"] = None
             except Exception as exc:
                 result_holder["error"] = exc
+            finally:
+                # A cancelled query's connection is not reused: the request
+                # may have been cut off mid-flight.
+                self.pool.release(connection, discard=timed_out.is_set())
 
         thread = threading.Thread(target=_run, daemon=True)
         thread.start()
@@ -169,43 +385,10 @@ class TrinoClient:
                 query_id or "unknown",
             )
 
-            # cursor.cancel() relies on _next_uri which may not be set yet
-            # if execute() is still in its initial HTTP request.  It silently
-            # no-ops when _next_uri is None, so we always also attempt a
-            # direct REST API cancel as a reliable fallback.
-            try:
-                cursor.cancel()
-            except Exception:
-                logger.debug("cursor.cancel() raised", exc_info=True)
-
-            if query_id:
-                try:
-                    scheme = self.config.http_scheme
-                    host = self.config.host
-                    port = self.config.port
-                    url = f"{scheme}://{host}:{port}/v1/query/{query_id}"
-                    # Re-use the connection's internal HTTP session so auth
-                    # headers (OAuth2, Bearer, etc.) are included automatically.
-                    http_session = getattr(
-                        getattr(cursor, "_request", None), "_http_session", None
-                    )
-                    if http_session is not None:
-                        resp = http_session.delete(url, timeout=5)
-                    else:
-                        import requests as _requests
-                        resp = _requests.delete(url, timeout=5)
-                    logger.debug("Direct cancel DELETE %s → %s", url, resp.status_code)
-                except Exception:
-                    logger.debug("Direct cancel via REST API failed", exc_info=True)
-
+            timed_out.set()
+            self._cancel_query(cursor)
             thread.join(timeout=5)
-            raise QueryTimeoutError(
-                f"Query exceeded the {timeout_minutes}-minute timeout configured for this server "
-                f"and was cancelled (query_id={query_id or 'unknown'}). "
-                "Please revise your query to run faster — add WHERE filters, use LIMIT, "
-                "or avoid SELECT * on large tables. "
-                "If you need a longer timeout, increase QUERY_TIMEOUT_MINUTES."
-            )
+            raise self._timeout_error(timeout_minutes, query_id)
 
         # Thread finished within the deadline.
         if "error" in result_holder:
@@ -213,6 +396,191 @@ class TrinoClient:
 
         return result_holder.get("columns"), result_holder.get("rows")
 
+    def iter_query(self, query: str, batch_size: int = DEFAULT_BATCH_SIZE) -> ResultStream:
+        """Execute a query and stream its rows in batches as Trino pages arrive.
+
+        Unlike ``execute_query()``, rows are never materialized all at once:
+        each iteration of the returned stream pulls at most ``batch_size``
+        rows from the cursor, so peak memory stays constant regardless of
+        the size of the result.
+
+        When ``query_timeout_minutes`` is configured (> 0), the deadline
+        covers the whole stream — execution *and* fetching. Rows are fetched
+        by a background thread that buffers a couple of batches ahead; if
+        the deadline passes before the stream is exhausted the query is
+        cancelled and ``QueryTimeoutError`` is raised from the iteration.
+
+        Closing the stream before it is exhausted cancels the query, so
+        reading just the first rows (e.g. with ``itertools.islice``) costs
+        Trino no more work than it has already done.
+
+        Args:
+            query: The SQL query to execute
+            batch_size: Maximum number of rows per yielded batch.
+
+        Returns:
+            A ``ResultStream``. Use it as a context manager so an abandoned
+            stream stops fetching.
+
+        Raises:
+            QueryTimeoutError: If the query exceeds the configured timeout.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+
+        timeout_minutes = self.config.query_timeout_minutes
+        if timeout_minutes > 0:
+            return self._stream_cursor_with_timeout(query, batch_size, timeout_minutes)
+
+        # No timeout — fetch directly on the caller's thread.
+        connection, cursor = self._open_cursor(query)
+        description = cursor.description
+        if not description:
+            self.pool.release(connection)
+            return ResultStream(None, iter(()))
+
+        released = threading.Lock()
+        finished = threading.Event()
+
+        def _release(discard: bool = False) -> None:
+            # Called on exhaustion, on error and on close(); release only once.
+            if released.acquire(blocking=False):
+                self.pool.release(connection, discard=discard)
+
+        def _batches() -> Iterator[List[tuple]]:
+            try:
+                while True:
+                    batch = cursor.fetchmany(batch_size)
+                    if not batch:
+                        finished.set()
+                        return
+                    yield batch
+            except BaseException:
+                finished.set()
+                raise
+            finally:
+                _release()
+
+        def _close() -> None:
+            if not finished.is_set() and not released.locked():
+                self._cancel_query(cursor)
+                # The cancelled statement may still be in flight on this
+                # connection, so it is not reused.
+                _release(discard=True)
+            _release()
+
+        return ResultStream(description, _batches(), on_close=_close)
+
+    def _stream_cursor_with_timeout(
+        self, query: str, batch_size: int, timeout_minutes: float
+    ) -> ResultStream:
+        """Stream a query's rows with a client-side timeout and automatic cancellation.
+
+        A background thread executes the query and pushes row batches onto a
+        bounded queue; the consumer pulls from the queue until the deadline.
+        If the deadline passes first the query is cancelled server-side.
+
+        Args:
+            query: The SQL query to execute
+            batch_size: Maximum number of rows per batch.
+            timeout_minutes: Maximum run time in minutes before cancellation.
+
+        Returns:
+            A ``ResultStream`` fed by the background thread.
+
+        Raises:
+            QueryTimeoutError: If the query exceeds the timeout.
+        """
+        connection = self.pool.acquire()
+        cursor: Cursor = connection.cursor()
+        watermarked_query = self._add_watermark(query)
+        pending: "queue.Queue[Tuple[str, Any]]" = queue.Queue(maxsize=_STREAM_QUEUE_DEPTH)
+        stop = threading.Event()
+        timed_out = threading.Event()
+        # Set once the consumer has seen the end of the result or an error.
+        finished = threading.Event()
+        abandoned = threading.Event()
+
+        def _put(item: Tuple[str, Any]) -> bool:
+            # Block while the consumer is behind, but give up once it has
+            # closed the stream so the thread never outlives its reader.
+            while not stop.is_set():
+                try:
+                    pending.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def _run() -> None:
+            try:
+                cursor.execute(watermarked_query)
+                self._invalidate_changed(query)
+                description = cursor.description
+                if not _put(("description", description)) or not description:
+                    return
+                while not stop.is_set():
+                    batch = cursor.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    if not _put(("rows", batch)):
+                        return
+                _put(("done", None))
+            except Exception as exc:
+                _put(("error", exc))
+            finally:
+                # A cancelled query's request may have been cut off mid-flight.
+                self.pool.release(
+                    connection, discard=timed_out.is_set() or abandoned.is_set()
+                )
+
+        thread = threading.Thread(target=_run, daemon=True)
+        thread.start()
+
+        deadline = time.monotonic() + timeout_minutes * 60
+
+        def _next() -> Tuple[str, Any]:
+            try:
+                kind, payload = pending.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                timed_out.set()
+                stop.set()
+                query_id = getattr(cursor, "query_id", None)
+                logger.warning(
+                    "Query exceeded %g-minute timeout, cancelling (query_id=%s)…",
+                    timeout_minutes,
+                    query_id or "unknown",
+                )
+                self._cancel_query(cursor)
+                thread.join(timeout=5)
+                raise self._timeout_error(timeout_minutes, query_id)
+            if kind == "error":
+                finished.set()
+                stop.set()
+                raise payload
+            return kind, payload
+
+        _, description = _next()
+        if not description:
+            stop.set()
+            return ResultStream(None, iter(()))
+
+        def _batches() -> Iterator[List[tuple]]:
+            while True:
+                kind, payload = _next()
+                if kind == "done":
+                    finished.set()
+                    return
+                yield payload
+
+        def _close() -> None:
+            stop.set()
+            if not finished.is_set() and not timed_out.is_set() and thread.is_alive():
+                abandoned.set()
+                self._cancel_query(cursor)
+
+        return ResultStream(description, _batches(), on_close=_close)
+
     def execute_query(self, query: str) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
         """Execute a SQL query and return results as Python data structures.
 
@@ -226,10 +594,7 @@ class TrinoClient:
         columns, rows = self._execute_cursor(query)
         if columns is not None and rows is not None:
             return [dict(zip(columns, row)) for row in rows]
-        return {
-            "status": "success",
-            "message": "Query executed successfully without output.",
-        }
+        return dict(_NO_OUTPUT_STATUS)
 
     def execute_query_json(self, query: str) -> str:
         """Execute a SQL query and return results as a JSON string.
@@ -246,62 +611,249 @@ class TrinoClient:
         result = self.execute_query(query)
         return json.dumps(result, default=str, indent=2)
 
-    def execute_query_to_file(self, query: str, output_file: str) -> int:
+    def fetch_rows(
+        self, query: str, max_rows: int
+    ) -> Tuple[Optional[List[str]], List[tuple], bool]:
+        """Execute a SQL query and fetch at most *max_rows* of its rows.
+
+        SELECTs are rewritten to ask Trino for no more than ``max_rows + 1``
+        rows (see ``limit_query()``); the extra row shows whether the result
+        was cut short. Other statements are streamed, and fetching stops
+        (and the query is cancelled) once that many rows have arrived.
+
+        Args:
+            query: The SQL query to execute
+            max_rows: Maximum number of rows to fetch.
+
+        Returns:
+            The column names (``None`` for statements without output), the
+            rows, and whether rows were left out.
+        """
+        statement = limit_query(query, max_rows + 1) or query
+        with self.iter_query(statement) as stream:
+            if stream.description is None:
+                return None, [], False
+            rows = list(itertools.islice(stream.rows(), max_rows + 1))
+        return stream.columns, rows[:max_rows], len(rows) > max_rows
+
+    def fetch_into(
+        self, query: str, spool: RowSpool, max_rows: int
+    ) -> Tuple[Optional[List[str]], bool]:
+        """Execute a SQL query and stream at most *max_rows* of its rows into *spool*.
+
+        Like ``fetch_rows()``, but rows go straight from the cursor into
+        the spool, which moves them to disk past its memory threshold. If
+        the spool fills up (its ``max_bytes``) fetching stops and the query
+        is cancelled.
+
+        Returns:
+            The column names (``None`` for statements without output) and
+            whether rows were left out.
+        """
+        statement = limit_query(query, max_rows + 1) or query
+        with self.iter_query(statement) as stream:
+            if stream.description is None:
+                return None, False
+            fetched = 0
+            for row in stream.rows():
+                if fetched == max_rows or not spool.append(row):
+                    # Closing the stream cancels the rest of the query.
+                    return stream.columns, True
+                fetched += 1
+        return stream.columns, False
+
+    def execute_query_json_limited(self, query: str, max_rows: int) -> Tuple[str, bool]:
+        """Execute a SQL query and return at most *max_rows* rows as a JSON string.
+
+        See ``fetch_rows()``.
+
+        Returns:
+            The JSON string and whether rows were left out.
+        """
+        columns, rows, truncated = self.fetch_rows(query, max_rows)
+        if columns is None:
+            return json.dumps(dict(_NO_OUTPUT_STATUS), default=str, indent=2), False
+        result = [dict(zip(columns, row)) for row in rows]
+        return json.dumps(result, default=str, indent=2), truncated
+
+    def execute_query_arrow(self, query: str, batch_size: int = DEFAULT_BATCH_SIZE) -> Any:
+        """Execute a query and return its results as a ``pyarrow.RecordBatchReader``.
+
+        Rows are streamed via ``iter_query()`` and converted to Arrow record
+        batches lazily as the reader is consumed, with column types taken from
+        the Trino result types. Python consumers can hand the reader straight
+        to pandas, polars or duckdb instead of parsing JSON. For DDL/DML
+        statements the reader yields a single status row, mirroring
+        ``execute_query_to_file()``.
+
+        Requires the ``arrow`` extra (pyarrow).
+
+        Args:
+            query: The SQL query to execute
+            batch_size: Maximum number of rows per record batch.
+
+        Returns:
+            A ``pyarrow.RecordBatchReader``.
+        """
+        stream = self.iter_query(query, batch_size=batch_size)
+        if stream.description is None:
+            status = _NO_OUTPUT_STATUS
+            return record_batch_reader(
+                [(key, "varchar") for key in status], [[tuple(status.values())]]
+            )
+
+        def _batches() -> Iterator[List[tuple]]:
+            with stream:
+                yield from stream
+
+        try:
+            return record_batch_reader(stream.description, _batches())
+        except BaseException:
+            stream.close()
+            raise
+
+    def execute_query_to_file(
+        self, query: str, output_file: str, json_indent: Optional[int] = 2
+    ) -> int:
         """Execute a query and write results directly to a file.
 
         The output format is derived from the file extension:
         - ``.csv`` → CSV with a header row (written directly from cursor data,
           no intermediate dict conversion).
-        - ``.json`` (or any other extension) → JSON with 2-space indentation.
-
-        This avoids the overhead of zipping columns and rows into dicts when
-        CSV output is requested.
+        - ``.jsonl`` / ``.ndjson`` → JSON Lines, one compact object per row.
+        - ``.parquet`` → Parquet, one row group per fetched batch, with column
+          types taken from the Trino types in ``cursor.description``
+          (requires the ``parquet`` extra).
+        - ``.arrow`` / ``.feather`` → Arrow IPC file (Feather v2), typed the
+          same way as Parquet (requires the ``arrow`` extra).
+        - ``.json`` (or any other extension) → JSON array of objects,
+          indented by ``json_indent`` spaces (``None`` for compact output).
+
+        Text formats may add a ``.gz`` or ``.zst`` suffix (e.g.
+        ``results.csv.gz``, ``results.jsonl.zst``) to be compressed while
+        they are written; ``.zst`` requires the ``zstd`` extra.
+
+        Rows are streamed from the cursor via ``iter_query()`` and written
+        one batch at a time, so peak memory stays constant regardless of
+        the size of the result. If the query fails part-way through, the
+        partially written file is removed.
 
         Args:
             query: The SQL query to execute
             output_file: Destination file path. Extension determines format.
+            json_indent: Indentation for JSON output; ``None`` disables it.
 
         Returns:
             The number of rows written.
         """
-        columns, rows = self._execute_cursor(query)
-        ext = os.path.splitext(output_file)[1].lower()
+        # Reject unsupported paths before running a possibly expensive query.
+        fmt = check_output_path(output_file)
+
+        with self.iter_query(query) as stream:
+            if stream.description is None:
+                status = _NO_OUTPUT_STATUS
+                if fmt == "json":
+                    with open_output(output_file) as f:
+                        json.dump(status, f, default=str, indent=json_indent)
+                else:
+                    write_file(
+                        output_file,
+                        [(key, "varchar") for key in status],
+                        [[tuple(status.values())]],
+                    )
+                return 1
 
-        if columns is not None and rows is not None:
-            if ext == ".csv":
-                with open(output_file, "w", encoding="utf-8", newline="") as f:
-                    writer = csv.writer(f)
-                    writer.writerow(columns)
-                    writer.writerows(rows)
-            else:
-                data = [dict(zip(columns, row)) for row in rows]
-                with open(output_file, "w", encoding="utf-8") as f:
-                    json.dump(data, f, default=str, indent=2)
-            return len(rows)
-        else:
-            status = {
-                "status": "success",
-                "message": "Query executed successfully without output.",
-            }
-            if ext == ".csv":
-                with open(output_file, "w", encoding="utf-8", newline="") as f:
-                    writer = csv.writer(f)
-                    writer.writerow(status.keys())
-                    writer.writerow(status.values())
-            else:
-                with open(output_file, "w", encoding="utf-8") as f:
-                    json.dump(status, f, default=str, indent=2)
-            return 1
+            return write_file(output_file, stream.description, stream, json_indent=json_indent)
+
+    def invalidate_metadata(
+        self,
+        catalog: Optional[str] = None,
+        schema: Optional[str] = None,
+        table: Optional[str] = None,
+    ) -> int:
+        """Drop cached metadata for a catalog, schema or table (or everything).
+
+        Also drops the affected part of the schema snapshot.
+
+        Returns:
+            The number of metadata cache entries dropped; 0 if the cache is
+            disabled.
+        """
+        self.schema_snapshot.invalidate(catalog, schema, table)
+        if self.metadata_cache is None:
+            return 0
+        return self.metadata_cache.invalidate(catalog, schema, table)
+
+    def snapshot_schema(self, catalog: str, schema: Optional[str] = None) -> Tuple[int, int]:
+        """Load the columns of a whole schema (or catalog) in a single query.
+
+        Reads ``information_schema.columns`` and keeps the result in
+        ``self.schema_snapshot``, from which ``describe_table()`` then
+        answers for every table in it without querying Trino. A new
+        snapshot of the same schema or catalog replaces the old one.
+
+        Args:
+            catalog: The catalog to snapshot (defaults to the configured one).
+            schema: Limit the snapshot to this schema; ``None`` loads every
+                schema of the catalog.
+
+        Returns:
+            The number of tables and columns loaded.
+        """
+        catalog_name = catalog or self.config.catalog
+        if not catalog_name:
+            raise ValueError("Catalog must be specified")
+
+        with self.iter_query(snapshot_query(catalog_name, schema)) as stream:
+            return self.schema_snapshot.load(catalog_name, stream.rows(), schema)
+
+    def search_tables(self, query: str, limit: int = 50) -> List[SearchHit]:
+        """Search the snapshotted tables and columns by name, without querying Trino.
+
+        Only schemas loaded with ``snapshot_schema()`` (or restored from the
+        metadata store) are searched.
+        """
+        return self.search_index.search(query, limit)
+
+    def refresh_snapshot(self, max_age_seconds: float) -> int:
+        """Re-snapshot every schema loaded longer than *max_age_seconds* ago.
+
+        Schemas are refreshed one at a time, oldest first, so the snapshot
+        stays usable throughout. A schema that fails to refresh is logged
+        and kept.
+
+        Returns:
+            The number of schemas refreshed.
+        """
+        refreshed = 0
+        for catalog, schema in self.schema_snapshot.stale(max_age_seconds):
+            try:
+                self.snapshot_schema(catalog, schema)
+            except Exception:
+                logger.warning("Failed to refresh snapshot of %s.%s", catalog, schema, exc_info=True)
+                continue
+            refreshed += 1
+        return refreshed
+
+    def _cached_metadata(self, kind: str, parts: Tuple[str, ...], loader: Callable[[], Any]) -> Any:
+        """Run a metadata lookup through the metadata cache, if enabled."""
+        if self.metadata_cache is None:
+            return loader()
+        return self.metadata_cache.load(kind, parts, loader)
 
     def list_catalogs(self) -> List[str]:
         """List all available catalogs."""
-        data = self.execute_query("SHOW CATALOGS")
-        if isinstance(data, dict):
-            # Query didn't return results (unexpected for SHOW CATALOGS)
-            raise RuntimeError(
-                f"Expected list of results from SHOW CATALOGS, but got status dict: {data}"
-            )
-        return [row["Catalog"] for row in data]
+
+        def _load() -> List[str]:
+            data = self.execute_query("SHOW CATALOGS")
+            if isinstance(data, dict):
+                # Query didn't return results (unexpected for SHOW CATALOGS)
+                raise RuntimeError(
+                    f"Expected list of results from SHOW CATALOGS, but got status dict: {data}"
+                )
+            return [row["Catalog"] for row in data]
+
+        return list(self._cached_metadata("catalogs", (), _load))
 
     def list_schemas(self, catalog: str) -> List[str]:
         """List all schemas in a catalog."""
@@ -309,13 +861,16 @@ class TrinoClient:
         if not catalog_name:
             raise ValueError("Catalog must be specified")
 
-        data = self.execute_query(f"SHOW SCHEMAS FROM {catalog_name}")
-        if isinstance(data, dict):
-            # Query didn't return results (unexpected for SHOW SCHEMAS)
-            raise RuntimeError(
-                f"Expected list of results from SHOW SCHEMAS, but got status dict: {data}"
-            )
-        return [row["Schema"] for row in data]
+        def _load() -> List[str]:
+            data = self.execute_query(f"SHOW SCHEMAS FROM {catalog_name}")
+            if isinstance(data, dict):
+                # Query didn't return results (unexpected for SHOW SCHEMAS)
+                raise RuntimeError(
+                    f"Expected list of results from SHOW SCHEMAS, but got status dict: {data}"
+                )
+            return [row["Schema"] for row in data]
+
+        return list(self._cached_metadata("schemas", (catalog_name,), _load))
 
     def list_tables(self, catalog: str, schema: str) -> List[str]:
         """List all tables in a schema."""
@@ -325,13 +880,20 @@ class TrinoClient:
         if not catalog_name or not schema_name:
             raise ValueError("Both catalog and schema must be specified")
 
-        data = self.execute_query(f"SHOW TABLES FROM {catalog_name}.{schema_name}")
-        if isinstance(data, dict):
-            # Query didn't return results (unexpected for SHOW TABLES)
-            raise RuntimeError(
-                f"Expected list of results from SHOW TABLES, but got status dict: {data}"
-            )
-        return [row["Table"] for row in data]
+        tables = self.schema_snapshot.tables(catalog_name, schema_name)
+        if tables is not None:
+            return tables
+
+        def _load() -> List[str]:
+            data = self.execute_query(f"SHOW TABLES FROM {catalog_name}.{schema_name}")
+            if isinstance(data, dict):
+                # Query didn't return results (unexpected for SHOW TABLES)
+                raise RuntimeError(
+                    f"Expected list of results from SHOW TABLES, but got status dict: {data}"
+                )
+            return [row["Table"] for row in data]
+
+        return list(self._cached_metadata("tables", (catalog_name, schema_name), _load))
 
     def describe_table(self, catalog: str, schema: str, table: str) -> str:
         """Describe the structure of a table."""
@@ -341,7 +903,14 @@ class TrinoClient:
         if not catalog_name or not schema_name:
             raise ValueError("Both catalog and schema must be specified")
 
-        return self.execute_query_json(f"DESCRIBE {catalog_name}.{schema_name}.{table}")
+        described = self.schema_snapshot.describe_json(catalog_name, schema_name, table)
+        if described is not None:
+            return described
+        return self._cached_metadata(
+            "columns",
+            (catalog_name, schema_name, table),
+            lambda: self.execute_query_json(f"DESCRIBE {catalog_name}.{schema_name}.{table}"),
+        )
 
     def show_create_table(self, catalog: str, schema: str, table: str) -> str:
         """Show the CREATE TABLE statement for a table."""
@@ -351,15 +920,18 @@ class TrinoClient:
         if not catalog_name or not schema_name:
             raise ValueError("Both catalog and schema must be specified")
 
-        data = self.execute_query(
-            f"SHOW CREATE TABLE {catalog_name}.{schema_name}.{table}"
-        )
-        if isinstance(data, dict):
-            # Query didn't return results (unexpected for SHOW CREATE TABLE)
-            raise RuntimeError(
-                f"Expected list of results from SHOW CREATE TABLE, but got status dict: {data}"
+        def _load() -> str:
+            data = self.execute_query(
+                f"SHOW CREATE TABLE {catalog_name}.{schema_name}.{table}"
             )
-        return data[0]["Create Table"] if data else ""
+            if isinstance(data, dict):
+                # Query didn't return results (unexpected for SHOW CREATE TABLE)
+                raise RuntimeError(
+                    f"Expected list of results from SHOW CREATE TABLE, but got status dict: {data}"
+                )
+            return data[0]["Create Table"] if data else ""
+
+        return self._cached_metadata("ddl", (catalog_name, schema_name, table), _load)
 
     def get_table_stats(self, catalog: str, schema: str, table: str) -> str:
         """Get statistics for a table."""
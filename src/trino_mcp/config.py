@@ -13,6 +13,9 @@ import trino.auth
 from dotenv import load_dotenv
 from requests import Session
 
+from .admission import CONCURRENCY_CLASSES
+from .cache import METADATA_KINDS
+
 logger = logging.getLogger(__name__)
 
 
@@ -119,6 +122,62 @@ class TrinoConfig:
     session_properties: Optional[dict] = None
     query_timeout_minutes: float = 5
     max_concurrent_queries: int = 1
+    concurrency_limits: Optional[dict] = None
+    queue_max_depth: int = 16
+    queue_max_wait_seconds: float = 30
+    queue_ordering: str = "fifo"
+    session_max_concurrent: int = 0
+    session_rate_limit: float = 0
+    session_rate_burst: int = 10
+    session_weights: Optional[dict] = None
+    connection_idle_timeout_seconds: float = 300
+    http_pool_connections: int = 10
+    http_pool_maxsize: int = 10
+    http_retries: int = 0
+    async_client: bool = False
+    result_cache_ttl_seconds: float = 0
+    result_cache_max_bytes: int = 64 * 1024 * 1024
+    metadata_cache_ttls: Optional[dict] = None
+    metadata_cache_negative_ttl_seconds: float = 30
+    metadata_cache_max_entries: int = 10_000
+    metadata_store_path: Optional[str] = None
+    metadata_store_refresh_seconds: float = 3600
+    max_query_length: int = 1_000_000
+    max_inline_rows: int = 0
+    result_buffer_ttl_seconds: float = 600
+    result_buffer_max_bytes: int = 256 * 1024 * 1024
+    result_buffer_max_rows: int = 100_000
+    spill_threshold_bytes: int = 16 * 1024 * 1024
+    spill_dir: Optional[str] = None
+    validation_executor: str = "thread"
+    validation_workers: int = 2
+    transport: str = "stdio"
+    mcp_host: str = "127.0.0.1"
+    mcp_port: int = 8000
+    mcp_allowed_hosts: Optional[list] = None
+
+
+def concurrency_limit(config: TrinoConfig, kind: str) -> int:
+    """Return the number of concurrent tool calls allowed in concurrency class *kind*."""
+    limit = (config.concurrency_limits or {}).get(kind, config.max_concurrent_queries)
+    return max(limit, 1)
+
+
+def connection_pool_size(config: TrinoConfig) -> int:
+    """Return how many Trino connections the client may open at once.
+
+    That is what the concurrency classes can use at once, plus one
+    connection for the background snapshot refresh when it is enabled.
+    The refresh is not admitted through a concurrency class, so it gets
+    its own connection rather than taking one an admitted call is owed.
+    """
+    if not config.concurrency_limits:
+        size = max(config.max_concurrent_queries, 1)
+    else:
+        size = sum(concurrency_limit(config, kind) for kind in CONCURRENCY_CLASSES)
+    if config.metadata_store_path and config.metadata_store_refresh_seconds > 0:
+        size += 1
+    return size
 
 
 def load_config(overrides: Optional[dict] = None) -> TrinoConfig:
@@ -309,9 +368,162 @@ def load_config(overrides: Optional[dict] = None) -> TrinoConfig:
     # Query timeout (minutes). 0 disables client-side timeout enforcement.
     query_timeout_minutes = float(_get("QUERY_TIMEOUT_MINUTES", "5"))
 
-    # Maximum number of concurrent tool calls. Additional calls are rejected
-    # immediately with an error message asking the caller to wait.
+    # Maximum number of concurrent tool calls per concurrency class (metadata,
+    # read, write, export). MAX_CONCURRENT_QUERIES applies to every class;
+    # CONCURRENCY_LIMITS (JSON) overrides individual classes, e.g.
+    # '{"metadata": 4, "export": 1}'. Up to QUEUE_MAX_DEPTH further calls per
+    # class wait up to QUEUE_MAX_WAIT_SECONDS for a slot, in arrival order
+    # ("fifo") or quick lookups first ("priority"); calls beyond that are
+    # rejected with an error message asking the caller to wait.
     max_concurrent_queries = int(_get("MAX_CONCURRENT_QUERIES", "1"))
+    concurrency_limits = {kind: max_concurrent_queries for kind in CONCURRENCY_CLASSES}
+    concurrency_limits_raw = _get("CONCURRENCY_LIMITS")
+    if concurrency_limits_raw:
+        try:
+            limit_overrides = json.loads(concurrency_limits_raw)
+            if not isinstance(limit_overrides, dict):
+                raise ValueError("CONCURRENCY_LIMITS must be a JSON object")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"CONCURRENCY_LIMITS must be valid JSON: {e}")
+        unknown = set(limit_overrides) - set(CONCURRENCY_CLASSES)
+        if unknown:
+            raise ValueError(
+                f"Unknown CONCURRENCY_LIMITS classes: {', '.join(sorted(unknown))} "
+                f"(expected: {', '.join(CONCURRENCY_CLASSES)})"
+            )
+        concurrency_limits.update({k: int(v) for k, v in limit_overrides.items()})
+    queue_max_depth = int(_get("QUEUE_MAX_DEPTH", "16"))
+    queue_max_wait_seconds = float(_get("QUEUE_MAX_WAIT_SECONDS", "30"))
+    queue_ordering = _get("QUEUE_ORDERING", "fifo").lower()
+    if queue_ordering not in ("fifo", "priority"):
+        raise ValueError(
+            f"Unsupported QUEUE_ORDERING: {queue_ordering} (expected: fifo, priority)"
+        )
+
+    # Fair sharing between MCP sessions (e.g. many agents on one HTTP server).
+    # Waiting calls are admitted by weighted fair queuing per session; a
+    # session may hold at most SESSION_MAX_CONCURRENT slots per class (0: no
+    # limit) and make SESSION_RATE_LIMIT calls per second after a burst of
+    # SESSION_RATE_BURST (0: no limit). SESSION_WEIGHTS (JSON) gives clients
+    # authenticated with an OAuth client id a larger or smaller share,
+    # e.g. '{"etl": 0.5}'.
+    session_max_concurrent = int(_get("SESSION_MAX_CONCURRENT", "0"))
+    session_rate_limit = float(_get("SESSION_RATE_LIMIT", "0"))
+    session_rate_burst = int(_get("SESSION_RATE_BURST", "10"))
+    session_weights = None
+    session_weights_raw = _get("SESSION_WEIGHTS")
+    if session_weights_raw:
+        try:
+            session_weights = json.loads(session_weights_raw)
+            if not isinstance(session_weights, dict):
+                raise ValueError("SESSION_WEIGHTS must be a JSON object")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"SESSION_WEIGHTS must be valid JSON: {e}")
+        session_weights = {str(k): float(v) for k, v in session_weights.items()}
+
+    # Queries longer than this are rejected before parsing (0 disables). Long
+    # queries are parsed for validation on a "thread" or "process" pool.
+    max_query_length = int(_get("MAX_QUERY_LENGTH", "1000000"))
+    validation_executor = _get("VALIDATION_EXECUTOR", "thread").lower()
+    if validation_executor not in ("thread", "process"):
+        raise ValueError(
+            f"Unsupported VALIDATION_EXECUTOR: {validation_executor} (expected: thread, process)"
+        )
+    validation_workers = int(_get("VALIDATION_WORKERS", "2"))
+
+    # MCP transport. "sse" and "streamable-http" serve many clients from one
+    # long-lived process, sharing its connection pool and caches.
+    transport = _get("MCP_TRANSPORT", "stdio").lower()
+    if transport not in ("stdio", "sse", "streamable-http"):
+        raise ValueError(
+            f"Unsupported MCP_TRANSPORT: {transport} (expected: stdio, sse, streamable-http)"
+        )
+    mcp_host = _get("MCP_HOST", "127.0.0.1")
+    mcp_port = int(_get("MCP_PORT", "8000"))
+    # Host names clients may use to reach the HTTP transports, comma-separated.
+    # Required when the HTTP transports listen beyond loopback, so that the
+    # Host/Origin checks guarding against DNS rebinding stay on; "*" turns
+    # the checks off explicitly.
+    mcp_allowed_hosts_raw = _get("MCP_ALLOWED_HOSTS")
+    mcp_allowed_hosts = (
+        [host.strip() for host in mcp_allowed_hosts_raw.split(",") if host.strip()]
+        if mcp_allowed_hosts_raw
+        else None
+    )
+    if (
+        transport != "stdio"
+        and mcp_host not in ("127.0.0.1", "localhost", "::1")
+        and not mcp_allowed_hosts
+    ):
+        raise ValueError(
+            f"MCP_ALLOWED_HOSTS is required when MCP_HOST is {mcp_host}: list the "
+            "host names clients use, or set it to '*' to accept any Host header"
+        )
+
+    # Maximum rows returned inline (not written to a file). 0 returns all rows.
+    max_inline_rows = int(_get("MAX_INLINE_ROWS", "0"))
+
+    # Buffer for results paged through by handle (execute_query_read_only
+    # with page_size, then fetch_more): TTL after last access, total size,
+    # and rows kept per result.
+    result_buffer_ttl_seconds = float(_get("RESULT_BUFFER_TTL_SECONDS", "600"))
+    result_buffer_max_bytes = int(_get("RESULT_BUFFER_MAX_BYTES", str(256 * 1024 * 1024)))
+    result_buffer_max_rows = int(_get("RESULT_BUFFER_MAX_ROWS", "100000"))
+
+    # Rows of a buffered result beyond this size are spilled to a temporary
+    # file in SPILL_DIR (default: the system temp directory). 0 never spills.
+    spill_threshold_bytes = int(_get("SPILL_THRESHOLD_BYTES", str(16 * 1024 * 1024)))
+    spill_dir = _get("SPILL_DIR") or None
+
+    # Pooled connections idle for longer than this are closed. 0 keeps them.
+    connection_idle_timeout_seconds = float(
+        _get("CONNECTION_IDLE_TIMEOUT_SECONDS", "300")
+    )
+
+    # HTTP keep-alive pool shared by all connections: number of hosts to
+    # keep sockets for, sockets kept per host, and connect-error retries.
+    http_pool_connections = int(_get("HTTP_POOL_CONNECTIONS", "10"))
+    http_pool_maxsize = int(_get("HTTP_POOL_MAXSIZE", "10"))
+    http_retries = int(_get("HTTP_RETRIES", "0"))
+
+    # Run queries on the asyncio REST client instead of worker threads.
+    async_client = _get("ASYNC_CLIENT", "false").lower() in ("true", "1", "yes")
+
+    # Cache for read-only query results. A TTL of 0 disables the cache.
+    result_cache_ttl_seconds = float(_get("RESULT_CACHE_TTL_SECONDS", "0"))
+    result_cache_max_bytes = int(_get("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+    # Metadata cache TTLs per object type. METADATA_CACHE_TTL_SECONDS applies
+    # to every type; METADATA_CACHE_TTLS (JSON) overrides individual types,
+    # e.g. '{"catalogs": 3600, "columns": 60}'. A TTL of 0 disables caching.
+    metadata_cache_ttl = float(_get("METADATA_CACHE_TTL_SECONDS", "0"))
+    metadata_cache_ttls = {kind: metadata_cache_ttl for kind in METADATA_KINDS}
+    metadata_cache_ttls_raw = _get("METADATA_CACHE_TTLS")
+    if metadata_cache_ttls_raw:
+        try:
+            ttl_overrides = json.loads(metadata_cache_ttls_raw)
+            if not isinstance(ttl_overrides, dict):
+                raise ValueError("METADATA_CACHE_TTLS must be a JSON object")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"METADATA_CACHE_TTLS must be valid JSON: {e}")
+        unknown = set(ttl_overrides) - set(METADATA_KINDS)
+        if unknown:
+            raise ValueError(
+                f"Unknown METADATA_CACHE_TTLS types: {', '.join(sorted(unknown))} "
+                f"(expected: {', '.join(METADATA_KINDS)})"
+            )
+        metadata_cache_ttls.update({k: float(v) for k, v in ttl_overrides.items()})
+    # How long "not found" errors for metadata lookups are cached.
+    metadata_cache_negative_ttl_seconds = float(
+        _get("METADATA_CACHE_NEGATIVE_TTL_SECONDS", "30")
+    )
+    # Upper bound on cached metadata entries; the least recently used go first.
+    metadata_cache_max_entries = int(_get("METADATA_CACHE_MAX_ENTRIES", "10000"))
+
+    # SQLite file that keeps schema snapshots across restarts, and how old a
+    # snapshot may get before it is refreshed in the background (0 never).
+    metadata_store_path = _get("METADATA_STORE_PATH") or None
+    metadata_store_refresh_seconds = float(_get("METADATA_STORE_REFRESH_SECONDS", "3600"))
 
     # Optional Trino session properties passed to the connection (JSON dict).
     # e.g. '{"query_max_run_time": "30s"}'
@@ -368,4 +580,37 @@ def load_config(overrides: Optional[dict] = None) -> TrinoConfig:
         session_properties=session_properties,
         query_timeout_minutes=query_timeout_minutes,
         max_concurrent_queries=max_concurrent_queries,
+        concurrency_limits=concurrency_limits,
+        queue_max_depth=queue_max_depth,
+        queue_max_wait_seconds=queue_max_wait_seconds,
+        queue_ordering=queue_ordering,
+        session_max_concurrent=session_max_concurrent,
+        session_rate_limit=session_rate_limit,
+        session_rate_burst=session_rate_burst,
+        session_weights=session_weights,
+        connection_idle_timeout_seconds=connection_idle_timeout_seconds,
+        http_pool_connections=http_pool_connections,
+        http_pool_maxsize=http_pool_maxsize,
+        http_retries=http_retries,
+        async_client=async_client,
+        result_cache_ttl_seconds=result_cache_ttl_seconds,
+        result_cache_max_bytes=result_cache_max_bytes,
+        metadata_cache_ttls=metadata_cache_ttls,
+        metadata_cache_negative_ttl_seconds=metadata_cache_negative_ttl_seconds,
+        metadata_cache_max_entries=metadata_cache_max_entries,
+        metadata_store_path=metadata_store_path,
+        metadata_store_refresh_seconds=metadata_store_refresh_seconds,
+        max_query_length=max_query_length,
+        max_inline_rows=max_inline_rows,
+        result_buffer_ttl_seconds=result_buffer_ttl_seconds,
+        result_buffer_max_bytes=result_buffer_max_bytes,
+        result_buffer_max_rows=result_buffer_max_rows,
+        spill_threshold_bytes=spill_threshold_bytes,
+        spill_dir=spill_dir,
+        validation_executor=validation_executor,
+        validation_workers=validation_workers,
+        transport=transport,
+        mcp_host=mcp_host,
+        mcp_port=mcp_port,
+        mcp_allowed_hosts=mcp_allowed_hosts,
     )
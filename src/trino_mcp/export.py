@@ -0,0 +1,445 @@
+"""Streaming writers for exporting query results to files.
+
+Each writer consumes an iterable of row batches (as produced by
+``TrinoClient.iter_query()``) and writes it incrementally, so exporting a
+result never requires holding the whole result in memory.
+"""
+
+import contextlib
+import csv
+import gzip
+import io
+import json
+import os
+import re
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+# File extension → output format. Anything not listed is written as JSON.
+_EXTENSION_FORMATS = {
+    ".csv": "csv",
+    ".jsonl": "ndjson",
+    ".ndjson": "ndjson",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+}
+
+# Formats written by pyarrow directly to a path rather than through a text file.
+_BINARY_FORMATS = ("parquet", "arrow")
+
+# Trailing suffix → compression applied on top of a text format,
+# e.g. "out.csv.gz" or "out.jsonl.zst".
+_COMPRESSION_SUFFIXES = {
+    ".gz": "gzip",
+    ".zst": "zstd",
+}
+
+# gzip's own default (9) is several times slower than 6 for a few percent
+# smaller output; exports are usually bandwidth- rather than space-bound.
+_GZIP_LEVEL = 6
+_ZSTD_LEVEL = 3
+
+
+def _split_compression(path: str) -> Tuple[str, Optional[str]]:
+    """Split a compression suffix off *path*, returning ``(path, compression)``."""
+    stem, ext = os.path.splitext(path)
+    compression = _COMPRESSION_SUFFIXES.get(ext.lower())
+    if compression is None:
+        return path, None
+    return stem, compression
+
+
+def output_format(path: str) -> str:
+    """Return the output format for *path*: csv, ndjson, parquet, arrow or json.
+
+    A trailing compression suffix is ignored, so ``out.csv.gz`` is CSV.
+    """
+    ext = os.path.splitext(_split_compression(path)[0])[1].lower()
+    return _EXTENSION_FORMATS.get(ext, "json")
+
+
+def output_compression(path: str) -> Optional[str]:
+    """Return the compression (``gzip`` or ``zstd``) implied by *path*, if any."""
+    return _split_compression(path)[1]
+
+
+def check_output_path(path: str) -> str:
+    """Validate that *path* names a supported output and return its format.
+
+    Raises:
+        ValueError: If a compression suffix is combined with a binary
+            format (Parquet and Arrow files are compressed internally).
+    """
+    fmt = output_format(path)
+    if fmt in _BINARY_FORMATS and output_compression(path):
+        raise ValueError(
+            f"{fmt.capitalize()} files are compressed internally; "
+            f"remove the compression suffix from {path!r}"
+        )
+    return fmt
+
+
+@contextlib.contextmanager
+def _remove_on_error(path: str) -> Iterator[None]:
+    """Remove the partially written file at *path* if the body raises."""
+    try:
+        yield
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(path)
+        raise
+
+
+def _import_zstandard() -> Any:
+    """Import zstandard, raising a helpful error if the optional extra is missing."""
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "zstandard is required for .zst output. "
+            "Install it with: pip install trino-mcp[zstd]"
+        )
+    return zstandard
+
+
+def _open_text(path: str, newline: Optional[str], compression: Optional[str]) -> TextIO:
+    """Open *path* as a UTF-8 text file, compressing on the fly if requested."""
+    if compression == "gzip":
+        return gzip.open(
+            path, "wt", compresslevel=_GZIP_LEVEL, encoding="utf-8", newline=newline
+        )
+    if compression == "zstd":
+        zstandard = _import_zstandard()
+        # threads=-1 compresses on one worker thread per CPU core, off the
+        # thread that is fetching and encoding rows.
+        compressor = zstandard.ZstdCompressor(level=_ZSTD_LEVEL, threads=-1)
+        binary = compressor.stream_writer(open(path, "wb"))
+        return io.TextIOWrapper(binary, encoding="utf-8", newline=newline)
+    return open(path, "w", encoding="utf-8", newline=newline)
+
+
+@contextlib.contextmanager
+def open_output(path: str) -> Iterator[TextIO]:
+    """Open *path* for writing in the text format and compression implied by its name.
+
+    The partial file is removed if writing fails.
+    """
+    fmt = output_format(path)
+    if fmt in _BINARY_FORMATS:
+        raise ValueError(f"Cannot open {fmt} output {path!r} as a text file")
+    # The csv module does its own line-ending handling.
+    newline = "" if fmt == "csv" else None
+    with _remove_on_error(path):
+        with _open_text(path, newline, output_compression(path)) as f:
+            yield f
+
+
+def write_file(
+    path: str,
+    description: Sequence[Sequence[Any]],
+    batches: Iterable[List[tuple]],
+    json_indent: Optional[int] = 2,
+) -> int:
+    """Write row batches to *path* in the format implied by its extension.
+
+    Text formats may carry a trailing ``.gz`` or ``.zst`` suffix
+    (e.g. ``out.csv.gz``) to be compressed as they are written.
+
+    Args:
+        path: Destination file path.
+        description: DB-API cursor description; ``(name, type_code, ...)``
+            per column. Only Parquet and Arrow use the type codes.
+        batches: Iterable of row-tuple batches.
+        json_indent: Indentation for ``.json`` output; ``None`` disables it.
+
+    Returns:
+        The number of rows written.
+    """
+    fmt = check_output_path(path)
+    if fmt in _BINARY_FORMATS:
+        writer = write_parquet if fmt == "parquet" else write_arrow
+        with _remove_on_error(path):
+            return writer(path, description, batches)
+    columns = [col[0] for col in description]
+    with open_output(path) as f:
+        return write_rows(f, fmt, columns, batches, json_indent=json_indent)
+
+
+def write_csv(f: TextIO, columns: List[str], batches: Iterable[List[tuple]]) -> int:
+    """Write a header row followed by every row, batch by batch.
+
+    Args:
+        f: Text file opened with ``newline=""``.
+        columns: Column names for the header row.
+        batches: Iterable of row-tuple batches.
+
+    Returns:
+        The number of rows written.
+    """
+    writer = csv.writer(f)
+    writer.writerow(columns)
+    row_count = 0
+    for batch in batches:
+        writer.writerows(batch)
+        row_count += len(batch)
+    return row_count
+
+
+def write_json(
+    f: TextIO,
+    columns: List[str],
+    batches: Iterable[List[tuple]],
+    indent: Optional[int] = 2,
+) -> int:
+    """Write rows as a JSON array of objects, one row at a time.
+
+    The output is byte-for-byte what ``json.dump(rows, f, default=str,
+    indent=indent)`` produces, but only a single row is ever encoded at
+    once. Pass ``indent=None`` for compact output.
+
+    Args:
+        f: Text file to write to.
+        columns: Column names used as object keys.
+        batches: Iterable of row-tuple batches.
+        indent: Indentation width, or ``None`` to disable pretty-printing.
+
+    Returns:
+        The number of rows written.
+    """
+    encoder = json.JSONEncoder(default=str, indent=indent)
+    if indent is None:
+        separator, newline, pad = ", ", "", ""
+    else:
+        pad = " " * indent
+        separator, newline = ",\n" + pad, "\n"
+
+    row_count = 0
+    f.write("[")
+    for batch in batches:
+        for row in batch:
+            chunk = encoder.encode(dict(zip(columns, row)))
+            if newline:
+                # Strings are escaped by the encoder, so every newline in the
+                # chunk is structural and can be re-indented one level deeper.
+                chunk = chunk.replace("\n", newline + pad)
+            f.write((newline + pad if row_count == 0 else separator) + chunk)
+            row_count += 1
+    f.write((newline if row_count else "") + "]")
+    return row_count
+
+
+def write_ndjson(f: TextIO, columns: List[str], batches: Iterable[List[tuple]]) -> int:
+    """Write rows as JSON Lines: one compact JSON object per line.
+
+    Args:
+        f: Text file to write to.
+        columns: Column names used as object keys.
+        batches: Iterable of row-tuple batches.
+
+    Returns:
+        The number of rows written.
+    """
+    encoder = json.JSONEncoder(default=str)
+    row_count = 0
+    for batch in batches:
+        f.writelines(encoder.encode(dict(zip(columns, row))) + "\n" for row in batch)
+        row_count += len(batch)
+    return row_count
+
+
+def write_rows(
+    f: TextIO,
+    fmt: str,
+    columns: List[str],
+    batches: Iterable[List[tuple]],
+    json_indent: Optional[int] = 2,
+) -> int:
+    """Write row batches to *f* in the given output format.
+
+    Returns:
+        The number of rows written.
+    """
+    if fmt == "csv":
+        return write_csv(f, columns, batches)
+    if fmt == "ndjson":
+        return write_ndjson(f, columns, batches)
+    return write_json(f, columns, batches, indent=json_indent)
+
+
+def _import_pyarrow(purpose: str, extra: str) -> Any:
+    """Import pyarrow, raising a helpful error if the optional extra is missing."""
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401 — registers the submodules on pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            f"pyarrow is required for {purpose}. "
+            f"Install it with: pip install trino-mcp[{extra}]"
+        )
+    return pyarrow
+
+
+_DECIMAL_RE = re.compile(r"decimal\((\d+),\s*(\d+)\)")
+
+
+def _arrow_type(pa: Any, type_code: Optional[str]) -> Optional[Any]:
+    """Map a Trino type name from ``cursor.description`` to an Arrow type.
+
+    Returns ``None`` for types without a lossless scalar mapping (arrays,
+    maps, rows, intervals, ...); those columns are written as JSON text.
+    """
+    if not isinstance(type_code, str):
+        return None
+    type_name = type_code.lower()
+    base = type_name.split("(", 1)[0].strip()
+
+    if base == "decimal":
+        match = _DECIMAL_RE.match(type_name)
+        if match:
+            return pa.decimal128(int(match.group(1)), int(match.group(2)))
+        return None
+    if base == "timestamp":
+        # The Python client yields datetimes, i.e. microsecond precision.
+        if type_name.endswith("with time zone"):
+            return pa.timestamp("us", tz="UTC")
+        return pa.timestamp("us")
+    if base == "time":
+        return None if type_name.endswith("with time zone") else pa.time64("us")
+
+    return {
+        "boolean": pa.bool_(),
+        "tinyint": pa.int8(),
+        "smallint": pa.int16(),
+        "integer": pa.int32(),
+        "bigint": pa.int64(),
+        "real": pa.float32(),
+        "double": pa.float64(),
+        "varchar": pa.string(),
+        "char": pa.string(),
+        "json": pa.string(),
+        "uuid": pa.string(),
+        "ipaddress": pa.string(),
+        "varbinary": pa.binary(),
+        "date": pa.date32(),
+    }.get(base)
+
+
+def _to_json_text(value: Any) -> Optional[str]:
+    """Serialize a value without an Arrow mapping the same way JSON export does."""
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, default=str)
+
+
+def _column_converters(
+    pa: Any, description: Sequence[Sequence[Any]]
+) -> List[Tuple[Any, Optional[Callable[[Any], Any]]]]:
+    """Return ``(arrow_field, value_converter)`` for every column."""
+    converters = []
+    for col in description:
+        name = col[0]
+        arrow_type = _arrow_type(pa, col[1] if len(col) > 1 else None)
+        if arrow_type is None:
+            converters.append((pa.field(name, pa.string()), _to_json_text))
+        elif pa.types.is_string(arrow_type):
+            # uuid/ipaddress values arrive as Python objects, not str.
+            converters.append(
+                (pa.field(name, arrow_type), lambda v: None if v is None else str(v))
+            )
+        else:
+            converters.append((pa.field(name, arrow_type), None))
+    return converters
+
+
+def _record_batches(
+    pa: Any, description: Sequence[Sequence[Any]], batches: Iterable[List[tuple]]
+) -> Tuple[Any, Iterator[Any]]:
+    """Return the Arrow schema for *description* and a lazy iterator of record batches.
+
+    Column types are taken from the Trino type names in ``description``, so
+    the schema is fixed up front and no values need to be inspected. Each
+    row-tuple batch is transposed into one record batch as it is pulled.
+    """
+    converters = _column_converters(pa, description)
+    schema = pa.schema([field for field, _ in converters])
+
+    def _convert() -> Iterator[Any]:
+        for rows in batches:
+            if not rows:
+                continue
+            arrays = []
+            for (field, convert), values in zip(converters, zip(*rows)):
+                if convert is not None:
+                    values = [convert(v) for v in values]
+                arrays.append(pa.array(values, type=field.type))
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    return schema, _convert()
+
+
+def record_batch_reader(
+    description: Sequence[Sequence[Any]], batches: Iterable[List[tuple]]
+) -> Any:
+    """Wrap row-tuple batches in a ``pyarrow.RecordBatchReader``.
+
+    Batches are converted lazily as the reader is consumed, so the reader
+    can be handed to pandas, polars or duckdb without materializing rows
+    as Python objects first.
+    """
+    pa = _import_pyarrow("Arrow output", "arrow")
+    schema, record_batches = _record_batches(pa, description, batches)
+    return pa.RecordBatchReader.from_batches(schema, record_batches)
+
+
+def write_parquet(
+    path: str, description: Sequence[Sequence[Any]], batches: Iterable[List[tuple]]
+) -> int:
+    """Write row batches to a Parquet file, one row group per batch.
+
+    Memory use is bounded by the size of a single batch.
+
+    Args:
+        path: Destination file path.
+        description: DB-API cursor description ``(name, type_code, ...)``.
+        batches: Iterable of row-tuple batches.
+
+    Returns:
+        The number of rows written.
+    """
+    pa = _import_pyarrow("Parquet output", "parquet")
+    schema, record_batches = _record_batches(pa, description, batches)
+
+    row_count = 0
+    with pa.parquet.ParquetWriter(path, schema) as writer:
+        for record_batch in record_batches:
+            writer.write_batch(record_batch)
+            row_count += record_batch.num_rows
+    return row_count
+
+
+def write_arrow(
+    path: str, description: Sequence[Sequence[Any]], batches: Iterable[List[tuple]]
+) -> int:
+    """Write row batches to an Arrow IPC file (Feather v2), one record batch per batch.
+
+    The file can be memory-mapped by consumers (``pyarrow.memory_map`` +
+    ``pyarrow.ipc.open_file``, or ``pandas.read_feather``) without parsing.
+
+    Args:
+        path: Destination file path.
+        description: DB-API cursor description ``(name, type_code, ...)``.
+        batches: Iterable of row-tuple batches.
+
+    Returns:
+        The number of rows written.
+    """
+    pa = _import_pyarrow("Arrow output", "arrow")
+    schema, record_batches = _record_batches(pa, description, batches)
+
+    row_count = 0
+    with pa.ipc.new_file(path, schema) as writer:
+        for record_batch in record_batches:
+            writer.write_batch(record_batch)
+            row_count += record_batch.num_rows
+    return row_count
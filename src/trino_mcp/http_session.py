@@ -0,0 +1,61 @@
+"""Shared HTTP keep-alive pool for Trino connections."""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class SharedHTTPAdapter(HTTPAdapter):
+    """``HTTPAdapter`` that can be mounted on many sessions at once.
+
+    ``trino.dbapi.Connection.close()`` closes its ``requests.Session``, which
+    closes every mounted adapter and with it the urllib3 pool of keep-alive
+    sockets. Because the adapter is shared by all pooled connections,
+    ``close()`` is a no-op here; call ``shutdown()`` to really release the
+    sockets once no session uses the adapter any more.
+    """
+
+    def close(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        """Close all pooled sockets."""
+        super().close()
+
+
+def create_http_adapter(
+    pool_connections: int = 10,
+    pool_maxsize: int = 10,
+    retries: int = 0,
+) -> SharedHTTPAdapter:
+    """Build the adapter shared by every Trino connection of a client.
+
+    Args:
+        pool_connections: Number of per-host socket pools to keep (the
+            coordinator, plus any hosts it redirects to).
+        pool_maxsize: Keep-alive sockets kept per host.
+        retries: Times a request is retried when the TCP/TLS connection
+            could not be established. Errors after the request was sent are
+            never retried here, since statement submission is not idempotent;
+            the trino client has its own retry logic for those.
+    """
+    max_retries = Retry(total=retries, read=False, backoff_factor=0.2)
+    return SharedHTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=max_retries,
+    )
+
+
+def new_session(adapter: HTTPAdapter, verify=True) -> requests.Session:
+    """Create a session that sends its requests through *adapter*.
+
+    Each Trino connection needs its own session because the trino client
+    writes per-connection headers and auth onto it; only the adapter, which
+    holds the keep-alive sockets, is shared.
+    """
+    session = requests.Session()
+    session.verify = verify
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -0,0 +1,154 @@
+"""Thread-safe pool of Trino connections."""
+
+import contextlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of reusable connections.
+
+    At most ``max_size`` connections exist at once (idle plus checked out).
+    ``acquire()`` hands out the most recently released idle connection, so
+    surplus connections sit unused and age out, or creates a new one while
+    under the limit; otherwise it blocks until a connection is released.
+
+    Idle connections older than ``idle_timeout`` seconds are closed rather
+    than reused. Trino connections have no cheap liveness probe, so a
+    connection is checked by using it: callers that see a connection fail
+    should release it with ``discard=True`` so it is closed and replaced on
+    the next checkout.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_size: int,
+        idle_timeout: Optional[float] = 300.0,
+    ):
+        """Initialize the pool.
+
+        Args:
+            factory: Callable that creates a new connection.
+            max_size: Maximum number of open connections.
+            idle_timeout: Seconds an idle connection may be kept before it
+                is evicted. ``None`` or ``0`` keeps idle connections forever.
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        # (connection, released_at), oldest first; checkouts pop from the end.
+        self._idle: List[Tuple[Any, float]] = []
+        self._size = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        """Number of open connections, idle or checked out."""
+        with self._cond:
+            return self._size
+
+    @property
+    def idle_count(self) -> int:
+        """Number of idle connections waiting to be checked out."""
+        with self._cond:
+            return len(self._idle)
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """Check out a connection, creating one if the pool is below ``max_size``.
+
+        Args:
+            timeout: Seconds to wait for a connection when the pool is
+                exhausted. ``None`` waits indefinitely.
+
+        Raises:
+            TimeoutError: If no connection became available within ``timeout``.
+            RuntimeError: If the pool has been closed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                self._evict_expired()
+                if self._idle:
+                    connection, _ = self._idle.pop()
+                    return connection
+                if self._size < self.max_size:
+                    # Reserve the slot, then connect outside the lock.
+                    self._size += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(
+                        f"No connection became available within {timeout:g}s "
+                        f"(pool size {self.max_size})"
+                    )
+                self._cond.wait(remaining)
+
+        try:
+            return self._factory()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, connection: Any, discard: bool = False) -> None:
+        """Return a checked-out connection to the pool.
+
+        Args:
+            connection: A connection obtained from ``acquire()``.
+            discard: Close the connection instead of keeping it for reuse,
+                e.g. after it failed or may still be in use by another thread.
+        """
+        with self._cond:
+            if discard or self._closed:
+                self._close(connection)
+            else:
+                self._idle.append((connection, time.monotonic()))
+                self._evict_expired()
+            self._cond.notify()
+
+    @contextlib.contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Check out a connection for the duration of a ``with`` block."""
+        connection = self.acquire(timeout=timeout)
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close(self) -> None:
+        """Close idle connections; checked-out ones are closed when released."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                connection, _ = self._idle.pop()
+                self._close(connection)
+            self._cond.notify_all()
+
+    def _evict_expired(self) -> None:
+        """Close idle connections that exceeded ``idle_timeout``. Caller holds the lock."""
+        if not self.idle_timeout:
+            return
+        cutoff = time.monotonic() - self.idle_timeout
+        while self._idle and self._idle[0][1] < cutoff:
+            connection, _ = self._idle.pop(0)
+            logger.debug("Evicting connection idle for over %gs", self.idle_timeout)
+            self._close(connection)
+
+    def _close(self, connection: Any) -> None:
+        """Close a connection and free its slot. Caller holds the lock."""
+        self._size -= 1
+        try:
+            connection.close()
+        except Exception:
+            logger.debug("Error closing pooled connection", exc_info=True)
@@ -0,0 +1,165 @@
+"""Server-side buffer of query results that callers page through by handle."""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from .spool import RowSpool
+
+
+@dataclass
+class BufferedResult:
+    """Rows of one query kept for paging."""
+
+    columns: List[str]
+    rows: RowSpool
+    # True if the query returned more rows than were buffered.
+    truncated: bool
+    size: int
+    expires_at: float
+
+
+class ResultBuffer:
+    """Thread-safe TTL buffer of query results with a byte-size LRU bound.
+
+    ``put()`` stores a result under a new random handle; ``page()`` returns
+    any slice of it, so a caller can page through a large result without
+    re-running the query. Sizes are estimated with ``row_size()``, i.e. the
+    memory the rows take as Python objects. A result that alone exceeds ``max_bytes`` keeps only the
+    rows that fit and is marked truncated; otherwise the least recently
+    used results are evicted to make room. Results expire ``ttl_seconds``
+    after they were last read.
+
+    Rows are held in ``RowSpool`` objects: with ``spill_bytes`` each result
+    keeps only that much in memory and spills the rest to a temporary file
+    in ``spill_dir``, so ``max_bytes`` bounds disk use rather than memory.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_bytes: int,
+        spill_bytes: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.spill_bytes = spill_bytes
+        self.spill_dir = spill_dir
+        # handle -> result; most recently used last.
+        self._results: "OrderedDict[str, BufferedResult]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._results)
+
+    @property
+    def size_bytes(self) -> int:
+        """Total estimated size of the buffered rows."""
+        with self._lock:
+            return self._size
+
+    def new_spool(self) -> RowSpool:
+        """Return an empty spool that ``put()`` will accept without trimming."""
+        return RowSpool(self.spill_bytes, self.spill_dir, max_bytes=self.max_bytes)
+
+    def put(
+        self,
+        columns: List[str],
+        rows: Union[RowSpool, Sequence[tuple]],
+        truncated: bool = False,
+    ) -> str:
+        """Buffer a result and return its handle.
+
+        *rows* is either a spool from ``new_spool()``, which the buffer
+        takes ownership of, or a sequence of rows.
+        """
+        if isinstance(rows, RowSpool):
+            spool = rows
+        else:
+            spool = self.new_spool()
+            if spool.extend(rows) < len(rows):
+                truncated = True
+
+        handle = secrets.token_hex(8)
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            while self._results and self._size + spool.size > self.max_bytes:
+                self._remove(next(iter(self._results)))
+            self._results[handle] = BufferedResult(
+                columns=list(columns),
+                rows=spool,
+                truncated=truncated,
+                size=spool.size,
+                expires_at=now + self.ttl_seconds,
+            )
+            self._size += spool.size
+        return handle
+
+    def get(self, handle: str) -> Optional[BufferedResult]:
+        """Return the result for *handle* and extend its TTL, or ``None``."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            result = self._results.get(handle)
+            if result is None:
+                return None
+            self._results.move_to_end(handle)
+            result.expires_at = now + self.ttl_seconds
+            return result
+
+    def page(self, handle: str, offset: int, limit: int) -> Optional[Dict[str, Any]]:
+        """Return up to *limit* rows of a result starting at *offset*.
+
+        Returns:
+            A dict with the handle, columns, offset, rows (as dicts), total
+            buffered row count, the offset of the next page (``None`` on the
+            last page) and whether the query returned more rows than were
+            buffered; ``None`` if the handle is unknown or expired.
+        """
+        if offset < 0 or limit < 1:
+            raise ValueError("offset must be >= 0 and limit must be >= 1")
+        result = self.get(handle)
+        if result is None:
+            return None
+        total = len(result.rows)
+        try:
+            rows = result.rows.slice(offset, limit)
+        except ValueError:
+            # Evicted or expired (and its spool closed) since get().
+            return None
+        end = offset + len(rows)
+        return {
+            "handle": handle,
+            "columns": result.columns,
+            "offset": offset,
+            "rows": [dict(zip(result.columns, row)) for row in rows],
+            "total_rows": total,
+            "next_offset": end if end < total else None,
+            "truncated": result.truncated,
+        }
+
+    def drop(self, handle: str) -> bool:
+        """Forget a result. Returns whether it was buffered."""
+        with self._lock:
+            if handle not in self._results:
+                return False
+            self._remove(handle)
+            return True
+
+    def _expire(self, now: float) -> None:
+        """Remove expired results. Caller holds the lock."""
+        for handle in [h for h, r in self._results.items() if r.expires_at <= now]:
+            self._remove(handle)
+
+    def _remove(self, handle: str) -> None:
+        """Remove *handle* and delete its spill file. Caller holds the lock."""
+        result = self._results.pop(handle)
+        result.rows.close()
+        self._size -= result.size
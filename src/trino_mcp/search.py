@@ -0,0 +1,173 @@
+"""In-memory fuzzy search over the tables and columns of a schema snapshot."""
+
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from .snapshot import SchemaSnapshot
+
+# Share of a query term's trigrams a name must contain to match it.
+MIN_SIMILARITY = 0.5
+
+_TERM_SPLIT = re.compile(r"[^0-9a-z]+")
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Return the trigrams of *text*; shorter text is its own single gram."""
+    if len(text) < 3:
+        return {text}
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """A table or column matching a search."""
+
+    kind: str  # "table" or "column"
+    catalog: str
+    schema: str
+    table: str
+    score: float
+    column: Optional[str] = None
+    data_type: Optional[str] = None
+
+    def __str__(self) -> str:
+        name = f"{self.catalog}.{self.schema}.{self.table}"
+        if self.kind == "column":
+            return f"{name}.{self.column} {self.data_type} (column)"
+        return f"{name} (table)"
+
+
+class SearchIndex:
+    """Trigram index over the table and column names in a ``SchemaSnapshot``.
+
+    Each distinct name is indexed once, however many tables share it, and
+    maps back to the tables or columns that carry it. A name matches a
+    query term when it contains at least ``MIN_SIMILARITY`` of the term's
+    trigrams, so substrings match fully and small typos still match.
+    Searching never queries Trino.
+
+    The index is rebuilt lazily on the first search after the snapshot
+    changes.
+    """
+
+    def __init__(self, snapshot: SchemaSnapshot):
+        self.snapshot = snapshot
+        self._version: Optional[int] = None
+        self._names: List[str] = []
+        # trigram -> ids of the names containing it
+        self._grams: Dict[str, List[int]] = {}
+        # name id -> (catalog, schema, table) of tables with that name
+        self._tables: Dict[int, List[Tuple[str, str, str]]] = {}
+        # name id -> (catalog, schema, table, column, type) of columns with that name
+        self._columns: Dict[int, List[Tuple[str, str, str, str, str]]] = {}
+        self._lock = threading.Lock()
+
+    def _build(self) -> None:
+        """Re-index the snapshot if it changed. Caller holds the lock."""
+        version, schemas = self.snapshot.contents()
+        if version == self._version:
+            return
+        ids: Dict[str, int] = {}
+        names: List[str] = []
+        tables: Dict[int, list] = defaultdict(list)
+        columns: Dict[int, list] = defaultdict(list)
+
+        def _id(name: str) -> int:
+            name_id = ids.get(name)
+            if name_id is None:
+                name_id = ids[name] = len(names)
+                names.append(name)
+            return name_id
+
+        for (catalog, schema), schema_tables in schemas.items():
+            for table, table_columns in schema_tables.items():
+                tables[_id(table.lower())].append((catalog, schema, table))
+                for column, data_type in table_columns:
+                    columns[_id(column.lower())].append(
+                        (catalog, schema, table, column, data_type)
+                    )
+
+        grams: Dict[str, List[int]] = defaultdict(list)
+        for name_id, name in enumerate(names):
+            for gram in _trigrams(name):
+                grams[gram].append(name_id)
+
+        self._names = names
+        self._grams = dict(grams)
+        self._tables = dict(tables)
+        self._columns = dict(columns)
+        self._version = version
+
+    def _match(self, term: str) -> Dict[int, float]:
+        """Return ``{name id: similarity}`` for the names matching *term*."""
+        if len(term) < 3:
+            return {i: 1.0 for i, name in enumerate(self._names) if term in name}
+        term_grams = _trigrams(term)
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in term_grams:
+            for name_id in self._grams.get(gram, ()):
+                shared[name_id] += 1
+        return {
+            name_id: count / len(term_grams)
+            for name_id, count in shared.items()
+            if count / len(term_grams) >= MIN_SIMILARITY
+        }
+
+    def search(self, query: str, limit: int = 50) -> List[SearchHit]:
+        """Find the tables and columns whose names best match *query*.
+
+        The query is split into terms on anything but letters and digits
+        (so ``daily revenue`` and ``daily_revenue`` are the same query). A
+        name's score is its average similarity over all terms; an exact
+        name match ranks first, then table names before column names, then
+        shorter names.
+
+        Args:
+            query: Words or a partial name to look for, e.g. ``revenue``.
+            limit: Maximum number of hits to return.
+
+        Returns:
+            The best hits, best first.
+        """
+        terms = [term for term in _TERM_SPLIT.split(query.lower()) if term]
+        if not terms:
+            return []
+        with self._lock:
+            self._build()
+            scores: Dict[int, float] = defaultdict(float)
+            for term in terms:
+                for name_id, similarity in self._match(term).items():
+                    scores[name_id] += similarity / len(terms)
+            exact = "_".join(terms)
+            for name_id in scores:
+                if self._names[name_id] == exact:
+                    scores[name_id] += 1
+            ranked = sorted(
+                (name_id for name_id, score in scores.items() if score >= MIN_SIMILARITY),
+                key=lambda name_id: (
+                    -scores[name_id],
+                    name_id not in self._tables,
+                    len(self._names[name_id]),
+                    self._names[name_id],
+                ),
+            )
+
+            # Expand only the best names, since a common one such as "id"
+            # may be carried by most tables.
+            hits: List[SearchHit] = []
+            for name_id in ranked:
+                score = scores[name_id]
+                for catalog, schema, table in self._tables.get(name_id, ()):
+                    hits.append(SearchHit("table", catalog, schema, table, score))
+                for catalog, schema, table, column, data_type in self._columns.get(name_id, ()):
+                    if len(hits) >= limit:
+                        break
+                    hits.append(
+                        SearchHit("column", catalog, schema, table, score, column, data_type)
+                    )
+                if len(hits) >= limit:
+                    break
+        return hits[:limit]
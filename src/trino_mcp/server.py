@@ -2,15 +2,32 @@
 
 import argparse
 import asyncio
+import json
 import logging
+import multiprocessing
 import sys
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Annotated, Optional
 
+from mcp.server.auth.middleware.auth_context import get_access_token
 from mcp.server.fastmcp import FastMCP
+from mcp.server.transport_security import TransportSecuritySettings
 from pydantic import Field
 
-from .config import load_config
-from .client import QueryTimeoutError, TrinoClient
+from .config import concurrency_limit, load_config
+from .admission import (
+    CONCURRENCY_CLASSES,
+    AdmissionError,
+    AdmissionQueue,
+    RateLimiter,
+    RateLimitError,
+    Slot,
+)
+from .cache import ResultCache
+from .client import _NO_OUTPUT_STATUS, QueryTimeoutError, TrinoClient
+from .results import ResultBuffer
+from .utils import derive_query_facts, normalize_query, remember_query_facts
 from .utils import is_read_only_query as _is_read_only_query
 
 # Setup logging
@@ -24,8 +41,19 @@ logger = logging.getLogger(__name__)
 # Module-level config and client — initialized in main() after CLI args are parsed.
 # When imported as a library (e.g. in tests), callers may set these directly.
 config = None
-client = None
-_query_semaphore = None  # Initialized in _init_config()
+client = None  # Created on the first tool call by _get_client()
+async_client = None  # Created with client when ASYNC_CLIENT is enabled
+result_cache = None  # Set in _init_config() when RESULT_CACHE_TTL_SECONDS > 0
+result_buffer = None  # Initialized in _init_config(); holds results paged by handle
+_admission_queues = {}  # Initialized in _init_config(); concurrency class -> AdmissionQueue
+_rate_limiter = None  # Set in _init_config() when SESSION_RATE_LIMIT is set
+_snapshot_refresh_stop = None  # Set by _get_client() when METADATA_STORE_PATH is set
+_client_lock = threading.Lock()
+_validation_executor = None  # Initialized in _init_config()
+
+# Queries up to this length parse in about a millisecond and are validated
+# inline; longer ones are analysed on _validation_executor.
+_INLINE_VALIDATION_CHARS = 4096
 
 # Initialize MCP server
 mcp = FastMCP(
@@ -57,6 +85,40 @@ _CLI_TO_ENV = {
     "session_properties": "TRINO_SESSION_PROPERTIES",
     "query_timeout_minutes": "QUERY_TIMEOUT_MINUTES",
     "max_concurrent_queries": "MAX_CONCURRENT_QUERIES",
+    "concurrency_limits": "CONCURRENCY_LIMITS",
+    "queue_max_depth": "QUEUE_MAX_DEPTH",
+    "queue_max_wait_seconds": "QUEUE_MAX_WAIT_SECONDS",
+    "queue_ordering": "QUEUE_ORDERING",
+    "session_max_concurrent": "SESSION_MAX_CONCURRENT",
+    "session_rate_limit": "SESSION_RATE_LIMIT",
+    "session_rate_burst": "SESSION_RATE_BURST",
+    "session_weights": "SESSION_WEIGHTS",
+    "connection_idle_timeout_seconds": "CONNECTION_IDLE_TIMEOUT_SECONDS",
+    "http_pool_connections": "HTTP_POOL_CONNECTIONS",
+    "http_pool_maxsize": "HTTP_POOL_MAXSIZE",
+    "http_retries": "HTTP_RETRIES",
+    "async_client": "ASYNC_CLIENT",
+    "result_cache_ttl_seconds": "RESULT_CACHE_TTL_SECONDS",
+    "result_cache_max_bytes": "RESULT_CACHE_MAX_BYTES",
+    "metadata_cache_ttl_seconds": "METADATA_CACHE_TTL_SECONDS",
+    "metadata_cache_ttls": "METADATA_CACHE_TTLS",
+    "metadata_cache_negative_ttl_seconds": "METADATA_CACHE_NEGATIVE_TTL_SECONDS",
+    "metadata_cache_max_entries": "METADATA_CACHE_MAX_ENTRIES",
+    "metadata_store_path": "METADATA_STORE_PATH",
+    "metadata_store_refresh_seconds": "METADATA_STORE_REFRESH_SECONDS",
+    "max_query_length": "MAX_QUERY_LENGTH",
+    "max_inline_rows": "MAX_INLINE_ROWS",
+    "result_buffer_ttl_seconds": "RESULT_BUFFER_TTL_SECONDS",
+    "result_buffer_max_bytes": "RESULT_BUFFER_MAX_BYTES",
+    "result_buffer_max_rows": "RESULT_BUFFER_MAX_ROWS",
+    "spill_threshold_bytes": "SPILL_THRESHOLD_BYTES",
+    "spill_dir": "SPILL_DIR",
+    "validation_executor": "VALIDATION_EXECUTOR",
+    "validation_workers": "VALIDATION_WORKERS",
+    "transport": "MCP_TRANSPORT",
+    "host": "MCP_HOST",
+    "port": "MCP_PORT",
+    "allowed_hosts": "MCP_ALLOWED_HOSTS",
 }
 
 
@@ -71,6 +133,32 @@ def _build_arg_parser() -> argparse.ArgumentParser:
         description="Trino MCP Server — Model Context Protocol server for Trino.",
     )
 
+    # MCP transport
+    parser.add_argument(
+        "--transport",
+        help="How MCP clients connect: stdio, sse or streamable-http. The HTTP "
+             "transports let many clients share one server. (default: stdio) "
+             "(MCP_TRANSPORT)",
+    )
+    parser.add_argument(
+        "--host",
+        help="Address the sse and streamable-http transports listen on. "
+             "(default: 127.0.0.1) (MCP_HOST)",
+    )
+    parser.add_argument(
+        "--port",
+        help="Port the sse and streamable-http transports listen on. "
+             "(default: 8000) (MCP_PORT)",
+    )
+    parser.add_argument(
+        "--allowed-hosts",
+        help="Comma-separated host names clients may use in the Host header, "
+             "e.g. 'trino-mcp.internal,10.0.0.5'. Other hosts are rejected. "
+             "Required when --host is not a loopback address; '*' accepts any "
+             "host and turns off DNS-rebinding protection. "
+             "(default: localhost only) (MCP_ALLOWED_HOSTS)",
+    )
+
     # Connection
     parser.add_argument("--trino-host", help="Trino host (default: localhost) (TRINO_HOST)")
     parser.add_argument("--trino-port", help="Trino port (default: 8080) (TRINO_PORT)")
@@ -129,8 +217,178 @@ def _build_arg_parser() -> argparse.ArgumentParser:
     # Concurrency
     parser.add_argument(
         "--max-concurrent-queries",
-        help="Maximum number of concurrent tool calls. Excess calls are rejected "
-             "immediately. (default: 1) (MAX_CONCURRENT_QUERIES)",
+        help="Maximum number of concurrent tool calls of each class (metadata, "
+             "read, write, export). Excess calls wait in a queue. (default: 1) "
+             "(MAX_CONCURRENT_QUERIES)",
+    )
+    parser.add_argument(
+        "--concurrency-limits",
+        help="JSON object of per-class limits overriding --max-concurrent-queries; "
+             "classes: metadata, read, write, export "
+             "(e.g. '{\"metadata\": 4, \"export\": 1}') (CONCURRENCY_LIMITS)",
+    )
+    parser.add_argument(
+        "--queue-max-depth",
+        help="Maximum number of tool calls of each class waiting for a slot; "
+             "further calls are rejected. (default: 16) (QUEUE_MAX_DEPTH)",
+    )
+    parser.add_argument(
+        "--queue-max-wait-seconds",
+        help="How long a queued tool call waits for a slot before it is rejected; "
+             "0 rejects immediately. (default: 30) (QUEUE_MAX_WAIT_SECONDS)",
+    )
+    parser.add_argument(
+        "--queue-ordering",
+        help="Admit queued calls in arrival order (fifo), or quick lookups before "
+             "scans of the same class (priority). (default: fifo) (QUEUE_ORDERING)",
+    )
+    parser.add_argument(
+        "--session-max-concurrent",
+        help="Maximum number of concurrent tool calls of each class per MCP session; "
+             "0 for no per-session limit. (default: 0) (SESSION_MAX_CONCURRENT)",
+    )
+    parser.add_argument(
+        "--session-rate-limit",
+        help="Maximum tool calls per second per MCP session, averaged over "
+             "--session-rate-burst calls; 0 disables. (default: 0) (SESSION_RATE_LIMIT)",
+    )
+    parser.add_argument(
+        "--session-rate-burst",
+        help="Tool calls a session may make at once before --session-rate-limit "
+             "applies. (default: 10) (SESSION_RATE_BURST)",
+    )
+    parser.add_argument(
+        "--session-weights",
+        help="JSON object of fair-share weights by authenticated OAuth client id "
+             "(default 1 each) "
+             "(e.g. '{\"etl-agent\": 0.5, \"analyst\": 2}') (SESSION_WEIGHTS)",
+    )
+    parser.add_argument(
+        "--connection-idle-timeout-seconds",
+        help="Close pooled Trino connections idle for longer than this many "
+             "seconds. 0 keeps them open. (default: 300) "
+             "(CONNECTION_IDLE_TIMEOUT_SECONDS)",
+    )
+    parser.add_argument(
+        "--http-pool-connections",
+        help="Number of hosts to keep HTTP keep-alive sockets for. "
+             "(default: 10) (HTTP_POOL_CONNECTIONS)",
+    )
+    parser.add_argument(
+        "--http-pool-maxsize",
+        help="Keep-alive sockets kept per host, shared by all connections. "
+             "(default: 10) (HTTP_POOL_MAXSIZE)",
+    )
+    parser.add_argument(
+        "--http-retries",
+        help="Retries when an HTTP connection to Trino cannot be established. "
+             "(default: 0) (HTTP_RETRIES)",
+    )
+    parser.add_argument(
+        "--async-client",
+        help="Run queries on the asyncio REST client instead of worker threads: "
+             "true/false. Not supported with OAUTH2. (default: false) (ASYNC_CLIENT)",
+    )
+
+    # Inline results
+    parser.add_argument(
+        "--max-inline-rows",
+        help="Return at most this many rows inline; SELECTs get a LIMIT and "
+             "longer results are truncated with a note. File exports are not "
+             "limited. 0 disables. (default: 0) (MAX_INLINE_ROWS)",
+    )
+    parser.add_argument(
+        "--result-buffer-ttl-seconds",
+        help="Keep paged results (page_size / fetch_more) for this many seconds "
+             "after they were last read. (default: 600) (RESULT_BUFFER_TTL_SECONDS)",
+    )
+    parser.add_argument(
+        "--result-buffer-max-bytes",
+        help="Maximum total size of paged results kept by the server. "
+             "(default: 268435456) (RESULT_BUFFER_MAX_BYTES)",
+    )
+    parser.add_argument(
+        "--result-buffer-max-rows",
+        help="Maximum number of rows kept for each paged result. "
+             "(default: 100000) (RESULT_BUFFER_MAX_ROWS)",
+    )
+    parser.add_argument(
+        "--spill-threshold-bytes",
+        help="Spill rows of a paged result beyond this size to a temporary file; "
+             "0 keeps them in memory. (default: 16777216) (SPILL_THRESHOLD_BYTES)",
+    )
+    parser.add_argument(
+        "--spill-dir",
+        help="Directory for spilled result files. "
+             "(default: system temp directory) (SPILL_DIR)",
+    )
+
+    # Query validation
+    parser.add_argument(
+        "--max-query-length",
+        help="Reject queries longer than this many characters without parsing "
+             "them. 0 disables the limit. (default: 1000000) (MAX_QUERY_LENGTH)",
+    )
+    parser.add_argument(
+        "--validation-executor",
+        help="Where long queries are parsed for validation: thread or process. "
+             "Processes parse in parallel despite the GIL. (default: thread) "
+             "(VALIDATION_EXECUTOR)",
+    )
+    parser.add_argument(
+        "--validation-workers",
+        help="Number of validation threads or processes. (default: 2) "
+             "(VALIDATION_WORKERS)",
+    )
+
+    # Result cache
+    parser.add_argument(
+        "--result-cache-ttl-seconds",
+        help="Cache read-only query results for this many seconds. 0 disables "
+             "the cache. (default: 0) (RESULT_CACHE_TTL_SECONDS)",
+    )
+    parser.add_argument(
+        "--result-cache-max-bytes",
+        help="Maximum total size of cached query results in bytes. "
+             "(default: 67108864) (RESULT_CACHE_MAX_BYTES)",
+    )
+
+    # Metadata cache
+    parser.add_argument(
+        "--metadata-cache-ttl-seconds",
+        help="Cache catalog, schema and table listings and table descriptions "
+             "for this many seconds. 0 disables the cache. (default: 0) "
+             "(METADATA_CACHE_TTL_SECONDS)",
+    )
+    parser.add_argument(
+        "--metadata-cache-ttls",
+        help="JSON object of per-type TTLs overriding --metadata-cache-ttl-seconds; "
+             "types: catalogs, schemas, tables, columns, ddl "
+             "(e.g. '{\"catalogs\": 3600, \"columns\": 60}') (METADATA_CACHE_TTLS)",
+    )
+    parser.add_argument(
+        "--metadata-cache-negative-ttl-seconds",
+        help="Cache 'not found' errors from metadata lookups for this many "
+             "seconds. (default: 30) (METADATA_CACHE_NEGATIVE_TTL_SECONDS)",
+    )
+    parser.add_argument(
+        "--metadata-cache-max-entries",
+        help="Maximum number of cached metadata entries; the least recently "
+             "used are evicted first. (default: 10000) (METADATA_CACHE_MAX_ENTRIES)",
+    )
+
+    # Persistent schema snapshots
+    parser.add_argument(
+        "--metadata-store-path",
+        help="SQLite file that keeps schema snapshots across restarts; they are "
+             "loaded at startup (e.g. ~/.cache/trino-mcp/metadata.db) "
+             "(METADATA_STORE_PATH)",
+    )
+    parser.add_argument(
+        "--metadata-store-refresh-seconds",
+        help="Re-snapshot stored schemas in the background once they are older "
+             "than this many seconds. 0 disables refreshing. (default: 3600) "
+             "(METADATA_STORE_REFRESH_SECONDS)",
     )
 
     return parser
@@ -149,6 +407,19 @@ def _cli_args_to_overrides(args: argparse.Namespace) -> dict:
 # _is_read_only_query is imported from .utils
 
 
+async def _call_client(method: str, *args):
+    """Call a client method without blocking the event loop.
+
+    Uses the ``AsyncTrinoClient`` when enabled, so the query costs no
+    thread while it runs; otherwise the blocking ``TrinoClient`` method is
+    run in a worker thread.
+    """
+    trino_client = client if client is not None else await asyncio.to_thread(_get_client)
+    if async_client is not None:
+        return await getattr(async_client, method)(*args)
+    return await asyncio.to_thread(getattr(trino_client, method), *args)
+
+
 def _parse_table_identifier(table: str, catalog: str, schema: str) -> tuple:
     """Parse a table identifier that may be fully qualified.
 
@@ -178,17 +449,112 @@ def _parse_table_identifier(table: str, catalog: str, schema: str) -> tuple:
         return (catalog, schema, table)
 
 
-async def _try_execute_query(query: str, output_file: str = "") -> str:
+def _create_validation_executor(kind: str, workers: int) -> Executor:
+    """Create the executor that long queries are parsed on."""
+    if kind == "process":
+        # Spawned workers do not inherit the server's threads or sockets.
+        return ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="trino-mcp-validate")
+
+
+def _row_limits() -> tuple:
+    """Row limits the client may apply to a query with ``limit_query()``.
+
+    ``TrinoClient.fetch_rows()`` and ``fetch_into()`` ask for one row more
+    than they keep, to tell whether the result was truncated.
+    """
+    return tuple(
+        max_rows + 1
+        for max_rows in (config.max_inline_rows, config.result_buffer_max_rows)
+        if max_rows > 0
+    )
+
+
+async def _analyze_query(query: str) -> None:
+    """Parse a long *query* once, without blocking the event loop.
+
+    Short queries are left to the checks themselves, which parse them
+    inline. Longer ones are analysed by ``derive_query_facts()`` on the
+    validation executor (or a worker thread if there is none), and the
+    results are cached in this process. The read-only check, result cache
+    key, DDL invalidation and row limit that follow are then cache hits,
+    even when the executor is a process pool whose caches are separate.
+
+    If the executor fails (e.g. a worker process died), the query is
+    analysed in a worker thread instead and the executor is recreated.
+    """
+    global _validation_executor
+    if len(query) <= _INLINE_VALIDATION_CHARS:
+        return
+    row_limits = _row_limits() if config is not None else ()
+    executor = _validation_executor
+    facts = None
+    if executor is not None:
+        try:
+            facts = await asyncio.get_running_loop().run_in_executor(
+                executor, derive_query_facts, query, row_limits
+            )
+        except Exception:
+            logger.warning("Validation executor failed; validating in a thread", exc_info=True)
+            if _validation_executor is executor and config is not None:
+                executor.shutdown(wait=False)
+                _validation_executor = _create_validation_executor(
+                    config.validation_executor, config.validation_workers
+                )
+    if facts is None:
+        facts = await asyncio.to_thread(derive_query_facts, query, row_limits)
+    remember_query_facts(facts)
+
+
+def _query_length_error(query: str) -> Optional[str]:
+    """Return an error message if *query* exceeds ``MAX_QUERY_LENGTH``."""
+    limit = config.max_query_length if config is not None else 0
+    if limit and len(query) > limit:
+        logger.warning(f"Query of {len(query)} characters rejected")
+        return (
+            f"Error: The query is {len(query)} characters long, which exceeds the "
+            f"limit of {limit} (MAX_QUERY_LENGTH). Simplify the query or split it up."
+        )
+    return None
+
+
+def _result_cache_key(query: str) -> Optional[tuple]:
+    """Return the result cache key for *query*, or ``None`` if caching is off.
+
+    The key combines the normalized SQL with everything else that decides
+    what the query returns: the default catalog/schema and session properties.
+    """
+    if result_cache is None:
+        return None
+    session_properties = sorted((config.session_properties or {}).items())
+    return (
+        normalize_query(query),
+        config.catalog,
+        config.schema,
+        tuple((name, str(value)) for name, value in session_properties),
+    )
+
+
+async def _try_execute_query(
+    query: str, output_file: str = "", cache_key: Optional[tuple] = None
+) -> str:
     """Common function to execute a query.
 
     Args:
         query: The SQL query to execute
         output_file: If provided, write results directly to this file path.
                      The output format is derived from the file extension:
-                     ".csv" writes CSV, ".json" (or any other extension) writes JSON.
+                     ".csv" writes CSV, ".jsonl"/".ndjson" write JSON Lines,
+                     ".parquet" writes Parquet, ".arrow"/".feather" write Arrow
+                     IPC, ".json" (or any other extension) writes JSON. Text
+                     formats may add ".gz"/".zst" for compressed output.
                      The data is written server-side and is NOT returned to the caller,
                      preventing the AI from ever receiving the raw values. This enables
                      subsequent processing by other tools without LLM hallucination.
+        cache_key: If provided, a successful result is stored in the result
+                   cache under this key (see ``_result_cache_key``).
 
     Returns:
         When output_file is set: a confirmation message with the row count.
@@ -196,11 +562,26 @@ async def _try_execute_query(query: str, output_file: str = "") -> str:
     """
     try:
         if output_file:
-            row_count = await asyncio.to_thread(client.execute_query_to_file, query, output_file)
+            trino_client = await asyncio.to_thread(_get_client)
+            row_count = await asyncio.to_thread(
+                trino_client.execute_query_to_file, query, output_file
+            )
             logger.debug(f"Query results written to {output_file} ({row_count} row(s))")
             return f"Query results written to '{output_file}' ({row_count} row(s))."
-        result = await asyncio.to_thread(client.execute_query_json, query)
+        max_rows = config.max_inline_rows if config is not None else 0
+        if max_rows > 0:
+            result, truncated = await _call_client("execute_query_json_limited", query, max_rows)
+            if truncated:
+                result += (
+                    f"\n\nNote: results truncated to the first {max_rows} row(s) "
+                    "(MAX_INLINE_ROWS). Add filters, aggregation or a LIMIT, or pass "
+                    "output_file to export every row."
+                )
+        else:
+            result = await _call_client("execute_query_json", query)
         logger.debug("Query executed successfully")
+        if cache_key is not None:
+            result_cache.put(cache_key, result)
         return result
     except QueryTimeoutError as e:
         logger.warning(f"Query timed out: {str(e)}")
@@ -210,24 +591,145 @@ async def _try_execute_query(query: str, output_file: str = "") -> str:
         return f"Error executing query: {str(e)}"
 
 
-def _concurrency_limit_message() -> str:
-    """Return the error message when all concurrent query slots are in use."""
-    n = config.max_concurrent_queries if config else 1
-    return (
-        f"Error: All {n} concurrent query slot(s) are in use. "
-        "Please wait for the previous tool call to complete before retrying."
+def _page_limit(limit: int) -> int:
+    """Clamp a requested page size to ``MAX_INLINE_ROWS``, if set."""
+    max_rows = config.max_inline_rows if config is not None else 0
+    return min(limit, max_rows) if max_rows > 0 else limit
+
+
+def _format_page(page: dict) -> str:
+    """Render a page of a buffered result, with a hint for the next call."""
+    text = json.dumps(page, default=str, indent=2)
+    if page["next_offset"] is not None:
+        text += (
+            f"\n\nMore rows available: call fetch_more with handle='{page['handle']}' "
+            f"and offset={page['next_offset']}."
+        )
+    return text
+
+
+async def _execute_paged(query: str, page_size: int) -> str:
+    """Run *query*, buffer its rows and return the first page with a handle."""
+    if result_buffer is None:
+        return "Error: Result paging is not available (the server is not initialised)."
+    spool = result_buffer.new_spool()
+    try:
+        columns, truncated = await _call_client(
+            "fetch_into", query, spool, config.result_buffer_max_rows
+        )
+    except QueryTimeoutError as e:
+        spool.close()
+        logger.warning(f"Query timed out: {str(e)}")
+        return f"Error: {str(e)}"
+    except Exception as e:
+        spool.close()
+        logger.error(f"Error executing query: {str(e)}", exc_info=True)
+        return f"Error executing query: {str(e)}"
+    if columns is None:
+        spool.close()
+        return json.dumps(dict(_NO_OUTPUT_STATUS), default=str, indent=2)
+    handle = result_buffer.put(columns, spool, truncated)
+    logger.debug(
+        f"Buffered {len(spool)} row(s) under handle {handle}"
+        + (" (spilled to disk)" if spool.spilled else "")
+    )
+    return _format_page(result_buffer.page(handle, 0, _page_limit(page_size)))
+
+
+# Admission priorities within a concurrency class (lower is admitted first
+# with QUEUE_ORDERING=priority). Quick lookups usually unblock an agent's
+# next step, so they go before calls that scan whole tables or schemas.
+_PRIORITY_LOOKUP = 0
+_PRIORITY_SCAN = 1
+
+
+def _create_admission_queues(cfg) -> dict:
+    """Create one admission queue per concurrency class."""
+    return {
+        kind: AdmissionQueue(
+            concurrency_limit(cfg, kind),
+            max_depth=cfg.queue_max_depth,
+            max_wait_seconds=cfg.queue_max_wait_seconds,
+            ordering=cfg.queue_ordering,
+            name=f"{kind} query",
+            session_max_concurrent=cfg.session_max_concurrent,
+        )
+        for kind in CONCURRENCY_CLASSES
+    }
+
+
+def _session_key() -> Optional[str]:
+    """Identify the caller of the current tool call, for admission and rate limits.
+
+    A client authenticated by the HTTP transport is keyed by its OAuth
+    client id, so its reconnects share one allowance; otherwise each MCP
+    session (one client connection) is its own key. The client id a
+    request may carry in ``_meta`` is never used: the client picks it, so
+    a connection could send a new one with every call to escape its
+    limits. ``None`` outside a request.
+    """
+    ctx = mcp.get_context()
+    try:
+        request_context = ctx.request_context
+    except ValueError:
+        return None
+    token = get_access_token()
+    if token is not None:
+        return f"client-{token.client_id}"
+    return f"session-{id(request_context.session):x}"
+
+
+def _session_weight() -> float:
+    """Return the fair-share weight of the calling client from ``SESSION_WEIGHTS``.
+
+    Weights are looked up by authenticated OAuth client id only, so a
+    client cannot claim another's share; everyone else has weight 1.
+    """
+    token = get_access_token()
+    if token is None or config is None or not config.session_weights:
+        return 1.0
+    return config.session_weights.get(token.client_id, 1.0)
+
+
+async def _acquire_slot(kind: str, priority: int) -> Slot:
+    """Wait for a slot of concurrency class *kind* on behalf of the calling session.
+
+    Raises:
+        AdmissionError: If the session is over its rate limit, or no slot
+            could be given in time.
+    """
+    session = _session_key()
+    if _rate_limiter is not None:
+        retry_after = _rate_limiter.acquire(session)
+        if retry_after > 0:
+            raise RateLimitError(
+                f"This session exceeded its limit of {_rate_limiter.rate:g} tool call(s) "
+                f"per second. Retry in {retry_after:.1f} second(s).",
+                retry_after,
+            )
+    return await _admission_queues[kind].acquire(
+        priority, session=session, weight=_session_weight()
     )
 
 
+def _admission_error_message(error: AdmissionError) -> str:
+    """Return the error message for a call that was not given a query slot."""
+    if isinstance(error, RateLimitError):
+        return f"Error: {error}"
+    return f"Error: {error} Please wait for a previous tool call to complete before retrying."
+
+
 @mcp.tool()
 async def list_catalogs() -> str:
     """List all available Trino catalogs."""
-    if _query_semaphore is not None and _query_semaphore.locked():
-        return _concurrency_limit_message()
-    async with _query_semaphore:
+    try:
+        slot = await _acquire_slot("metadata", _PRIORITY_LOOKUP)
+    except AdmissionError as e:
+        return _admission_error_message(e)
+    async with slot:
         logger.info("Listing catalogs...")
         try:
-            catalogs = await asyncio.to_thread(client.list_catalogs)
+            catalogs = await _call_client("list_catalogs")
             logger.debug(f"Found {len(catalogs)} catalogs")
             return "\n".join(catalogs)
         except QueryTimeoutError as e:
@@ -245,12 +747,14 @@ async def list_schemas(catalog: str = Field(description="The catalog name")) ->
     Args:
         catalog: The name of the catalog to list schemas from
     """
-    if _query_semaphore is not None and _query_semaphore.locked():
-        return _concurrency_limit_message()
-    async with _query_semaphore:
+    try:
+        slot = await _acquire_slot("metadata", _PRIORITY_LOOKUP)
+    except AdmissionError as e:
+        return _admission_error_message(e)
+    async with slot:
         logger.info(f"Listing schemas for catalog: {catalog}")
         try:
-            schemas = await asyncio.to_thread(client.list_schemas, catalog)
+            schemas = await _call_client("list_schemas", catalog)
             logger.debug(f"Found {len(schemas)} schemas")
             return "\n".join(schemas)
         except QueryTimeoutError as e:
@@ -272,12 +776,14 @@ async def list_tables(
         catalog: The name of the catalog
         schema: The name of the schema
     """
-    if _query_semaphore is not None and _query_semaphore.locked():
-        return _concurrency_limit_message()
-    async with _query_semaphore:
+    try:
+        slot = await _acquire_slot("metadata", _PRIORITY_LOOKUP)
+    except AdmissionError as e:
+        return _admission_error_message(e)
+    async with slot:
         logger.info(f"Listing tables for {catalog}.{schema}")
         try:
-            tables = await asyncio.to_thread(client.list_tables, catalog, schema)
+            tables = await _call_client("list_tables", catalog, schema)
             logger.debug(f"Found {len(tables)} tables")
             return "\n".join(tables)
         except QueryTimeoutError as e:
@@ -305,13 +811,15 @@ async def describe_table(
         catalog: The catalog name (optional if default is configured)
         schema: The schema name (optional if default is configured)
     """
-    if _query_semaphore is not None and _query_semaphore.locked():
-        return _concurrency_limit_message()
-    async with _query_semaphore:
+    try:
+        slot = await _acquire_slot("metadata", _PRIORITY_LOOKUP)
+    except AdmissionError as e:
+        return _admission_error_message(e)
+    async with slot:
         logger.info(f"Describing table: {catalog}.{schema}.{table}")
         try:
             cat, sch, tbl = _parse_table_identifier(table, catalog, schema)
-            result = await asyncio.to_thread(client.describe_table, cat, sch, tbl)
+            result = await _call_client("describe_table", cat, sch, tbl)
             logger.debug(f"Table description retrieved successfully")
             return result
         except QueryTimeoutError as e:
@@ -328,9 +836,21 @@ async def execute_query_read_only(
     output_file: Annotated[
         str,
         Field(
-            description="File path to write results to. Format is derived from the file extension: '.csv' for CSV, '.json' (or others) for JSON. When set, results are written directly to disk and are NOT returned to the AI, preventing hallucinated values and enabling subsequent processing by other tools."
+            description="File path to write results to. Format is derived from the file extension: '.csv' for CSV, '.jsonl'/'.ndjson' for JSON Lines (one object per line), '.parquet' for Parquet, '.arrow'/'.feather' for Arrow IPC, '.json' (or others) for JSON. Text formats accept a trailing '.gz' or '.zst' for compressed output (e.g. 'results.csv.gz'). When set, results are written directly to disk and are NOT returned to the AI, preventing hallucinated values and enabling subsequent processing by other tools."
         ),
     ] = "",
+    use_cache: Annotated[
+        bool,
+        Field(
+            description="Return a recently cached result for the same query when the server's result cache is enabled. Set to false to always run the query on Trino, e.g. when the data is expected to have changed."
+        ),
+    ] = True,
+    page_size: Annotated[
+        int,
+        Field(
+            description="When greater than 0, keep the result on the server and return only its first page_size rows, together with a handle. Page through the rest with fetch_more instead of re-running the query. Ignored when output_file is set."
+        ),
+    ] = 0,
 ) -> str:
     """Execute a read-only SQL query and return the results.
 
@@ -340,17 +860,29 @@ async def execute_query_read_only(
     When output_file is provided, results are written directly to disk and only a
     confirmation message is returned. This prevents raw data from passing through
     the AI, avoiding hallucination when processing large result sets. The output
-    format (JSON or CSV) is derived from the file extension.
+    format (JSON, JSON Lines, CSV, Parquet or Arrow) is derived from the file extension.
 
     Args:
         query: The SQL query to execute (must be read-only)
         output_file: File path to write results to. Extension determines format
-                     (.csv → CSV, .json or others → JSON). Results are NOT returned
-                     to the AI, enabling reliable downstream processing.
+                     (.csv → CSV, .jsonl/.ndjson → JSON Lines, .parquet → Parquet,
+                     .arrow/.feather → Arrow IPC, .json or others → JSON).
+                     Append .gz or .zst to a text format to compress it.
+                     Results are NOT returned to the AI, enabling reliable
+                     downstream processing.
+        use_cache: Whether a cached result may be returned. Only inline
+                   results are cached, never file exports.
+        page_size: Return the first page_size rows and a handle for
+                   fetch_more instead of the whole result (0 disables).
     """
     logger.info(f"Executing read-only query: {query[:100]}...")
 
+    length_error = _query_length_error(query)
+    if length_error:
+        return length_error
+
     # Check if the query is actually read-only
+    await _analyze_query(query)
     if not _is_read_only_query(query):
         logger.warning(f"Non-read-only query blocked: {query[:100]}...")
         return (
@@ -360,11 +892,60 @@ async def execute_query_read_only(
             "use the 'execute_query' tool instead (requires ALLOW_WRITE_QUERIES=true)."
         )
 
+    paged = page_size > 0 and not output_file
+
+    # Serve repeated queries from the result cache without taking a slot.
+    cache_key = (
+        _result_cache_key(query) if use_cache and not output_file and not paged else None
+    )
+    if cache_key is not None:
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Returning cached query result")
+            return cached
+
     # Execute the query using the common function
-    if _query_semaphore is not None and _query_semaphore.locked():
-        return _concurrency_limit_message()
-    async with _query_semaphore:
-        return await _try_execute_query(query, output_file=output_file)
+    kind = "export" if output_file else "read"
+    try:
+        slot = await _acquire_slot(kind, _PRIORITY_SCAN)
+    except AdmissionError as e:
+        return _admission_error_message(e)
+    async with slot:
+        if paged:
+            return await _execute_paged(query, page_size)
+        return await _try_execute_query(query, output_file=output_file, cache_key=cache_key)
+
+
+@mcp.tool()
+async def fetch_more(
+    handle: str = Field(description="The handle returned by execute_query_read_only with page_size"),
+    offset: int = Field(description="Index of the first row to return (0-based)", default=0),
+    limit: int = Field(description="Maximum number of rows to return", default=100),
+) -> str:
+    """Return more rows of a result kept on the server, without re-running the query.
+
+    Call execute_query_read_only with page_size to get a handle. Results
+    expire a while after they were last read; re-run the query if the
+    handle is no longer known.
+
+    Args:
+        handle: The result handle
+        offset: Index of the first row to return (0-based)
+        limit: Maximum number of rows to return
+    """
+    logger.info(f"Fetching rows {offset}+{limit} of result {handle}")
+    if result_buffer is None:
+        return "Error: Result paging is not available (the server is not initialised)."
+    try:
+        page = result_buffer.page(handle, offset, _page_limit(limit))
+    except ValueError as e:
+        return f"Error: {str(e)}"
+    if page is None:
+        return (
+            f"Error: Result handle '{handle}' is unknown or has expired. "
+            "Re-run the query with execute_query_read_only."
+        )
+    return _format_page(page)
 
 
 @mcp.tool()
@@ -373,7 +954,7 @@ async def execute_query(
     output_file: Annotated[
         str,
         Field(
-            description="File path to write results to. Format is derived from the file extension: '.csv' for CSV, '.json' (or others) for JSON. When set, results are written directly to disk and are NOT returned to the AI, preventing hallucinated values and enabling subsequent processing by other tools."
+            description="File path to write results to. Format is derived from the file extension: '.csv' for CSV, '.jsonl'/'.ndjson' for JSON Lines (one object per line), '.parquet' for Parquet, '.arrow'/'.feather' for Arrow IPC, '.json' (or others) for JSON. Text formats accept a trailing '.gz' or '.zst' for compressed output (e.g. 'results.csv.gz'). When set, results are written directly to disk and are NOT returned to the AI, preventing hallucinated values and enabling subsequent processing by other tools."
         ),
     ] = "",
 ) -> str:
@@ -385,13 +966,16 @@ async def execute_query(
     When output_file is provided, results are written directly to disk and only a
     confirmation message is returned. This prevents raw data from passing through
     the AI, avoiding hallucination when processing large result sets. The output
-    format (JSON or CSV) is derived from the file extension.
+    format (JSON, JSON Lines, CSV, Parquet or Arrow) is derived from the file extension.
 
     Args:
         query: The SQL query to execute
         output_file: File path to write results to. Extension determines format
-                     (.csv → CSV, .json or others → JSON). Results are NOT returned
-                     to the AI, enabling reliable downstream processing.
+                     (.csv → CSV, .jsonl/.ndjson → JSON Lines, .parquet → Parquet,
+                     .arrow/.feather → Arrow IPC, .json or others → JSON).
+                     Append .gz or .zst to a text format to compress it.
+                     Results are NOT returned to the AI, enabling reliable
+                     downstream processing.
     """
     logger.info(f"Executing query: {query[:100]}...")
 
@@ -405,11 +989,24 @@ async def execute_query(
             "To enable write queries, set ALLOW_WRITE_QUERIES=true in your environment configuration."
         )
 
+    length_error = _query_length_error(query)
+    if length_error:
+        return length_error
+
     # Execute the query using the common function
-    if _query_semaphore is not None and _query_semaphore.locked():
-        return _concurrency_limit_message()
-    async with _query_semaphore:
-        return await _try_execute_query(query, output_file=output_file)
+    await _analyze_query(query)
+    read_only = _is_read_only_query(query)
+    kind = "export" if output_file else "read" if read_only else "write"
+    try:
+        slot = await _acquire_slot(kind, _PRIORITY_SCAN)
+    except AdmissionError as e:
+        return _admission_error_message(e)
+    async with slot:
+        result = await _try_execute_query(query, output_file=output_file)
+    # A write may have changed any cached result, so drop them all.
+    if result_cache is not None and not read_only:
+        result_cache.clear()
+    return result
 
 
 @mcp.tool()
@@ -429,13 +1026,15 @@ async def show_create_table(
         catalog: The catalog name (optional if default is configured)
         schema: The schema name (optional if default is configured)
     """
-    if _query_semaphore is not None and _query_semaphore.locked():
-        return _concurrency_limit_message()
-    async with _query_semaphore:
+    try:
+        slot = await _acquire_slot("metadata", _PRIORITY_LOOKUP)
+    except AdmissionError as e:
+        return _admission_error_message(e)
+    async with slot:
         logger.info(f"Getting CREATE TABLE for: {catalog}.{schema}.{table}")
         try:
             cat, sch, tbl = _parse_table_identifier(table, catalog, schema)
-            result = await asyncio.to_thread(client.show_create_table, cat, sch, tbl)
+            result = await _call_client("show_create_table", cat, sch, tbl)
             logger.debug(f"CREATE TABLE retrieved successfully")
             return result
         except QueryTimeoutError as e:
@@ -463,13 +1062,15 @@ async def get_table_stats(
         catalog: The catalog name (optional if default is configured)
         schema: The schema name (optional if default is configured)
     """
-    if _query_semaphore is not None and _query_semaphore.locked():
-        return _concurrency_limit_message()
-    async with _query_semaphore:
+    try:
+        slot = await _acquire_slot("metadata", _PRIORITY_SCAN)
+    except AdmissionError as e:
+        return _admission_error_message(e)
+    async with slot:
         logger.info(f"Getting table stats for: {catalog}.{schema}.{table}")
         try:
             cat, sch, tbl = _parse_table_identifier(table, catalog, schema)
-            result = await asyncio.to_thread(client.get_table_stats, cat, sch, tbl)
+            result = await _call_client("get_table_stats", cat, sch, tbl)
             logger.debug(f"Table stats retrieved successfully")
             return result
         except QueryTimeoutError as e:
@@ -480,38 +1081,271 @@ async def get_table_stats(
             return f"Error getting table stats: {str(e)}"
 
 
+@mcp.tool()
+async def snapshot_schema(
+    catalog: str = Field(description="The catalog name"),
+    schema: str = Field(
+        description="The schema name. Leave empty to load every schema in the catalog.",
+        default="",
+    ),
+) -> str:
+    """Load the columns of every table in a schema (or catalog) in one query.
+
+    Use this before exploring many tables of a schema: afterwards describe_table
+    answers for all of them instantly, without querying Trino. Column comments
+    are not included in these descriptions.
+
+    Args:
+        catalog: The catalog name
+        schema: The schema name (optional; empty loads the whole catalog)
+    """
+    try:
+        slot = await _acquire_slot("metadata", _PRIORITY_SCAN)
+    except AdmissionError as e:
+        return _admission_error_message(e)
+    async with slot:
+        target = f"{catalog}.{schema}" if schema else catalog
+        logger.info(f"Taking schema snapshot of {target}")
+        try:
+            tables, columns = await _call_client("snapshot_schema", catalog, schema or None)
+            logger.debug(f"Snapshot of {target}: {tables} tables, {columns} columns")
+            return (
+                f"Loaded {tables} table(s) with {columns} column(s) from {target}. "
+                "describe_table now answers for these tables without querying Trino."
+            )
+        except QueryTimeoutError as e:
+            logger.warning(f"Query timed out: {str(e)}")
+            return f"Error: {str(e)}"
+        except Exception as e:
+            logger.error(f"Error taking schema snapshot: {str(e)}", exc_info=True)
+            return f"Error taking schema snapshot: {str(e)}"
+
+
+@mcp.tool()
+async def search_tables(
+    query: str = Field(description="Words or part of a table or column name, e.g. 'revenue'"),
+    limit: int = Field(description="Maximum number of matches to return", default=20),
+) -> str:
+    """Find tables and columns by name across every snapshotted schema.
+
+    Matching is fuzzy: parts of names and small typos match too. Searches
+    only schemas loaded with snapshot_schema, and never queries Trino, so
+    it is much faster than browsing with list_schemas and list_tables.
+
+    Args:
+        query: Words or part of a table or column name
+        limit: Maximum number of matches to return
+    """
+    logger.info(f"Searching tables for: {query}")
+    try:
+        trino_client = await asyncio.to_thread(_get_client)
+        if not len(trino_client.schema_snapshot):
+            return "No schemas are indexed yet. Call snapshot_schema for the schemas to search first."
+        hits = await asyncio.to_thread(trino_client.search_tables, query, limit)
+        if not hits:
+            return f"No tables or columns match '{query}'."
+        return "\n".join(str(hit) for hit in hits)
+    except Exception as e:
+        logger.error(f"Error searching tables: {str(e)}", exc_info=True)
+        return f"Error searching tables: {str(e)}"
+
+
+@mcp.tool()
+async def invalidate_metadata_cache(
+    catalog: str = Field(description="Only drop cached metadata for this catalog", default=""),
+    schema: str = Field(description="Only drop cached metadata for this schema", default=""),
+    table: str = Field(description="Only drop cached metadata for this table", default=""),
+) -> str:
+    """Drop cached catalog/schema/table metadata so the next lookup queries Trino.
+
+    Use this when tables were changed outside this server and listings or
+    descriptions look out of date. With no arguments the whole cache is dropped.
+
+    Args:
+        catalog: The catalog name (optional)
+        schema: The schema name (optional, requires catalog)
+        table: The table name (optional, requires catalog and schema)
+    """
+    trino_client = await asyncio.to_thread(_get_client)
+    if trino_client.metadata_cache is None and not len(trino_client.schema_snapshot):
+        return "Metadata cache is disabled; nothing to invalidate."
+    dropped = trino_client.invalidate_metadata(catalog or None, schema or None, table or None)
+    logger.info(f"Invalidated {dropped} metadata cache entries for {catalog}.{schema}.{table}")
+    return f"Dropped {dropped} cached metadata entr{'y' if dropped == 1 else 'ies'}."
+
+
+def _start_snapshot_refresh(snapshot_client, max_age_seconds: float) -> threading.Event:
+    """Refresh stale schema snapshots in a daemon thread until the event is set.
+
+    The refresh runs one schema at a time on a connection reserved for it
+    (see ``connection_pool_size()``), so it never makes an admitted tool
+    call wait for a connection.
+    """
+    stop = threading.Event()
+
+    def _run() -> None:
+        while True:
+            try:
+                refreshed = snapshot_client.refresh_snapshot(max_age_seconds)
+                if refreshed:
+                    logger.info(f"Refreshed {refreshed} schema snapshot(s)")
+            except Exception:
+                logger.warning("Schema snapshot refresh failed", exc_info=True)
+            if stop.wait(min(max_age_seconds, 60)):
+                return
+
+    threading.Thread(target=_run, name="trino-mcp-snapshot-refresh", daemon=True).start()
+    return stop
+
+
+def _get_client() -> TrinoClient:
+    """Return the Trino client, creating it (and ``async_client``) on first use.
+
+    Creating the client opens the first Trino connection and, with
+    ``METADATA_STORE_PATH``, restores the saved schema snapshots, so it is
+    deferred until a tool needs it rather than slowing down startup.
+    """
+    global client, async_client, _snapshot_refresh_stop
+    if client is not None:
+        return client
+    with _client_lock:
+        if client is not None:
+            return client
+        trino_client = TrinoClient(config)
+        logger.info(f"Connected to Trino at {config.host}:{config.port}")
+        if config.metadata_store_path:
+            # Answer from the saved snapshot right away; refresh it behind the scenes.
+            restored = trino_client.schema_snapshot.restore()
+            logger.info(f"Restored {restored} table(s) from {config.metadata_store_path}")
+            if config.metadata_store_refresh_seconds > 0:
+                _snapshot_refresh_stop = _start_snapshot_refresh(
+                    trino_client, config.metadata_store_refresh_seconds
+                )
+        if config.async_client:
+            # Imported here so that httpx is only loaded when it is used.
+            from .async_client import AsyncTrinoClient
+
+            # File exports keep using the blocking client in a worker thread.
+            async_client = AsyncTrinoClient(
+                config,
+                metadata_cache=trino_client.metadata_cache,
+                schema_snapshot=trino_client.schema_snapshot,
+            )
+        # Published last, so other threads never see a half-built client.
+        client = trino_client
+    return client
+
+
 def _init_config(overrides: Optional[dict] = None) -> None:
-    """Initialise the global ``config`` and ``client``.
+    """Initialise the global ``config`` and reset the Trino clients.
 
     Args:
         overrides: Optional dict of env-var-name → value that takes
                    precedence over environment variables and ``.env``.
     """
-    global config, client, _query_semaphore
+    global config, client, async_client, result_cache, _admission_queues, _rate_limiter
+    global _snapshot_refresh_stop, _validation_executor, result_buffer
     logger.info("Loading Trino configuration...")
     config = load_config(overrides=overrides)
-    logger.info(f"Connected to Trino at {config.host}:{config.port}")
-    client = TrinoClient(config)
+    # The Trino clients are created on the first tool call (see _get_client),
+    # so the server answers the MCP handshake without waiting for Trino.
+    with _client_lock:
+        client = None
+        async_client = None
+        if _snapshot_refresh_stop is not None:
+            _snapshot_refresh_stop.set()
+            _snapshot_refresh_stop = None
+    result_buffer = ResultBuffer(
+        config.result_buffer_ttl_seconds,
+        config.result_buffer_max_bytes,
+        spill_bytes=config.spill_threshold_bytes or None,
+        spill_dir=config.spill_dir,
+    )
+    result_cache = (
+        ResultCache(config.result_cache_ttl_seconds, config.result_cache_max_bytes)
+        if config.result_cache_ttl_seconds > 0
+        else None
+    )
 
-    # Concurrency gate — limits how many tool calls can run at the same time.
-    _query_semaphore = asyncio.Semaphore(config.max_concurrent_queries)
+    if _validation_executor is not None:
+        _validation_executor.shutdown(wait=False)
+    _validation_executor = _create_validation_executor(
+        config.validation_executor, config.validation_workers
+    )
+
+    # Concurrency gates — limit how many tool calls of each class (metadata,
+    # read, write, export) run at the same time; further calls wait in a
+    # bounded queue for a free slot of their class.
+    _admission_queues = _create_admission_queues(config)
+    _rate_limiter = (
+        RateLimiter(config.session_rate_limit, config.session_rate_burst)
+        if config.session_rate_limit > 0
+        else None
+    )
+    if config.session_weights and mcp.settings.auth is None:
+        logger.warning(
+            "SESSION_WEIGHTS only applies to clients authenticated over HTTP; "
+            "this server does not authenticate clients, so every session has weight 1"
+        )
 
     # Update MCP instructions so agents know the constraints.
+    limits = ", ".join(
+        f"{concurrency_limit(config, kind)} {kind}" for kind in CONCURRENCY_CLASSES
+    )
     mcp._mcp_server.instructions = (
         "A Model Context Protocol server for Trino query engine. "
         "IMPORTANT CONSTRAINTS — read before calling tools:\n"
-        f"• Concurrency limit: only {config.max_concurrent_queries} tool call(s) may run at a time. "
+        f"• Concurrency limits: {limits} tool call(s) may run at a time; metadata lookups, "
+        "read queries, write queries and file exports have separate limits. "
+        f"Further calls wait in a queue for up to {config.queue_max_wait_seconds:g} second(s). "
         "If you receive a concurrency-limit error, wait for the previous call to finish and retry.\n"
         f"• Query timeout: queries that run longer than {config.query_timeout_minutes:g} minute(s) are "
         "automatically cancelled. Write efficient queries — avoid SELECT * on large tables and add "
         "appropriate filters (WHERE, LIMIT).\n"
         "• Issue tool calls one at a time and wait for each result before issuing the next call."
     )
+    if result_cache is not None:
+        mcp._mcp_server.instructions += (
+            f"\n• Results of execute_query_read_only are cached for "
+            f"{config.result_cache_ttl_seconds:g} second(s). Pass use_cache=false "
+            "when you need fresh data."
+        )
+
+
+def _transport_security(allowed_hosts: Optional[list]) -> Optional[TransportSecuritySettings]:
+    """Return the Host/Origin header checks for the HTTP transports.
+
+    FastMCP picks these when it is created, and ``mcp`` is created for
+    127.0.0.1, which only accepts localhost Host headers. They are rebuilt
+    here: an explicit *allowed_hosts* list is enforced (on any port), and
+    without one the localhost-only check is kept. Only ``["*"]`` turns the
+    checks off, with a warning; ``load_config`` requires a list when the
+    server listens beyond loopback.
+    """
+    if allowed_hosts == ["*"]:
+        logger.warning(
+            "MCP_ALLOWED_HOSTS is '*': Host/Origin checks are off, so the %s "
+            "transport is not protected against DNS rebinding",
+            config.transport if config is not None else "HTTP",
+        )
+        return None
+    if allowed_hosts:
+        hosts = [pattern for host in allowed_hosts for pattern in (host, f"{host}:*")]
+        return TransportSecuritySettings(
+            enable_dns_rebinding_protection=True,
+            allowed_hosts=hosts,
+            allowed_origins=[f"{scheme}://{host}" for host in hosts for scheme in ("http", "https")],
+        )
+    return TransportSecuritySettings(
+        enable_dns_rebinding_protection=True,
+        allowed_hosts=["127.0.0.1:*", "localhost:*", "[::1]:*"],
+        allowed_origins=["http://127.0.0.1:*", "http://localhost:*", "http://[::1]:*"],
+    )
 
 
 def main():
     """Main entry point for the server."""
-    global config, client
+    global config
 
     # Parse CLI arguments into an overrides dict (no env mutation).
     parser = _build_arg_parser()
@@ -520,8 +1354,19 @@ def main():
 
     _init_config(overrides)
 
-    logger.info("Starting Trino MCP Server...")
-    mcp.run()
+    if config.transport != "stdio":
+        mcp.settings.host = config.mcp_host
+        mcp.settings.port = config.mcp_port
+        mcp.settings.transport_security = _transport_security(config.mcp_allowed_hosts)
+        logger.info(
+            "Starting Trino MCP Server (%s on %s:%d)...",
+            config.transport,
+            config.mcp_host,
+            config.mcp_port,
+        )
+    else:
+        logger.info("Starting Trino MCP Server...")
+    mcp.run(transport=config.transport)
     logger.info("Trino MCP Server stopped")
 
 
@@ -0,0 +1,252 @@
+"""Compact in-memory snapshot of table columns from information_schema."""
+
+import json
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from .utils import changed_objects
+
+if TYPE_CHECKING:
+    from .store import MetadataStore
+
+# Columns of a table as (column_name, data_type) pairs, in ordinal order.
+Columns = Tuple[Tuple[str, str], ...]
+
+
+def snapshot_query(catalog: str, schema: Optional[str] = None) -> str:
+    """Build the ``information_schema.columns`` query for a catalog or schema."""
+    where = ""
+    if schema:
+        literal = schema.replace("'", "''")
+        where = f"WHERE table_schema = '{literal}'\n"
+    return (
+        "SELECT table_schema, table_name, column_name, data_type\n"
+        f"FROM {catalog}.information_schema.columns\n"
+        f"{where}"
+        "ORDER BY table_schema, table_name, ordinal_position"
+    )
+
+
+class SchemaSnapshot:
+    """Column listings for whole schemas, loaded in one query per snapshot.
+
+    Tables are stored per ``(catalog, schema)`` as tuples of interned
+    ``(column, type)`` pairs, so even tens of thousands of tables take
+    little memory. Lookups are case-insensitive, like Trino identifiers.
+
+    ``information_schema.columns`` carries no column comments or extra
+    info, so descriptions answered from a snapshot leave those empty.
+
+    With a ``MetadataStore`` every change is written through to disk, and
+    ``restore()`` reloads the snapshot after a restart.
+    """
+
+    def __init__(self, store: Optional["MetadataStore"] = None):
+        self.store = store
+        # (catalog, schema) -> {table: columns}
+        self._schemas: Dict[Tuple[str, str], Dict[str, Columns]] = {}
+        # (catalog, schema) -> time.time() the schema was loaded
+        self._loaded_at: Dict[Tuple[str, str], float] = {}
+        # Schemas that lost a table since they were loaded, so their table
+        # list may be missing one that was created since.
+        self._partial: set = set()
+        # Bumped on every change, so derived indexes know to rebuild.
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of tables in the snapshot."""
+        with self._lock:
+            return sum(len(tables) for tables in self._schemas.values())
+
+    def load(
+        self,
+        catalog: str,
+        rows: Iterable[Tuple[str, str, str, str]],
+        schema: Optional[str] = None,
+    ) -> Tuple[int, int]:
+        """Replace the snapshot of *catalog* (or one *schema* of it) with *rows*.
+
+        Args:
+            catalog: The catalog the rows were read from.
+            rows: ``(table_schema, table_name, column_name, data_type)`` rows
+                ordered by schema, table and ordinal position.
+            schema: The schema the rows were limited to, if any. Otherwise
+                every previously loaded schema of the catalog is replaced.
+
+        Returns:
+            The number of tables and columns loaded.
+        """
+        intern = sys.intern
+        catalog = catalog.lower()
+        schemas: Dict[Tuple[str, str], Dict[str, List[Tuple[str, str]]]] = {}
+        column_count = 0
+        for table_schema, table_name, column_name, data_type in rows:
+            tables = schemas.setdefault((catalog, intern(table_schema.lower())), {})
+            tables.setdefault(table_name.lower(), []).append(
+                (intern(column_name), intern(data_type))
+            )
+            column_count += 1
+
+        loaded = {
+            key[1]: {name: tuple(cols) for name, cols in tables.items()}
+            for key, tables in schemas.items()
+        }
+        if schema is not None:
+            # An empty schema is still a loaded schema.
+            loaded.setdefault(schema.lower(), {})
+
+        now = time.time()
+        with self._lock:
+            stale = [
+                key for key in self._schemas
+                if key[0] == catalog and (schema is None or key[1] == schema.lower())
+            ]
+            for key in stale:
+                self._drop(key)
+            for schema_name, tables in loaded.items():
+                self._schemas[(catalog, schema_name)] = tables
+                self._loaded_at[(catalog, schema_name)] = now
+            self.version += 1
+            if self.store is not None:
+                self.store.replace(
+                    catalog, schema.lower() if schema is not None else None, loaded, now
+                )
+        return sum(len(tables) for tables in loaded.values()), column_count
+
+    def restore(self) -> int:
+        """Load the snapshot saved in the store, keeping its load times.
+
+        Returns:
+            The number of tables restored; 0 without a store.
+        """
+        if self.store is None:
+            return 0
+        with self._lock:
+            for catalog, schema, loaded_at, complete, tables in self.store.load():
+                key = (catalog, schema)
+                self._schemas[key] = tables
+                self._loaded_at[key] = loaded_at
+                if complete:
+                    self._partial.discard(key)
+                else:
+                    self._partial.add(key)
+            self.version += 1
+            return sum(len(tables) for tables in self._schemas.values())
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        """Forget a schema. Caller holds the lock."""
+        del self._schemas[key]
+        del self._loaded_at[key]
+        self._partial.discard(key)
+
+    def contents(self) -> Tuple[int, Dict[Tuple[str, str], Dict[str, Columns]]]:
+        """Return the current version and a shallow copy of every loaded schema."""
+        with self._lock:
+            return self.version, {key: dict(tables) for key, tables in self._schemas.items()}
+
+    def columns(self, catalog: str, schema: str, table: str) -> Optional[Columns]:
+        """Return the columns of a table, or ``None`` if it is not in the snapshot."""
+        with self._lock:
+            tables = self._schemas.get((catalog.lower(), schema.lower()))
+            if tables is None:
+                return None
+            return tables.get(table.lower())
+
+    def tables(self, catalog: str, schema: str) -> Optional[List[str]]:
+        """Return the sorted table names of a schema, if its listing is complete."""
+        key = (catalog.lower(), schema.lower())
+        with self._lock:
+            if key not in self._schemas or key in self._partial:
+                return None
+            return sorted(self._schemas[key])
+
+    def stale(self, max_age_seconds: float) -> List[Tuple[str, str]]:
+        """Return the schemas loaded longer than *max_age_seconds* ago, oldest first.
+
+        Schemas whose table listing is incomplete are always included.
+        """
+        cutoff = time.time() - max_age_seconds
+        with self._lock:
+            keys = [
+                key for key, loaded_at in self._loaded_at.items()
+                if loaded_at <= cutoff or key in self._partial
+            ]
+            return sorted(keys, key=self._loaded_at.__getitem__)
+
+    def loaded_at(self, catalog: str, schema: str) -> Optional[float]:
+        """Return when a schema was loaded (``time.time()``), if it was."""
+        with self._lock:
+            return self._loaded_at.get((catalog.lower(), schema.lower()))
+
+    def describe_json(self, catalog: str, schema: str, table: str) -> Optional[str]:
+        """Return a ``DESCRIBE``-shaped JSON description of a table, if known."""
+        columns = self.columns(catalog, schema, table)
+        if columns is None:
+            return None
+        rows = [
+            {"Column": name, "Type": data_type, "Extra": "", "Comment": ""}
+            for name, data_type in columns
+        ]
+        return json.dumps(rows, indent=2)
+
+    def invalidate(
+        self,
+        catalog: Optional[str] = None,
+        schema: Optional[str] = None,
+        table: Optional[str] = None,
+    ) -> None:
+        """Drop a table, a schema, a catalog or (with no arguments) everything.
+
+        Arguments after the first ``None`` are ignored.
+        """
+        if schema is None:
+            table = None
+        with self._lock:
+            self.version += 1
+            if self.store is not None:
+                self.store.delete(
+                    catalog and catalog.lower(),
+                    schema and schema.lower(),
+                    table and table.lower(),
+                )
+            if catalog is None:
+                self._schemas.clear()
+                self._loaded_at.clear()
+                self._partial.clear()
+                return
+            catalog = catalog.lower()
+            for key in list(self._schemas):
+                if key[0] != catalog or (schema is not None and key[1] != schema.lower()):
+                    continue
+                if table is not None:
+                    self._schemas[key].pop(table.lower(), None)
+                    self._partial.add(key)
+                else:
+                    self._drop(key)
+
+    def invalidate_query(
+        self, query: str, catalog: Optional[str] = None, schema: Optional[str] = None
+    ) -> None:
+        """Drop the tables a (DDL) query may have changed.
+
+        Unqualified names are resolved against the default *catalog* and
+        *schema*; if the affected objects cannot be determined the whole
+        snapshot is dropped.
+        """
+        with self._lock:
+            if not self._schemas and self.store is None:
+                return
+        objects = changed_objects(query)
+        if objects is None:
+            self.invalidate()
+            return
+        for obj_catalog, obj_schema, obj_table in objects:
+            obj_catalog = obj_catalog or catalog
+            obj_schema = obj_schema or schema
+            if obj_catalog is None or obj_schema is None:
+                self.invalidate()
+            else:
+                self.invalidate(obj_catalog, obj_schema, obj_table)
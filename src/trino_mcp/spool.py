@@ -0,0 +1,203 @@
+"""Row buffer that keeps the head of a result in memory and spills the rest to disk."""
+
+import bisect
+import pickle
+import sys
+import tempfile
+import threading
+from typing import IO, Iterable, Iterator, List, Optional
+
+# Target size of each chunk written to the spill file. A page read back from
+# disk loads at most the chunks it overlaps, so this bounds its cost.
+SPILL_CHUNK_BYTES = 1024 * 1024
+
+
+# Bytes of the list slot that references a row held in memory.
+_ROW_SLOT_BYTES = 8
+
+
+def row_size(row: tuple) -> int:
+    """Estimate the memory *row* takes while it is held in a spool.
+
+    Adds up ``sys.getsizeof()`` of the tuple and every value in it,
+    including the elements of ARRAY, MAP and ROW values. Interned objects
+    such as small integers and ``None`` are counted too, so the estimate
+    errs on the high side.
+    """
+    return _ROW_SLOT_BYTES + _value_size(row)
+
+
+def _value_size(value: object) -> int:
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        size += sum(_value_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(_value_size(key) + _value_size(item) for key, item in value.items())
+    return size
+
+
+class RowSpool:
+    """Append-only sequence of result rows that overflows to a temporary file.
+
+    Rows are kept in memory until their estimated size exceeds
+    ``memory_bytes``; from then on they are pickled to an anonymous
+    temporary file in chunks of about ``SPILL_CHUNK_BYTES``, so a large
+    result costs disk space rather than memory. Pickle keeps Trino's
+    Python values (``Decimal``, ``datetime``, nested lists and dicts)
+    exactly as the cursor returned them. The file is private to the
+    process and removed by ``close()`` (or when the process exits).
+
+    With ``max_bytes`` the spool stops accepting rows once their total
+    estimated size would exceed it; ``append()`` then returns ``False``.
+
+    Rows can be read back as a stream of batches or sliced by index. The
+    spool is safe to use from multiple threads.
+    """
+
+    def __init__(
+        self,
+        memory_bytes: Optional[int] = None,
+        directory: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        self.memory_bytes = memory_bytes
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = 0
+        # Rows not yet written to the spill file, and their sizes.
+        self._tail: List[tuple] = []
+        self._tail_sizes: List[int] = []
+        self._tail_bytes = 0
+        # Spilled chunks: index of each chunk's first row and its file offset.
+        self._chunk_starts: List[int] = []
+        self._chunk_offsets: List[int] = []
+        self._spilled_rows = 0
+        self._file: Optional[IO[bytes]] = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._spilled_rows + len(self._tail)
+
+    def __enter__(self) -> "RowSpool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @property
+    def spilled(self) -> bool:
+        """Whether any rows have been written to disk."""
+        with self._lock:
+            return self._spilled_rows > 0
+
+    def append(self, row: tuple) -> bool:
+        """Add a row. Returns ``False`` (and drops the row) if it would exceed ``max_bytes``."""
+        size = row_size(row)
+        with self._lock:
+            if self._closed:
+                raise ValueError("RowSpool is closed")
+            if self.max_bytes is not None and self.size + size > self.max_bytes:
+                return False
+            self._tail.append(row)
+            self._tail_sizes.append(size)
+            self._tail_bytes += size
+            self.size += size
+            limit = SPILL_CHUNK_BYTES if self._file is not None else self.memory_bytes
+            if limit is not None and self._tail_bytes > limit:
+                self._spill()
+            return True
+
+    def extend(self, rows: Iterable[tuple]) -> int:
+        """Add rows until one does not fit. Returns the number added."""
+        added = 0
+        for row in rows:
+            if not self.append(row):
+                break
+            added += 1
+        return added
+
+    def _spill(self) -> None:
+        """Write the in-memory rows to the spill file. Caller holds the lock."""
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix="trino-mcp-", dir=self.directory)
+        self._file.seek(0, 2)
+        start = 0
+        chunk_bytes = 0
+        for index, size in enumerate(self._tail_sizes):
+            chunk_bytes += size
+            if chunk_bytes >= SPILL_CHUNK_BYTES or index == len(self._tail) - 1:
+                self._chunk_starts.append(self._spilled_rows + start)
+                self._chunk_offsets.append(self._file.tell())
+                pickle.dump(self._tail[start : index + 1], self._file, pickle.HIGHEST_PROTOCOL)
+                start = index + 1
+                chunk_bytes = 0
+        self._spilled_rows += len(self._tail)
+        self._tail = []
+        self._tail_sizes = []
+        self._tail_bytes = 0
+
+    def _read_chunk(self, chunk: int) -> List[tuple]:
+        """Load a spilled chunk. Caller holds the lock."""
+        assert self._file is not None
+        self._file.seek(self._chunk_offsets[chunk])
+        return pickle.load(self._file)
+
+    def batches(self) -> Iterator[List[tuple]]:
+        """Yield every row in order, one spilled chunk (or the in-memory rows) at a time."""
+        chunk = 0
+        while True:
+            with self._lock:
+                if chunk >= len(self._chunk_starts):
+                    tail = list(self._tail)
+                    break
+                batch = self._read_chunk(chunk)
+            yield batch
+            chunk += 1
+        if tail:
+            yield tail
+
+    def rows(self) -> Iterator[tuple]:
+        """Iterate over individual rows instead of batches."""
+        for batch in self.batches():
+            yield from batch
+
+    def slice(self, offset: int, limit: int) -> List[tuple]:
+        """Return up to *limit* rows starting at index *offset*.
+
+        Only the spilled chunks overlapping the requested rows are read.
+
+        Raises:
+            ValueError: If the spool has been closed.
+        """
+        end = offset + limit
+        rows: List[tuple] = []
+        with self._lock:
+            if self._closed:
+                raise ValueError("RowSpool is closed")
+            if offset < self._spilled_rows:
+                chunk = bisect.bisect_right(self._chunk_starts, offset) - 1
+                while chunk < len(self._chunk_starts) and self._chunk_starts[chunk] < end:
+                    start = self._chunk_starts[chunk]
+                    batch = self._read_chunk(chunk)
+                    rows.extend(batch[max(offset - start, 0) : end - start])
+                    chunk += 1
+            tail_start = max(offset - self._spilled_rows, 0)
+            tail_end = end - self._spilled_rows
+            if tail_end > 0:
+                rows.extend(self._tail[tail_start:tail_end])
+        return rows
+
+    def close(self) -> None:
+        """Release the rows and delete the spill file. Safe to call more than once."""
+        with self._lock:
+            self._closed = True
+            self._tail = []
+            self._tail_sizes = []
+            self._chunk_starts = []
+            self._chunk_offsets = []
+            self._spilled_rows = 0
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,157 @@
+"""SQLite store that keeps schema snapshots across server restarts."""
+
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+from .snapshot import Columns
+
+_SCHEMA_VERSION = 1
+
+_DDL = """
+CREATE TABLE IF NOT EXISTS schemas (
+    catalog TEXT NOT NULL,
+    schema TEXT NOT NULL,
+    loaded_at REAL NOT NULL,
+    complete INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (catalog, schema)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS columns (
+    catalog TEXT NOT NULL,
+    schema TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    column_name TEXT NOT NULL,
+    data_type TEXT NOT NULL,
+    PRIMARY KEY (catalog, schema, table_name, position)
+) WITHOUT ROWID;
+"""
+
+
+class MetadataStore:
+    """Persists ``SchemaSnapshot`` contents in a SQLite file.
+
+    Each loaded schema is stored with the time it was loaded, so a restarted
+    server can answer from the snapshot immediately and refresh the stalest
+    schemas in the background. A schema is marked incomplete once one of
+    its tables is dropped from it, since its table list may then be missing
+    a newly created table.
+
+    The store is written through by ``SchemaSnapshot`` and is safe to use
+    from multiple threads.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, _SCHEMA_VERSION):
+                # Written by an incompatible version; it is only a cache.
+                self._conn.executescript("DROP TABLE IF EXISTS schemas; DROP TABLE IF EXISTS columns;")
+            self._conn.executescript(_DDL)
+            self._conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def load(self) -> Iterator[Tuple[str, str, float, bool, Dict[str, Columns]]]:
+        """Yield ``(catalog, schema, loaded_at, complete, tables)`` for every stored schema."""
+        with self._lock:
+            schemas = self._conn.execute(
+                "SELECT catalog, schema, loaded_at, complete FROM schemas"
+            ).fetchall()
+            rows = self._conn.execute(
+                "SELECT catalog, schema, table_name, column_name, data_type FROM columns "
+                "ORDER BY catalog, schema, table_name, position"
+            ).fetchall()
+
+        tables_by_schema: Dict[Tuple[str, str], Dict[str, list]] = {}
+        for catalog, schema, table, column, data_type in rows:
+            tables = tables_by_schema.setdefault((catalog, schema), {})
+            tables.setdefault(table, []).append((column, data_type))
+        for catalog, schema, loaded_at, complete in schemas:
+            tables = tables_by_schema.get((catalog, schema), {})
+            yield (
+                catalog,
+                schema,
+                loaded_at,
+                bool(complete),
+                {name: tuple(cols) for name, cols in tables.items()},
+            )
+
+    def replace(
+        self,
+        catalog: str,
+        schema: Optional[str],
+        schemas: Dict[str, Dict[str, Columns]],
+        loaded_at: float,
+    ) -> None:
+        """Replace a catalog (or one *schema* of it) with freshly loaded *schemas*.
+
+        Args:
+            catalog: The catalog that was loaded.
+            schema: The schema the load was limited to, if any.
+            schemas: ``{schema: {table: columns}}`` as loaded.
+            loaded_at: When the schemas were loaded (``time.time()``).
+        """
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._delete(catalog, schema, None)
+            self._conn.executemany(
+                "INSERT INTO schemas (catalog, schema, loaded_at) VALUES (?, ?, ?)",
+                [(catalog, name, loaded_at) for name in schemas],
+            )
+            self._conn.executemany(
+                "INSERT INTO columns VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (catalog, schema_name, table, position, column, data_type)
+                    for schema_name, tables in schemas.items()
+                    for table, columns in tables.items()
+                    for position, (column, data_type) in enumerate(columns)
+                ],
+            )
+
+    def delete(
+        self,
+        catalog: Optional[str] = None,
+        schema: Optional[str] = None,
+        table: Optional[str] = None,
+    ) -> None:
+        """Drop a table, a schema, a catalog or (with no arguments) everything.
+
+        Arguments after the first ``None`` are ignored.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._delete(catalog, schema, table)
+
+    def _delete(self, catalog: Optional[str], schema: Optional[str], table: Optional[str]) -> None:
+        """Delete rows in the current transaction. Caller holds the lock."""
+        if catalog is None:
+            self._conn.execute("DELETE FROM schemas")
+            self._conn.execute("DELETE FROM columns")
+        elif schema is None:
+            self._conn.execute("DELETE FROM schemas WHERE catalog = ?", (catalog,))
+            self._conn.execute("DELETE FROM columns WHERE catalog = ?", (catalog,))
+        elif table is None:
+            params = (catalog, schema)
+            self._conn.execute("DELETE FROM schemas WHERE catalog = ? AND schema = ?", params)
+            self._conn.execute("DELETE FROM columns WHERE catalog = ? AND schema = ?", params)
+        else:
+            self._conn.execute(
+                "UPDATE schemas SET complete = 0 WHERE catalog = ? AND schema = ?",
+                (catalog, schema),
+            )
+            self._conn.execute(
+                "DELETE FROM columns WHERE catalog = ? AND schema = ? AND table_name = ?",
+                (catalog, schema, table),
+            )
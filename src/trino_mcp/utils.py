@@ -1,42 +1,166 @@
 """Trino MCP Server - Utility functions."""
 
+import functools
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Hashable, List, Optional, Tuple
 
-import sqlglot
-from sqlglot.expressions import (
-    Alter,
-    Analyze,
-    Command,
-    Create,
-    Delete,
-    Describe,
-    Drop,
-    Grant,
-    Insert,
-    Merge,
-    Refresh,
-    Revoke,
-    TruncateTable,
-    Update,
-)
+if TYPE_CHECKING:
+    from sqlglot.expressions import Expression
 
 logger = logging.getLogger(__name__)
 
-# Trino write operations (sqlglot maps these to standard expression types)
-WRITE_TYPES = (
-    Insert,
-    Update,
-    Delete,
-    Merge,
-    Create,
-    Drop,
-    Alter,
-    TruncateTable,
-    Grant,
-    Revoke,
-    Analyze,
-    Refresh,
-)
+
+@functools.lru_cache(maxsize=None)
+def _statement_types() -> Tuple[tuple, tuple]:
+    """Return ``(DDL_TYPES, WRITE_TYPES)``, importing sqlglot on first use."""
+    from sqlglot import expressions as exp
+
+    # Statements that change catalog metadata (tables, views, schemas, columns).
+    ddl_types = (exp.Create, exp.Drop, exp.Alter, exp.Comment)
+    # Trino write operations (sqlglot maps these to standard expression types)
+    write_types = (
+        exp.Insert,
+        exp.Update,
+        exp.Delete,
+        exp.Merge,
+        exp.Create,
+        exp.Drop,
+        exp.Alter,
+        exp.TruncateTable,
+        exp.Grant,
+        exp.Revoke,
+        exp.Analyze,
+        exp.Refresh,
+    )
+    return ddl_types, write_types
+
+
+def __getattr__(name: str) -> Any:
+    # sqlglot loads every dialect on import, which takes longer than the
+    # rest of the server's imports; it is imported when a query is first
+    # parsed instead, so stdio clients that spawn a server per session
+    # start quickly.
+    if name == "sqlglot":
+        import sqlglot
+
+        return sqlglot
+    if name == "DDL_TYPES":
+        return _statement_types()[0]
+    if name == "WRITE_TYPES":
+        return _statement_types()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _LRUCache:
+    """Thread-safe LRU map bounded by entry count and total entry weight."""
+
+    def __init__(self, max_entries: int, max_weight: int):
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        # key -> (value, weight); most recently used last.
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return ``(found, value)`` for *key*."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[0]
+
+    def put(self, key: Hashable, value: Any, weight: int) -> None:
+        """Store *value*, evicting least recently used entries to stay in bounds."""
+        if weight > self.max_weight:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._weight -= old[1]
+            while self._entries and (
+                len(self._entries) >= self.max_entries or self._weight + weight > self.max_weight
+            ):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._weight -= evicted
+            self._entries[key] = (value, weight)
+            self._weight += weight
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._weight = 0
+
+
+# Parsed ASTs take roughly 150x the memory of their SQL text, so the parse
+# cache is bounded by the total length of the cached queries.
+PARSE_CACHE_MAX_ENTRIES = 256
+PARSE_CACHE_MAX_CHARS = 512 * 1024
+
+# query digest -> (AST, None) or (None, parse error)
+_parse_cache = _LRUCache(PARSE_CACHE_MAX_ENTRIES, PARSE_CACHE_MAX_CHARS)
+# (name, query digest) -> small values derived from the AST (verdicts, keys)
+_derived_cache = _LRUCache(4096, 4 * 1024 * 1024)
+
+
+def _fact_weight(value: Any) -> int:
+    """Approximate size of a derived-cache value (SQL text or object list)."""
+    return 1 + len(value) if isinstance(value, (str, list)) else 1
+
+
+def _digest(query: str) -> bytes:
+    return hashlib.blake2b(query.encode("utf-8"), digest_size=16).digest()
+
+
+def parse_query(query: str) -> "Expression":
+    """Parse *query* as Trino SQL, reusing the AST of a recent identical query.
+
+    Every stage that inspects a query (read-only check, cache keys, DDL
+    invalidation) goes through this cache, so a query is parsed once. The
+    returned AST is shared: callers must ``copy()`` it before modifying it.
+
+    Raises:
+        sqlglot.errors.ParseError: If the query cannot be parsed (the
+            failure is cached as well).
+    """
+    return _expression(_parse(query))
+
+
+def _parse(query: str) -> Tuple[Optional["Expression"], Optional[Exception]]:
+    """Return the cached ``(AST, None)`` or ``(None, parse error)`` for *query*."""
+    key = _digest(query)
+    found, entry = _parse_cache.get(key)
+    if not found:
+        import sqlglot
+
+        try:
+            entry = (sqlglot.parse_one(query, read="trino"), None)
+        except Exception as e:
+            entry = (None, e)
+        _parse_cache.put(key, entry, len(query))
+    return entry
+
+
+def _expression(parsed: Tuple[Optional["Expression"], Optional[Exception]]) -> "Expression":
+    """Return the AST of a ``_parse()`` result, re-raising its parse error."""
+    expr, error = parsed
+    if error is not None:
+        raise error.with_traceback(None)
+    return expr
+
+
+def clear_parse_cache() -> None:
+    """Drop every cached AST and derived result."""
+    _parse_cache.clear()
+    _derived_cache.clear()
 
 
 def is_read_only_query(query: str) -> bool:
@@ -49,19 +173,33 @@ def is_read_only_query(query: str) -> bool:
     and will be allowed. Users should be aware that SELECT can potentially trigger
     external writes depending on the Trino connectors and functions used.
 
+    Verdicts are cached by a hash of the query text.
+
     Args:
         query: The SQL query to check
     Returns:
         True if the query is read-only, False otherwise
     """
+    key = ("read_only", _digest(query))
+    found, verdict = _derived_cache.get(key)
+    if not found:
+        verdict = _is_read_only_query(query, _parse(query))
+        _derived_cache.put(key, verdict, 1)
+    return verdict
+
+
+def _is_read_only_query(query: str, parsed: tuple) -> bool:
+    """Uncached body of ``is_read_only_query()``, given ``_parse(query)``."""
     try:
         # Parse using the Trino dialect
-        expr = sqlglot.parse_one(query, read="trino")
+        expr = _expression(parsed)
     except Exception as e:
         # If parsing fails, treat as non-read-only for safety
         logger.warning(f"Failed to parse query as Trino SQL: {str(e)}")
         return False
 
+    from sqlglot.expressions import Command, Describe
+
     # Describe is read-only
     if isinstance(expr, Describe):
         return True
@@ -86,4 +224,183 @@ def is_read_only_query(query: str) -> bool:
         return False
 
     # Walk the AST for any write operation
-    return not any(isinstance(node, WRITE_TYPES) for node in expr.walk())
+    write_types = _statement_types()[1]
+    return not any(isinstance(node, write_types) for node in expr.walk())
+
+
+def normalize_query(query: str) -> str:
+    """Return a canonical form of *query* for use as a cache key.
+
+    Re-generates the query from its Trino AST, which drops comments and
+    normalizes whitespace, keyword case and identifier case (Trino
+    identifiers are case-insensitive), so
+    trivially different spellings of the same query map to the same key.
+    Queries that fail to parse fall back to whitespace normalization.
+
+    Args:
+        query: The SQL query to normalize
+    Returns:
+        The normalized SQL text
+    """
+    key = ("normalized", _digest(query))
+    found, normalized = _derived_cache.get(key)
+    if not found:
+        normalized = _normalize_query(query, _parse(query))
+        _derived_cache.put(key, normalized, len(normalized))
+    return normalized
+
+
+def _normalize_query(query: str, parsed: tuple) -> str:
+    """Uncached body of ``normalize_query()``, given ``_parse(query)``."""
+    try:
+        from sqlglot.optimizer.normalize_identifiers import normalize_identifiers
+
+        # normalize_identifiers() modifies the tree, so work on a copy.
+        expr = normalize_identifiers(_expression(parsed).copy(), dialect="trino")
+        return expr.sql(dialect="trino", comments=False)
+    except Exception:
+        return " ".join(query.split())
+
+
+def changed_objects(
+    query: str,
+) -> Optional[List[Tuple[Optional[str], Optional[str], Optional[str]]]]:
+    """Find the catalog objects whose metadata *query* may change.
+
+    Walks the Trino AST of DDL statements (CREATE, DROP, ALTER, COMMENT) for
+    the tables, views and schemas they name. Tables read by a
+    ``CREATE TABLE ... AS SELECT`` are not included. Other statements,
+    including DML, leave metadata unchanged.
+
+    Args:
+        query: The SQL query to inspect
+    Returns:
+        A list of ``(catalog, schema, table)`` tuples, with ``None`` for parts
+        not named in the query (``table`` is ``None`` for schemas). Returns
+        ``None`` if the query may change metadata in a way that cannot be
+        determined, e.g. DDL that sqlglot cannot parse (``CREATE CATALOG``).
+    """
+    key = ("changed", _digest(query))
+    found, objects = _derived_cache.get(key)
+    if not found:
+        objects = _changed_objects(query, _parse(query))
+        _derived_cache.put(key, objects, _fact_weight(objects))
+    return objects
+
+
+def _changed_objects(
+    query: str, parsed: tuple
+) -> Optional[List[Tuple[Optional[str], Optional[str], Optional[str]]]]:
+    """Uncached body of ``changed_objects()``, given ``_parse(query)``."""
+    try:
+        expr = _expression(parsed)
+    except Exception:
+        words = query.split(None, 1)
+        return None if words and words[0].upper() in ("CREATE", "DROP", "ALTER", "COMMENT") else []
+
+    from sqlglot.expressions import Command, Query, Table
+
+    if isinstance(expr, Command):
+        return None if str(expr.this).upper() in ("CREATE", "DROP", "ALTER", "COMMENT") else []
+    if not isinstance(expr, _statement_types()[0]):
+        return []
+
+    objects = []
+    for table in expr.find_all(Table):
+        if table.find_ancestor(Query) is not None:
+            continue
+        objects.append((table.catalog or None, table.db or None, table.name or None))
+    return objects or None
+
+
+def limit_query(query: str, max_rows: int) -> Optional[str]:
+    """Wrap a SELECT so that Trino returns at most *max_rows* rows.
+
+    Queries without a limit, or with a larger ``LIMIT`` or ``FETCH FIRST``,
+    are wrapped as ``SELECT * FROM (<query>) LIMIT n``. The query text is
+    kept as written rather than regenerated from the AST, so Trino runs
+    exactly what the user wrote. Queries with a top-level ``ORDER BY`` are
+    left alone, since Trino does not keep the order of a subquery; so are
+    statements other than plain queries, ``FETCH ... WITH TIES``, limits
+    that are not integer literals and queries that cannot be parsed.
+
+    Args:
+        query: The SQL query to limit
+        max_rows: The maximum number of rows to return
+    Returns:
+        The wrapped SQL, or ``None`` if the query needs no (or cannot
+        take a) tighter limit.
+    """
+    key = ("limit", max_rows, _digest(query))
+    found, limited = _derived_cache.get(key)
+    if not found:
+        limited = _limit_query(query, max_rows, _parse(query))
+        _derived_cache.put(key, limited, _fact_weight(limited))
+    return limited
+
+
+def _limit_query(query: str, max_rows: int, parsed: tuple) -> Optional[str]:
+    """Uncached body of ``limit_query()``, given ``_parse(query)``."""
+    try:
+        expr = _expression(parsed)
+    except Exception:
+        return None
+
+    from sqlglot.expressions import Fetch, Limit, Literal, Select, SetOperation
+
+    if not isinstance(expr, (Select, SetOperation)) or expr.args.get("order"):
+        return None
+
+    limit = expr.args.get("limit")
+    if isinstance(limit, Fetch):
+        options = limit.args.get("limit_options")
+        if options is not None and (options.args.get("with_ties") or options.args.get("percent")):
+            return None
+        count = limit.args.get("count")
+    elif isinstance(limit, Limit):
+        count = limit.expression
+    else:
+        count = None
+    if limit is not None and isinstance(count, Literal):
+        if count.is_string or int(count.name) <= max_rows:
+            return None
+    elif limit is not None and not (isinstance(limit, Limit) and count.name.upper() == "ALL"):
+        return None
+
+    # Newlines keep a trailing line comment from swallowing the closing parenthesis.
+    body = query.strip().rstrip(";").rstrip()
+    return f"SELECT * FROM (\n{body}\n) LIMIT {max_rows}"
+
+
+def derive_query_facts(query: str, row_limits: Tuple[int, ...] = ()) -> List[Tuple[Hashable, Any]]:
+    """Derive everything later stages need from *query* in a single parse.
+
+    Computes the read-only verdict, the normalized cache key, the objects
+    the query may change and its ``limit_query()`` rewrite for each of
+    *row_limits*. Meant to run on a validation worker process: pass the
+    result to ``remember_query_facts()`` in the server process, whose
+    caches the worker cannot fill, so the query is not parsed there again.
+
+    The AST is kept for the duration of the call rather than looked up in
+    the parse cache for each fact, so a query too large for that cache is
+    still parsed only once.
+
+    Returns:
+        Derived-cache entries as ``(key, value)`` pairs.
+    """
+    digest = _digest(query)
+    parsed = _parse(query)
+    facts: List[Tuple[Hashable, Any]] = [
+        (("read_only", digest), _is_read_only_query(query, parsed)),
+        (("normalized", digest), _normalize_query(query, parsed)),
+        (("changed", digest), _changed_objects(query, parsed)),
+    ]
+    for max_rows in row_limits:
+        facts.append((("limit", max_rows, digest), _limit_query(query, max_rows, parsed)))
+    return facts
+
+
+def remember_query_facts(facts: List[Tuple[Hashable, Any]]) -> None:
+    """Store facts returned by ``derive_query_facts()`` in this process's cache."""
+    for key, value in facts:
+        _derived_cache.put(key, value, _fact_weight(value))
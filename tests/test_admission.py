@@ -0,0 +1,223 @@
+"""Tests for trino_mcp.admission module."""
+
+import asyncio
+
+import pytest
+
+from unittest.mock import patch
+
+from trino_mcp.admission import (
+    AdmissionQueue,
+    QueueFullError,
+    QueueTimeoutError,
+    RateLimiter,
+)
+
+
+async def _waiter(queue, name, order, priority=0, hold=0.0, session=None, weight=1.0):
+    slot = await queue.acquire(priority, session=session, weight=weight)
+    async with slot:
+        order.append(name)
+        await asyncio.sleep(hold)
+
+
+def test_acquire_and_release_without_waiting():
+    async def _test():
+        queue = AdmissionQueue(2)
+        first = await queue.acquire()
+        second = await queue.acquire()
+        assert queue.in_use == 2
+        assert queue.locked()
+        first.release()
+        first.release()  # releasing twice is harmless
+        second.release()
+        assert queue.in_use == 0
+
+    asyncio.run(_test())
+
+
+def test_rejects_immediately_without_a_queue():
+    async def _test():
+        queue = AdmissionQueue(1)
+        slot = await queue.acquire()
+        with pytest.raises(QueueFullError, match="1 concurrent query slot"):
+            await queue.acquire()
+        slot.release()
+
+    asyncio.run(_test())
+
+
+def test_waiters_are_admitted_in_arrival_order():
+    async def _test():
+        queue = AdmissionQueue(1, max_depth=10, max_wait_seconds=5)
+        order = []
+        slot = await queue.acquire()
+        tasks = [asyncio.ensure_future(_waiter(queue, name, order)) for name in "abc"]
+        await asyncio.sleep(0.01)
+        assert queue.depth == 3
+        slot.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(_test()) == ["a", "b", "c"]
+
+
+def test_priority_ordering_admits_lowest_priority_first():
+    async def _test():
+        queue = AdmissionQueue(1, max_depth=10, max_wait_seconds=5, ordering="priority")
+        order = []
+        slot = await queue.acquire()
+        tasks = [
+            asyncio.ensure_future(_waiter(queue, name, order, priority))
+            for name, priority in [("query-1", 1), ("meta-1", 0), ("query-2", 1), ("meta-2", 0)]
+        ]
+        await asyncio.sleep(0.01)
+        slot.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(_test()) == ["meta-1", "meta-2", "query-1", "query-2"]
+
+
+def test_queue_depth_limit():
+    async def _test():
+        queue = AdmissionQueue(1, max_depth=1, max_wait_seconds=5)
+        slot = await queue.acquire()
+        waiting = asyncio.ensure_future(queue.acquire())
+        await asyncio.sleep(0.01)
+        with pytest.raises(QueueFullError) as excinfo:
+            await queue.acquire()
+        assert excinfo.value.depth == 1
+        slot.release()
+        (await waiting).release()
+
+    asyncio.run(_test())
+
+
+def test_timeout_reports_position_and_leaves_queue():
+    async def _test():
+        queue = AdmissionQueue(1, max_depth=10, max_wait_seconds=0.1, ordering="priority")
+        slot = await queue.acquire()
+        ahead = asyncio.ensure_future(queue.acquire(priority=0))
+        await asyncio.sleep(0.01)
+        with pytest.raises(QueueTimeoutError) as excinfo:
+            await queue.acquire(priority=1)
+        with pytest.raises(QueueTimeoutError):
+            await ahead
+        slot.release()
+        return excinfo.value, queue
+
+    error, queue = asyncio.run(_test())
+
+    # The earlier waiter timed out first, leaving this call at the head.
+    assert error.position == 1
+    assert error.waited >= 0.1
+    assert "position 1 of 1" in str(error)
+    assert queue.depth == 0
+    assert queue.in_use == 0
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def _test():
+        queue = AdmissionQueue(1, max_depth=10, max_wait_seconds=5)
+        slot = await queue.acquire()
+        waiting = asyncio.ensure_future(queue.acquire())
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        slot.release()
+        assert queue.depth == 0
+        assert queue.in_use == 0
+
+    asyncio.run(_test())
+
+
+def test_unsupported_ordering():
+    with pytest.raises(ValueError, match="Unsupported queue ordering"):
+        AdmissionQueue(1, ordering="lifo")
+
+
+# ---------------------------------------------------------------------------
+# Fair sharing between sessions
+# ---------------------------------------------------------------------------
+
+
+def test_chatty_session_does_not_starve_others():
+    async def _test():
+        queue = AdmissionQueue(1, max_depth=20, max_wait_seconds=5)
+        order = []
+        slot = await queue.acquire(session="busy")
+        tasks = [
+            asyncio.ensure_future(_waiter(queue, f"busy-{i}", order, session="busy"))
+            for i in range(4)
+        ]
+        tasks.append(asyncio.ensure_future(_waiter(queue, "quiet", order, session="quiet")))
+        await asyncio.sleep(0.01)
+        slot.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    # The quiet session arrived last, but the busy one already had a slot.
+    assert asyncio.run(_test()) == ["quiet", "busy-0", "busy-1", "busy-2", "busy-3"]
+
+
+def test_weights_share_slots_proportionally():
+    async def _test():
+        queue = AdmissionQueue(1, max_depth=20, max_wait_seconds=5)
+        order = []
+        slot = await queue.acquire(session="blocker")
+        tasks = [
+            asyncio.ensure_future(_waiter(queue, session, order, session=session, weight=weight))
+            for session, weight in [("heavy", 2.0), ("light", 1.0)]
+            for _ in range(4)
+        ]
+        await asyncio.sleep(0.01)
+        slot.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    order = asyncio.run(_test())
+
+    # While both sessions wait, the heavy one gets two slots per light one.
+    assert order[:6].count("heavy") == 4
+    assert order[:6].count("light") == 2
+
+
+def test_session_concurrency_limit_rejects_without_queue():
+    async def _test():
+        queue = AdmissionQueue(3, session_max_concurrent=1)
+        await queue.acquire(session="a")
+        await queue.acquire(session="a")
+
+    with pytest.raises(QueueFullError, match="already holds 1"):
+        asyncio.run(_test())
+
+
+def test_session_concurrency_limit_waits_while_slots_are_free():
+    async def _test():
+        queue = AdmissionQueue(3, max_depth=10, max_wait_seconds=5, session_max_concurrent=1)
+        first = await queue.acquire(session="a")
+        waiting = asyncio.ensure_future(queue.acquire(session="a"))
+        other = await queue.acquire(session="b")
+        await asyncio.sleep(0.01)
+        # A slot is free, but session "a" is at its limit.
+        assert not waiting.done()
+        assert queue.in_use == 2
+        first.release()
+        (await waiting).release()
+        other.release()
+        assert queue.in_use == 0
+
+    asyncio.run(_test())
+
+
+def test_rate_limiter_allows_burst_then_throttles():
+    limiter = RateLimiter(rate=2, burst=3)
+    with patch("trino_mcp.admission.time.monotonic", return_value=100.0):
+        assert [limiter.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert limiter.acquire("a") == pytest.approx(0.5)
+        # Other sessions have their own bucket.
+        assert limiter.acquire("b") == 0.0
+    with patch("trino_mcp.admission.time.monotonic", return_value=100.5):
+        assert limiter.acquire("a") == 0.0
@@ -0,0 +1,308 @@
+"""Tests for trino_mcp.async_client module."""
+
+import asyncio
+import json
+from decimal import Decimal
+
+import httpx
+import pytest
+import trino
+
+from trino_mcp.async_client import AsyncTrinoClient
+from trino_mcp.cache import METADATA_KINDS, MetadataCache
+from trino_mcp.client import QueryTimeoutError
+from trino_mcp.config import TrinoConfig
+from trino_mcp.spool import RowSpool, row_size
+
+BASE = "http://localhost:8080"
+
+_BIGINT = {"name": "n", "type": "bigint", "typeSignature": {"rawType": "bigint", "arguments": []}}
+_DECIMAL = {
+    "name": "price",
+    "type": "decimal(10,2)",
+    "typeSignature": {
+        "rawType": "decimal",
+        "arguments": [{"kind": "LONG", "value": 10}, {"kind": "LONG", "value": 2}],
+    },
+}
+
+
+@pytest.fixture
+def config():
+    """Create a test configuration."""
+    return TrinoConfig(
+        host="localhost",
+        port=8080,
+        user="trino",
+        catalog="test_catalog",
+        schema="test_schema",
+        session_properties={"query_max_run_time": "30s"},
+    )
+
+
+def _run(config, handler, coro_fn):
+    """Run ``coro_fn(client)`` against a client backed by *handler*."""
+
+    async def _main():
+        async with AsyncTrinoClient(config, transport=httpx.MockTransport(handler)) as client:
+            return await coro_fn(client)
+
+    return asyncio.run(_main())
+
+
+def _paged_handler(pages, requests_seen):
+    """Serve *pages* in order: the POST gets the first, each nextUri GET the next."""
+
+    def handler(request):
+        requests_seen.append(request)
+        index = 0 if request.method == "POST" else int(request.url.path.rsplit("/", 1)[1])
+        page = {"id": "q1", **pages[index]}
+        if index + 1 < len(pages):
+            page["nextUri"] = f"{BASE}/v1/statement/executing/q1/{index + 1}"
+        return httpx.Response(200, json=page)
+
+    return handler
+
+
+# ---------------------------------------------------------------------------
+# Statement protocol
+# ---------------------------------------------------------------------------
+
+
+def test_execute_query_follows_next_uri(config):
+    """Test that rows from every page are collected and typed."""
+    seen = []
+    pages = [
+        {"stats": {"state": "QUEUED"}},
+        {"columns": [_BIGINT, _DECIMAL], "data": [[1, "1.50"]]},
+        {"columns": [_BIGINT, _DECIMAL], "data": [[2, "2.25"]]},
+        {"stats": {"state": "FINISHED"}},
+    ]
+
+    result = _run(config, _paged_handler(pages, seen), lambda c: c.execute_query("SELECT 1"))
+
+    assert result == [
+        {"n": 1, "price": Decimal("1.50")},
+        {"n": 2, "price": Decimal("2.25")},
+    ]
+    assert [r.method for r in seen] == ["POST", "GET", "GET", "GET"]
+
+
+def test_statement_is_watermarked_with_session_headers(config):
+    """Test the submitted statement carries the watermark and session headers."""
+    seen = []
+    pages = [{"columns": [_BIGINT], "data": [[1]]}]
+
+    _run(config, _paged_handler(pages, seen), lambda c: c.execute_query("SELECT 1"))
+
+    post = seen[0]
+    body = post.content.decode()
+    assert body.startswith("-- {")
+    assert body.endswith("--\nSELECT 1")
+    assert post.headers["X-Trino-User"] == "trino"
+    assert post.headers["X-Trino-Catalog"] == "test_catalog"
+    assert post.headers["X-Trino-Schema"] == "test_schema"
+    assert post.headers["X-Trino-Session"] == "query_max_run_time=30s"
+
+
+def test_execute_query_no_output(config):
+    """Test that statements without columns return the status dict."""
+    pages = [{"stats": {"state": "FINISHED"}, "updateType": "CREATE TABLE"}]
+
+    result = _run(config, _paged_handler(pages, []), lambda c: c.execute_query("CREATE TABLE t (x int)"))
+
+    assert result == {
+        "status": "success",
+        "message": "Query executed successfully without output.",
+    }
+
+
+def test_execute_query_json(config):
+    pages = [{"columns": [_BIGINT], "data": [[7]]}]
+
+    result = _run(config, _paged_handler(pages, []), lambda c: c.execute_query_json("SELECT 7 AS n"))
+
+    assert json.loads(result) == [{"n": 7}]
+
+
+def test_query_error_raises_trino_error(config):
+    """Test that an error in the status is raised like the dbapi client does."""
+
+    def handler(request):
+        return httpx.Response(200, json={
+            "id": "q1",
+            "error": {
+                "message": "line 1:8: Column 'x' cannot be resolved",
+                "errorName": "COLUMN_NOT_FOUND",
+                "errorType": "USER_ERROR",
+            },
+        })
+
+    with pytest.raises(trino.exceptions.TrinoUserError, match="cannot be resolved"):
+        _run(config, handler, lambda c: c.execute_query("SELECT x"))
+
+
+def test_retries_transient_status(config):
+    """Test that a 503 from the coordinator is retried."""
+    responses = [httpx.Response(503), httpx.Response(200, json={"id": "q1", "columns": [_BIGINT], "data": [[1]]})]
+
+    result = _run(config, lambda request: responses.pop(0), lambda c: c.execute_query("SELECT 1"))
+
+    assert result == [{"n": 1}]
+
+
+def test_http_error_raised(config):
+    with pytest.raises(trino.exceptions.HttpError, match="error 401"):
+        _run(config, lambda request: httpx.Response(401, text="Unauthorized"), lambda c: c.execute_query("SELECT 1"))
+
+
+def test_timeout_cancels_query(config):
+    """Test that an overrunning query is cancelled on the server."""
+    config.query_timeout_minutes = 0.2 / 60
+    seen = []
+
+    async def handler(request):
+        seen.append(request)
+        if request.method == "POST":
+            return httpx.Response(200, json={"id": "q1", "nextUri": f"{BASE}/v1/statement/executing/q1/1"})
+        if request.method == "GET":
+            await asyncio.sleep(5)
+        return httpx.Response(204)
+
+    with pytest.raises(QueryTimeoutError, match="query_id=q1"):
+        _run(config, handler, lambda c: c.execute_query("SELECT slow()"))
+
+    deletes = [str(r.url) for r in seen if r.method == "DELETE"]
+    assert deletes == [f"{BASE}/v1/statement/executing/q1/1", f"{BASE}/v1/query/q1"]
+
+
+# ---------------------------------------------------------------------------
+# Authentication
+# ---------------------------------------------------------------------------
+
+
+def test_basic_auth_applied(config):
+    config.auth = trino.auth.BasicAuthentication("trino", "secret")
+    seen = []
+
+    _run(config, _paged_handler([{"columns": [_BIGINT], "data": [[1]]}], seen), lambda c: c.execute_query("SELECT 1"))
+
+    assert seen[0].headers["Authorization"].startswith("Basic ")
+
+
+def test_oauth2_not_supported(config):
+    config.auth = trino.auth.OAuth2Authentication()
+
+    with pytest.raises(ValueError, match="OAuth2"):
+        AsyncTrinoClient(config)
+
+
+# ---------------------------------------------------------------------------
+# Metadata helpers
+# ---------------------------------------------------------------------------
+
+
+def test_list_tables(config):
+    seen = []
+    column = {
+        "name": "Table",
+        "type": "varchar",
+        "typeSignature": {"rawType": "varchar", "arguments": [{"kind": "LONG", "value": 2147483647}]},
+    }
+    pages = [{"columns": [column], "data": [["orders"], ["users"]]}]
+
+    result = _run(config, _paged_handler(pages, seen), lambda c: c.list_tables("", ""))
+
+    assert result == ["orders", "users"]
+    assert seen[0].content.decode().endswith("SHOW TABLES FROM test_catalog.test_schema")
+
+
+def test_list_tables_requires_catalog_and_schema():
+    config = TrinoConfig(host="localhost", port=8080, user="trino")
+
+    with pytest.raises(ValueError, match="Both catalog and schema"):
+        _run(config, _paged_handler([], []), lambda c: c.list_tables("", ""))
+
+
+def test_metadata_lookups_use_shared_cache(config):
+    """Test that the async client reads and invalidates a shared MetadataCache."""
+    cache = MetadataCache({kind: 60 for kind in METADATA_KINDS})
+    cache.load("tables", ("test_catalog", "test_schema"), lambda: ["cached"])
+    seen = []
+    handler = _paged_handler([{"stats": {"state": "FINISHED"}}], seen)
+
+    async def main():
+        async with AsyncTrinoClient(config, transport=httpx.MockTransport(handler), metadata_cache=cache) as client:
+            tables = await client.list_tables("", "")
+            await client.execute_query("DROP TABLE old_orders")
+            return tables
+
+    assert asyncio.run(main()) == ["cached"]
+    assert len(seen) == 1  # only the DROP reached Trino
+    assert len(cache) == 0
+
+
+def test_snapshot_schema(config):
+    """Test that the async client loads a snapshot and describes from it."""
+    varchar = {
+        "type": "varchar",
+        "typeSignature": {"rawType": "varchar", "arguments": [{"kind": "LONG", "value": 2147483647}]},
+    }
+    columns = [dict(varchar, name=name) for name in ("table_schema", "table_name", "column_name", "data_type")]
+    seen = []
+    pages = [{"columns": columns, "data": [["web", "orders", "id", "bigint"]]}]
+
+    async def main(client):
+        loaded = await client.snapshot_schema("hive")
+        return loaded, await client.describe_table("hive", "web", "orders")
+
+    loaded, described = _run(config, _paged_handler(pages, seen), main)
+
+    assert loaded == (1, 1)
+    assert json.loads(described) == [{"Column": "id", "Type": "bigint", "Extra": "", "Comment": ""}]
+    assert len(seen) == 1
+
+
+def test_execute_query_json_limited_cancels_rest(config):
+    """Test that polling stops and the query is cancelled once the cap is hit."""
+    seen = []
+    pages = [{"columns": [_BIGINT], "data": [[i] for i in range(j, j + 3)]} for j in range(0, 30, 3)]
+
+    def handler(request):
+        if request.method == "DELETE":
+            seen.append(request)
+            return httpx.Response(204)
+        return _paged_handler(pages, seen)(request)
+
+    result, truncated = _run(
+        config, handler, lambda c: c.execute_query_json_limited("SHOW TABLES", 4)
+    )
+
+    assert json.loads(result) == [{"n": 0}, {"n": 1}, {"n": 2}, {"n": 3}]
+    assert truncated is True
+    assert [r.method for r in seen] == ["POST", "GET", "DELETE", "DELETE"]
+
+
+def test_execute_query_json_limited_injects_limit(config):
+    seen = []
+    pages = [{"columns": [_BIGINT], "data": [[1]]}]
+
+    result, truncated = _run(
+        config, _paged_handler(pages, seen), lambda c: c.execute_query_json_limited("SELECT n FROM t", 4)
+    )
+
+    assert seen[0].content.decode().endswith("SELECT * FROM (\nSELECT n FROM t\n) LIMIT 5")
+    assert truncated is False
+
+
+def test_fetch_into_fills_spool(config):
+    pages = [{"columns": [_BIGINT], "data": [[1], [2], [3]]}]
+    spool = RowSpool(max_bytes=row_size((1,)) * 2)
+
+    columns, truncated = _run(
+        config, _paged_handler(pages, []), lambda c: c.fetch_into("SELECT n FROM t", spool, 10)
+    )
+
+    assert columns == ["n"]
+    assert truncated is True
+    assert list(spool.rows()) == [(1,), (2,)]
@@ -0,0 +1,287 @@
+"""Tests for trino_mcp.cache module."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from trino_mcp.cache import METADATA_KINDS, MetadataCache, ResultCache
+
+
+def test_result_cache_get_put():
+    cache = ResultCache(ttl_seconds=60, max_bytes=1024)
+
+    assert cache.get("q") is None
+    cache.put("q", "result")
+
+    assert cache.get("q") == "result"
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_result_cache_entries_expire():
+    cache = ResultCache(ttl_seconds=10, max_bytes=1024)
+
+    with patch("trino_mcp.cache.time.monotonic", return_value=100.0):
+        cache.put("q", "result")
+    with patch("trino_mcp.cache.time.monotonic", return_value=109.0):
+        assert cache.get("q") == "result"
+    with patch("trino_mcp.cache.time.monotonic", return_value=110.0):
+        assert cache.get("q") is None
+
+    assert len(cache) == 0
+    assert cache.size_bytes == 0
+
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(ttl_seconds=60, max_bytes=10)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    cache.get("a")  # "b" is now the least recently used
+
+    cache.put("c", "cccc")
+
+    assert cache.get("a") == "aaaa"
+    assert cache.get("b") is None
+    assert cache.get("c") == "cccc"
+    assert cache.size_bytes == 8
+
+
+def test_result_cache_sizes_in_utf8_bytes():
+    cache = ResultCache(ttl_seconds=60, max_bytes=100)
+
+    cache.put("q", "é" * 10)
+
+    assert cache.size_bytes == 20
+
+
+def test_result_cache_skips_oversized_values():
+    cache = ResultCache(ttl_seconds=60, max_bytes=4)
+    cache.put("small", "abc")
+
+    cache.put("big", "abcdefgh")
+
+    assert cache.get("big") is None
+    assert cache.get("small") == "abc"
+
+
+def test_result_cache_replaces_existing_key():
+    cache = ResultCache(ttl_seconds=60, max_bytes=100)
+    cache.put("q", "old value")
+
+    cache.put("q", "new")
+
+    assert cache.get("q") == "new"
+    assert cache.size_bytes == 3
+
+
+def test_result_cache_clear():
+    cache = ResultCache(ttl_seconds=60, max_bytes=100)
+    cache.put("a", "1")
+    cache.put("b", "2")
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.size_bytes == 0
+
+
+# ---------------------------------------------------------------------------
+# MetadataCache
+# ---------------------------------------------------------------------------
+
+
+class NotFound(Exception):
+    pass
+
+
+def _metadata_cache(**ttls):
+    return MetadataCache(
+        {kind: ttls.get(kind, 60) for kind in METADATA_KINDS},
+        negative_ttl_seconds=5,
+        is_negative=lambda e: isinstance(e, NotFound),
+    )
+
+
+def test_metadata_cache_load_calls_loader_once():
+    cache = _metadata_cache()
+    loader = MagicMock(return_value=["t1", "t2"])
+
+    assert cache.load("tables", ("hive", "web"), loader) == ["t1", "t2"]
+    assert cache.load("tables", ("HIVE", "Web"), loader) == ["t1", "t2"]
+
+    loader.assert_called_once()
+
+
+def test_metadata_cache_per_type_ttl():
+    cache = _metadata_cache(catalogs=100, columns=10)
+
+    with patch("trino_mcp.cache.time.monotonic", return_value=0.0):
+        cache.load("catalogs", (), lambda: ["hive"])
+        cache.load("columns", ("hive", "web", "t"), lambda: "[]")
+    with patch("trino_mcp.cache.time.monotonic", return_value=50.0):
+        assert cache.load("catalogs", (), lambda: ["fresh"]) == ["hive"]
+        assert cache.load("columns", ("hive", "web", "t"), lambda: "fresh") == "fresh"
+
+
+def test_metadata_cache_evicts_least_recently_used():
+    cache = MetadataCache({kind: 60 for kind in METADATA_KINDS}, max_entries=2)
+
+    cache.load("schemas", ("a",), lambda: ["s"])
+    cache.load("schemas", ("b",), lambda: ["s"])
+    cache.load("schemas", ("a",), lambda: ["fresh"])
+    cache.load("schemas", ("c",), lambda: ["s"])
+
+    assert len(cache) == 2
+    assert cache.load("schemas", ("a",), lambda: ["fresh"]) == ["s"]
+    assert cache.load("schemas", ("b",), lambda: ["fresh"]) == ["fresh"]
+
+
+def test_metadata_cache_evicts_expired_entries_first():
+    cache = MetadataCache({"catalogs": 10, "schemas": 100}, max_entries=2)
+
+    with patch("trino_mcp.cache.time.monotonic", return_value=0.0):
+        cache.load("schemas", ("a",), lambda: ["s"])
+        cache.load("catalogs", (), lambda: ["hive"])
+    with patch("trino_mcp.cache.time.monotonic", return_value=50.0):
+        cache.load("schemas", ("b",), lambda: ["s"])
+        assert cache.load("schemas", ("a",), lambda: ["fresh"]) == ["s"]
+
+
+def test_metadata_cache_zero_ttl_disables_type():
+    cache = _metadata_cache(ddl=0)
+
+    cache.load("ddl", ("hive", "web", "t"), lambda: "CREATE TABLE ...")
+
+    assert len(cache) == 0
+
+
+def test_metadata_cache_negative_caching():
+    cache = _metadata_cache()
+    loader = MagicMock(side_effect=NotFound("Table 'hive.web.t' does not exist"))
+
+    for _ in range(2):
+        with pytest.raises(NotFound, match="does not exist"):
+            cache.load("columns", ("hive", "web", "t"), loader)
+
+    loader.assert_called_once()
+
+
+def test_metadata_cache_negative_entries_expire():
+    cache = _metadata_cache()
+
+    with patch("trino_mcp.cache.time.monotonic", return_value=0.0):
+        with pytest.raises(NotFound):
+            cache.load("columns", ("hive", "web", "t"), MagicMock(side_effect=NotFound()))
+    with patch("trino_mcp.cache.time.monotonic", return_value=6.0):
+        assert cache.load("columns", ("hive", "web", "t"), lambda: "[]") == "[]"
+
+
+def test_metadata_cache_other_errors_not_cached():
+    cache = _metadata_cache()
+    loader = MagicMock(side_effect=[RuntimeError("connection reset"), ["t1"]])
+
+    with pytest.raises(RuntimeError):
+        cache.load("tables", ("hive", "web"), loader)
+
+    assert cache.load("tables", ("hive", "web"), loader) == ["t1"]
+
+
+def test_metadata_cache_aload():
+    cache = _metadata_cache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return ["hive"]
+
+    async def run():
+        return [await cache.aload("catalogs", (), loader) for _ in range(2)]
+
+    assert asyncio.run(run()) == [["hive"], ["hive"]]
+    assert len(calls) == 1
+
+
+def test_metadata_cache_unknown_type():
+    with pytest.raises(ValueError, match="Unknown metadata cache types: views"):
+        MetadataCache({"views": 60})
+
+
+def _populated_cache():
+    cache = _metadata_cache()
+    cache.load("catalogs", (), lambda: ["hive", "iceberg"])
+    cache.load("schemas", ("hive",), lambda: ["web", "sales"])
+    cache.load("schemas", ("iceberg",), lambda: ["raw"])
+    cache.load("tables", ("hive", "web"), lambda: ["t", "u"])
+    cache.load("tables", ("hive", "sales"), lambda: ["orders"])
+    cache.load("columns", ("hive", "web", "t"), lambda: "[t]")
+    cache.load("ddl", ("hive", "web", "t"), lambda: "CREATE TABLE t")
+    cache.load("columns", ("hive", "web", "u"), lambda: "[u]")
+    return cache
+
+
+def _cached_keys(cache):
+    return set(cache._entries)
+
+
+def test_metadata_cache_invalidate_table():
+    cache = _populated_cache()
+
+    assert cache.invalidate("hive", "web", "T") == 3
+
+    assert ("tables", ("hive", "web")) not in _cached_keys(cache)
+    assert ("columns", ("hive", "web", "t")) not in _cached_keys(cache)
+    assert ("columns", ("hive", "web", "u")) in _cached_keys(cache)
+    assert ("schemas", ("hive",)) in _cached_keys(cache)
+
+
+def test_metadata_cache_invalidate_schema():
+    cache = _populated_cache()
+
+    assert cache.invalidate("hive", "web") == 5
+
+    assert _cached_keys(cache) == {
+        ("catalogs", ()),
+        ("schemas", ("iceberg",)),
+        ("tables", ("hive", "sales")),
+    }
+
+
+def test_metadata_cache_invalidate_catalog():
+    cache = _populated_cache()
+
+    cache.invalidate("hive")
+
+    assert _cached_keys(cache) == {("schemas", ("iceberg",))}
+
+
+def test_metadata_cache_invalidate_all():
+    cache = _populated_cache()
+
+    assert cache.invalidate() == 8
+    assert len(cache) == 0
+
+
+def test_metadata_cache_invalidate_query_resolves_defaults():
+    cache = _populated_cache()
+
+    cache.invalidate_query("DROP TABLE t", catalog="hive", schema="web")
+
+    assert ("columns", ("hive", "web", "t")) not in _cached_keys(cache)
+    assert ("columns", ("hive", "web", "u")) in _cached_keys(cache)
+
+
+def test_metadata_cache_invalidate_query_ignores_dml():
+    cache = _populated_cache()
+
+    cache.invalidate_query("INSERT INTO hive.web.t VALUES (1)")
+
+    assert len(cache) == 8
+
+
+def test_metadata_cache_invalidate_query_unknown_ddl_clears_all():
+    cache = _populated_cache()
+
+    cache.invalidate_query("CREATE CATALOG lake USING iceberg")
+
+    assert len(cache) == 0
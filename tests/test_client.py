@@ -3,13 +3,17 @@
 import csv
 import json
 import threading
+import time
 from unittest.mock import MagicMock, Mock, patch
 
 import pytest
+import trino
 
 from trino_mcp import __version__
+from trino_mcp.cache import METADATA_KINDS
 from trino_mcp.client import QueryTimeoutError, TrinoClient
 from trino_mcp.config import TrinoConfig
+from trino_mcp.spool import RowSpool, row_size
 
 
 def _expected_watermark(user: str = "trino", **custom) -> str:
@@ -20,6 +24,18 @@ def _expected_watermark(user: str = "trino", **custom) -> str:
     return f"-- {json.dumps(data)} --"
 
 
+def _fetchmany_from(rows):
+    """Return a ``cursor.fetchmany`` side effect that pages through *rows*."""
+    remaining = list(rows)
+
+    def _fetchmany(size=None):
+        batch = remaining[:size]
+        del remaining[:size]
+        return batch
+
+    return _fetchmany
+
+
 @pytest.fixture
 def config():
     """Create a test configuration."""
@@ -46,7 +62,10 @@ def test_client_initialization(config, mock_connection):
     client = TrinoClient(config)
 
     assert client.config == config
-    assert client.connection == mock_connection
+    assert client.pool.max_size == config.max_concurrent_queries
+    # Connections are created on the first query, not up front.
+    assert client.pool.size == 0
+    assert client.pool.acquire() is mock_connection
 
 
 def test_execute_query_json_with_results(config, mock_connection):
@@ -477,7 +496,7 @@ def test_execute_query_to_file_json(config, mock_connection, tmp_path):
     """Test writing query results as JSON to a file."""
     mock_cursor = MagicMock()
     mock_cursor.description = [("col1",), ("col2",)]
-    mock_cursor.fetchall.return_value = [("val1", "val2"), ("val3", "val4")]
+    mock_cursor.fetchmany.side_effect = _fetchmany_from([("val1", "val2"), ("val3", "val4")])
     mock_connection.cursor.return_value = mock_cursor
 
     client = TrinoClient(config)
@@ -496,7 +515,7 @@ def test_execute_query_to_file_csv(config, mock_connection, tmp_path):
     """Test writing query results as CSV to a file."""
     mock_cursor = MagicMock()
     mock_cursor.description = [("col1",), ("col2",)]
-    mock_cursor.fetchall.return_value = [("val1", "val2"), ("val3", "val4")]
+    mock_cursor.fetchmany.side_effect = _fetchmany_from([("val1", "val2"), ("val3", "val4")])
     mock_connection.cursor.return_value = mock_cursor
 
     client = TrinoClient(config)
@@ -518,10 +537,10 @@ def test_execute_query_to_file_csv_special_characters(
     """Test CSV file output properly handles special characters."""
     mock_cursor = MagicMock()
     mock_cursor.description = [("name",), ("value",)]
-    mock_cursor.fetchall.return_value = [
+    mock_cursor.fetchmany.side_effect = _fetchmany_from([
         ("hello, world", 'has "quotes"'),
         ("line1\nline2", "simple"),
-    ]
+    ])
     mock_connection.cursor.return_value = mock_cursor
 
     client = TrinoClient(config)
@@ -575,7 +594,7 @@ def test_execute_query_to_file_csv_empty_results(config, mock_connection, tmp_pa
     """Test writing empty query results to CSV file."""
     mock_cursor = MagicMock()
     mock_cursor.description = [("col1",), ("col2",)]
-    mock_cursor.fetchall.return_value = []
+    mock_cursor.fetchmany.side_effect = _fetchmany_from([])
     mock_connection.cursor.return_value = mock_cursor
 
     client = TrinoClient(config)
@@ -661,12 +680,14 @@ def test_execute_cursor_retries_on_failure(config):
         mock_connect.side_effect = [stale_conn, fresh_conn]
 
         client = TrinoClient(config)
-        assert client.connection is stale_conn
+        assert client.pool.acquire() is stale_conn
 
+        client.pool.release(stale_conn)
         columns, rows = client._execute_cursor("SELECT 1")
 
-        # Should have reconnected
-        assert client.connection is fresh_conn
+        # Should have reconnected; the fresh connection goes back to the pool
+        assert client.pool.acquire() is fresh_conn
+        assert client.pool.size == 1
         assert columns == ["col1"]
         assert rows == [("value1",)]
         # Stale connection should have been closed
@@ -830,3 +851,788 @@ def test_execute_cursor_with_timeout_propagates_error(config):
         with pytest.raises(RuntimeError, match="Connection lost"):
             client._execute_cursor("SELECT 1")
 
+
+
+# ---------------------------------------------------------------------------
+# iter_query — streaming execution
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("timeout_minutes", [0, 1])
+def test_iter_query_yields_batches(config, mock_connection, timeout_minutes):
+    """Test that iter_query yields rows in batches of at most batch_size."""
+    config.query_timeout_minutes = timeout_minutes
+    mock_cursor = MagicMock()
+    mock_cursor.description = [("n",)]
+    mock_cursor.fetchmany.side_effect = _fetchmany_from([(i,) for i in range(5)])
+    mock_connection.cursor.return_value = mock_cursor
+
+    client = TrinoClient(config)
+    with client.iter_query("SELECT n FROM t", batch_size=2) as stream:
+        assert stream.columns == ["n"]
+        batches = list(stream)
+
+    assert batches == [[(0,), (1,)], [(2,), (3,)], [(4,)]]
+    mock_cursor.fetchall.assert_not_called()
+
+
+@pytest.mark.parametrize("timeout_minutes", [0, 1])
+def test_iter_query_without_results(config, mock_connection, timeout_minutes):
+    """Test that iter_query on DDL/DML has no columns and yields nothing."""
+    config.query_timeout_minutes = timeout_minutes
+    mock_cursor = MagicMock()
+    mock_cursor.description = None
+    mock_connection.cursor.return_value = mock_cursor
+
+    client = TrinoClient(config)
+    with client.iter_query("CREATE TABLE test (id INT)") as stream:
+        assert stream.columns is None
+        assert list(stream) == []
+
+
+def test_iter_query_rows(config, mock_connection):
+    """Test that ResultStream.rows() flattens batches into rows."""
+    mock_cursor = MagicMock()
+    mock_cursor.description = [("n",)]
+    mock_cursor.fetchmany.side_effect = _fetchmany_from([(1,), (2,), (3,)])
+    mock_connection.cursor.return_value = mock_cursor
+
+    client = TrinoClient(config)
+    with client.iter_query("SELECT n FROM t", batch_size=2) as stream:
+        assert list(stream.rows()) == [(1,), (2,), (3,)]
+
+
+def test_iter_query_propagates_fetch_error(config, mock_connection):
+    """Test that errors raised while fetching surface from the iteration."""
+    mock_cursor = MagicMock()
+    mock_cursor.description = [("n",)]
+    mock_cursor.fetchmany.side_effect = RuntimeError("Connection lost")
+    mock_connection.cursor.return_value = mock_cursor
+
+    client = TrinoClient(config)
+    with client.iter_query("SELECT n FROM t") as stream:
+        with pytest.raises(RuntimeError, match="Connection lost"):
+            list(stream)
+
+
+def test_iter_query_cancels_on_timeout(config, mock_connection):
+    """Test that a stream exceeding the timeout cancels the query."""
+    config.query_timeout_minutes = 1 / 60
+    mock_cursor = MagicMock()
+    slow_event = threading.Event()
+    mock_cursor.execute.side_effect = lambda query: slow_event.wait(timeout=10)
+    mock_cursor.query_id = "test-query-id"
+    mock_connection.cursor.return_value = mock_cursor
+
+    client = TrinoClient(config)
+    with pytest.raises(QueryTimeoutError, match="timeout"):
+        client.iter_query("SELECT slow()")
+
+    mock_cursor.cancel.assert_called_once()
+    slow_event.set()
+
+
+def test_iter_query_rejects_invalid_batch_size(config, mock_connection):
+    """Test that a non-positive batch_size is rejected."""
+    client = TrinoClient(config)
+
+    with pytest.raises(ValueError, match="batch_size"):
+        client.iter_query("SELECT 1", batch_size=0)
+
+
+def test_execute_query_to_file_streams_in_batches(config, mock_connection, tmp_path):
+    """Test that execute_query_to_file fetches via fetchmany, never fetchall."""
+    rows = [(i, f"name{i}") for i in range(25_001)]
+    mock_cursor = MagicMock()
+    mock_cursor.description = [("id",), ("name",)]
+    mock_cursor.fetchmany.side_effect = _fetchmany_from(rows)
+    mock_connection.cursor.return_value = mock_cursor
+
+    client = TrinoClient(config)
+    output_file = str(tmp_path / "results.csv")
+    row_count = client.execute_query_to_file("SELECT * FROM big", output_file)
+
+    assert row_count == len(rows)
+    mock_cursor.fetchall.assert_not_called()
+    with open(output_file, newline="") as f:
+        assert sum(1 for _ in csv.reader(f)) == len(rows) + 1
+
+
+def test_execute_query_to_file_removes_partial_file_on_error(
+    config, mock_connection, tmp_path
+):
+    """Test that a failure mid-stream does not leave a truncated file behind."""
+    batches = iter([[("a",)]])
+
+    def _fetchmany(size=None):
+        try:
+            return next(batches)
+        except StopIteration:
+            raise RuntimeError("Connection lost")
+
+    mock_cursor = MagicMock()
+    mock_cursor.description = [("col1",)]
+    mock_cursor.fetchmany.side_effect = _fetchmany
+    mock_connection.cursor.return_value = mock_cursor
+
+    client = TrinoClient(config)
+    output_file = tmp_path / "results.csv"
+    with pytest.raises(RuntimeError, match="Connection lost"):
+        client.execute_query_to_file("SELECT * FROM t", str(output_file))
+
+    assert not output_file.exists()
+
+
+def test_execute_query_to_file_json_without_indent(config, mock_connection, tmp_path):
+    """Test that json_indent=None writes compact JSON."""
+    mock_cursor = MagicMock()
+    mock_cursor.description = [("col1",), ("col2",)]
+    mock_cursor.fetchmany.side_effect = _fetchmany_from([("val1", "val2"), ("val3", "val4")])
+    mock_connection.cursor.return_value = mock_cursor
+
+    client = TrinoClient(config)
+    output_file = tmp_path / "results.json"
+    row_count = client.execute_query_to_file(
+        "SELECT * FROM test", str(output_file), json_indent=None
+    )
+
+    assert row_count == 2
+    assert output_file.read_text() == (
+        '[{"col1": "val1", "col2": "val2"}, {"col1": "val3", "col2": "val4"}]'
+    )
+
+
+@pytest.mark.parametrize("ext", [".jsonl", ".ndjson"])
+def test_execute_query_to_file_ndjson(config, mock_connection, tmp_path, ext):
+    """Test writing query results as JSON Lines to a file."""
+    mock_cursor = MagicMock()
+    mock_cursor.description = [("col1",), ("col2",)]
+    mock_cursor.fetchmany.side_effect = _fetchmany_from([("val1", "val2"), ("val3", "val4")])
+    mock_connection.cursor.return_value = mock_cursor
+
+    client = TrinoClient(config)
+    output_file = tmp_path / f"results{ext}"
+    row_count = client.execute_query_to_file("SELECT * FROM test", str(output_file))
+
+    assert row_count == 2
+    lines = output_file.read_text().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"col1": "val1", "col2": "val2"},
+        {"col1": "val3", "col2": "val4"},
+    ]
+
+
+def test_execute_query_to_file_ndjson_no_results(config, mock_connection, tmp_path):
+    """Test writing DDL/DML (no output) results to a JSON Lines file."""
+    mock_cursor = MagicMock()
+    mock_cursor.description = None
+    mock_connection.cursor.return_value = mock_cursor
+
+    client = TrinoClient(config)
+    output_file = tmp_path / "results.jsonl"
+    row_count = client.execute_query_to_file("CREATE TABLE test (id INT)", str(output_file))
+
+    assert row_count == 1
+    lines = output_file.read_text().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["status"] == "success"
+
+
+def test_execute_query_to_file_parquet(config, mock_connection, tmp_path):
+    """Test writing query results as Parquet using cursor description types."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    mock_cursor = MagicMock()
+    mock_cursor.description = [("id", "integer"), ("name", "varchar")]
+    mock_cursor.fetchmany.side_effect = _fetchmany_from([(1, "a"), (2, "b")])
+    mock_connection.cursor.return_value = mock_cursor
+
+    client = TrinoClient(config)
+    output_file = tmp_path / "results.parquet"
+    row_count = client.execute_query_to_file("SELECT * FROM test", str(output_file))
+
+    assert row_count == 2
+    table = pq.read_table(output_file)
+    assert str(table.schema.field("id").type) == "int32"
+    assert table.to_pylist() == [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+
+
+def test_execute_query_to_file_parquet_no_results(config, mock_connection, tmp_path):
+    """Test writing DDL/DML (no output) results to a Parquet file."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    mock_cursor = MagicMock()
+    mock_cursor.description = None
+    mock_connection.cursor.return_value = mock_cursor
+
+    client = TrinoClient(config)
+    output_file = tmp_path / "results.parquet"
+    row_count = client.execute_query_to_file("CREATE TABLE test (id INT)", str(output_file))
+
+    assert row_count == 1
+    assert pq.read_table(output_file).to_pylist()[0]["status"] == "success"
+
+
+def test_execute_query_arrow(config, mock_connection):
+    """Test execute_query_arrow returns a typed RecordBatchReader."""
+    pytest.importorskip("pyarrow")
+    mock_cursor = MagicMock()
+    mock_cursor.description = [("id", "bigint"), ("name", "varchar")]
+    mock_cursor.fetchmany.side_effect = _fetchmany_from([(1, "a"), (2, "b"), (3, "c")])
+    mock_connection.cursor.return_value = mock_cursor
+
+    client = TrinoClient(config)
+    reader = client.execute_query_arrow("SELECT * FROM test", batch_size=2)
+    table = reader.read_all()
+
+    assert str(table.schema.field("id").type) == "int64"
+    assert table.num_rows == 3
+    assert table.column("name").to_pylist() == ["a", "b", "c"]
+    mock_cursor.fetchall.assert_not_called()
+
+
+def test_execute_query_arrow_without_results(config, mock_connection):
+    """Test execute_query_arrow yields a status row for DDL/DML."""
+    pytest.importorskip("pyarrow")
+    mock_cursor = MagicMock()
+    mock_cursor.description = None
+    mock_connection.cursor.return_value = mock_cursor
+
+    client = TrinoClient(config)
+    table = client.execute_query_arrow("CREATE TABLE test (id INT)").read_all()
+
+    assert table.to_pylist()[0]["status"] == "success"
+
+
+@pytest.mark.parametrize("ext", [".arrow", ".feather"])
+def test_execute_query_to_file_arrow(config, mock_connection, tmp_path, ext):
+    """Test writing query results as an Arrow IPC file."""
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.feather
+
+    mock_cursor = MagicMock()
+    mock_cursor.description = [("id", "integer"), ("name", "varchar")]
+    mock_cursor.fetchmany.side_effect = _fetchmany_from([(1, "a"), (2, "b")])
+    mock_connection.cursor.return_value = mock_cursor
+
+    client = TrinoClient(config)
+    output_file = tmp_path / f"results{ext}"
+    row_count = client.execute_query_to_file("SELECT * FROM test", str(output_file))
+
+    assert row_count == 2
+    table = pyarrow.feather.read_table(str(output_file), memory_map=True)
+    assert table.to_pylist() == [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+
+
+def test_execute_query_to_file_csv_gzip(config, mock_connection, tmp_path):
+    """Test that a .csv.gz output file is written as gzip-compressed CSV."""
+    import gzip
+
+    mock_cursor = MagicMock()
+    mock_cursor.description = [("col1",), ("col2",)]
+    mock_cursor.fetchmany.side_effect = _fetchmany_from([("val1", "val2"), ("val3", "val4")])
+    mock_connection.cursor.return_value = mock_cursor
+
+    client = TrinoClient(config)
+    output_file = tmp_path / "results.csv.gz"
+    row_count = client.execute_query_to_file("SELECT * FROM test", str(output_file))
+
+    assert row_count == 2
+    with gzip.open(output_file, "rt", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert rows == [{"col1": "val1", "col2": "val2"}, {"col1": "val3", "col2": "val4"}]
+
+
+def test_execute_query_to_file_rejects_invalid_path_before_running(
+    config, mock_connection
+):
+    """Test that an unsupported output path is rejected without running the query."""
+    client = TrinoClient(config)
+
+    with pytest.raises(ValueError, match="compressed internally"):
+        client.execute_query_to_file("SELECT 1", "/tmp/results.parquet.gz")
+
+    mock_connection.cursor.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# Connection pool
+# ---------------------------------------------------------------------------
+
+
+def test_concurrent_queries_use_separate_connections(config):
+    """Test that overlapping queries check out distinct pooled connections."""
+    config.max_concurrent_queries = 2
+    config.query_timeout_minutes = 0
+    with patch("trino_mcp.client.trino.dbapi.connect") as mock_connect:
+        connections = [MagicMock(), MagicMock()]
+        for conn in connections:
+            conn.cursor.return_value.description = [("n",)]
+            conn.cursor.return_value.fetchmany.side_effect = _fetchmany_from([(1,)])
+        mock_connect.side_effect = connections
+
+        client = TrinoClient(config)
+        first = client.iter_query("SELECT 1")
+        second = client.iter_query("SELECT 2")
+
+        assert mock_connect.call_count == 2
+        assert client.pool.idle_count == 0
+        assert list(first) == [[(1,)]]
+        assert list(second) == [[(1,)]]
+        # Exhausted streams return their connections to the pool.
+        assert client.pool.idle_count == 2
+
+
+def test_closed_stream_discards_connection(config, mock_connection):
+    """Test that closing a stream early releases its connection without reusing it."""
+    config.query_timeout_minutes = 0
+    mock_cursor = MagicMock()
+    mock_cursor.description = [("n",)]
+    mock_cursor.fetchmany.side_effect = _fetchmany_from([(1,), (2,)])
+    mock_connection.cursor.return_value = mock_cursor
+
+    client = TrinoClient(config)
+    with client.iter_query("SELECT n FROM t") as stream:
+        assert client.pool.idle_count == 0
+
+    # The query was cancelled mid-flight, so the connection is closed.
+    assert client.pool.size == 0
+    mock_connection.close.assert_called_once()
+
+
+def test_timed_out_query_discards_connection(config):
+    """Test that a connection whose query was cancelled is not reused."""
+    with patch("trino_mcp.client.trino.dbapi.connect") as mock_connect:
+        mock_conn = MagicMock()
+        slow_event = threading.Event()
+        mock_conn.cursor.return_value.execute.side_effect = (
+            lambda query: slow_event.wait(timeout=10)
+        )
+        mock_connect.return_value = mock_conn
+
+        client = TrinoClient(config)
+        with pytest.raises(QueryTimeoutError):
+            client._execute_cursor_with_timeout("SELECT slow()", timeout_minutes=1 / 60)
+        slow_event.set()
+
+        for _ in range(50):
+            if client.pool.size == 0:
+                break
+            time.sleep(0.1)
+        assert client.pool.size == 0
+        mock_conn.close.assert_called_once()
+
+
+# ---------------------------------------------------------------------------
+# Shared HTTP session
+# ---------------------------------------------------------------------------
+
+
+def test_connections_share_http_adapter(config):
+    """Test that every pooled connection sends requests through one adapter."""
+    config.max_concurrent_queries = 2
+    with patch("trino_mcp.client.trino.dbapi.connect") as mock_connect:
+        mock_connect.side_effect = lambda **kwargs: MagicMock()
+        client = TrinoClient(config)
+        client.pool.acquire()
+        client.pool.acquire()
+
+    sessions = [c.kwargs["http_session"] for c in mock_connect.call_args_list]
+    assert len(sessions) == 2
+    assert sessions[0] is not sessions[1]
+    for session in sessions:
+        assert session.get_adapter("https://localhost:8080/") is client.http_adapter
+
+
+def test_create_connection_applies_verify_to_session(config):
+    """Test that a ``verify`` kwarg is set on the session, not passed through."""
+    config.additional_kwargs = {"verify": "/etc/ssl/ca.pem"}
+    with patch("trino_mcp.client.trino.dbapi.connect") as mock_connect:
+        TrinoClient(config)._create_connection()
+
+    kwargs = mock_connect.call_args.kwargs
+    assert "verify" not in kwargs
+    assert kwargs["http_session"].verify == "/etc/ssl/ca.pem"
+
+
+def test_cancel_query_falls_back_to_client_session(config, mock_connection):
+    """Test that the REST cancel reuses the client's pooled session."""
+    client = TrinoClient(config)
+    cursor = MagicMock(spec=["cancel", "query_id"])
+    cursor.query_id = "20240101_000000_00001_abcde"
+
+    with patch.object(client.http_session, "delete") as mock_delete:
+        client._cancel_query(cursor)
+
+    mock_delete.assert_called_once_with(
+        "http://localhost:8080/v1/query/20240101_000000_00001_abcde", timeout=5
+    )
+
+
+def test_close_shuts_down_http_adapter(config, mock_connection):
+    """Test that closing the client releases the shared keep-alive sockets."""
+    client = TrinoClient(config)
+    client.pool.release(client.pool.acquire())
+
+    with patch.object(client.http_adapter.poolmanager, "clear") as mock_clear:
+        client.close()
+
+    mock_connection.close.assert_called_once()
+    mock_clear.assert_called_once()
+
+
+# ---------------------------------------------------------------------------
+# Metadata cache
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def cached_config(config):
+    """Configuration with the metadata cache enabled."""
+    config.query_timeout_minutes = 0
+    config.metadata_cache_ttls = {kind: 60 for kind in METADATA_KINDS}
+    return config
+
+
+def _user_error(name):
+    return trino.exceptions.TrinoUserError(
+        {"message": f"{name}", "errorName": name, "errorType": "USER_ERROR"}, "q1"
+    )
+
+
+def test_metadata_cache_disabled_by_default(config, mock_connection):
+    client = TrinoClient(config)
+
+    assert client.metadata_cache is None
+    assert client.invalidate_metadata() == 0
+
+
+def test_list_tables_served_from_metadata_cache(cached_config, mock_connection):
+    """Test that repeated listings run a single query."""
+    client = TrinoClient(cached_config)
+    with patch.object(client, "execute_query", return_value=[{"Table": "orders"}]) as mock_exec:
+        assert client.list_tables("hive", "web") == ["orders"]
+        assert client.list_tables("HIVE", "web") == ["orders"]
+
+    mock_exec.assert_called_once_with("SHOW TABLES FROM hive.web")
+
+
+def test_describe_table_not_found_is_negatively_cached(cached_config, mock_connection):
+    client = TrinoClient(cached_config)
+    error = _user_error("TABLE_NOT_FOUND")
+    with patch.object(client, "execute_query_json", side_effect=error) as mock_exec:
+        for _ in range(2):
+            with pytest.raises(trino.exceptions.TrinoUserError):
+                client.describe_table("hive", "web", "missing")
+
+    mock_exec.assert_called_once()
+
+
+def test_describe_table_other_user_errors_not_cached(cached_config, mock_connection):
+    client = TrinoClient(cached_config)
+    error = _user_error("PERMISSION_DENIED")
+    with patch.object(client, "execute_query_json", side_effect=error) as mock_exec:
+        for _ in range(2):
+            with pytest.raises(trino.exceptions.TrinoUserError):
+                client.describe_table("hive", "web", "secret")
+
+    assert mock_exec.call_count == 2
+
+
+def test_ddl_invalidates_cached_metadata(cached_config, mock_connection):
+    """Test that DDL run through the client drops affected entries."""
+    mock_cursor = MagicMock()
+    mock_cursor.description = None
+    mock_connection.cursor.return_value = mock_cursor
+    client = TrinoClient(cached_config)
+    with patch.object(client, "execute_query_json", return_value="[]") as mock_describe:
+        client.describe_table("", "", "orders")
+        client.execute_query("ALTER TABLE orders ADD COLUMN note VARCHAR")
+        client.describe_table("", "", "orders")
+
+    assert mock_describe.call_count == 2
+
+
+def test_ddl_invalidates_metadata_with_query_timeout(config, mock_connection):
+    """Test that DDL invalidates the cache and snapshot on the timeout path too."""
+    config.metadata_cache_ttls = {kind: 60 for kind in METADATA_KINDS}
+    assert config.query_timeout_minutes > 0
+    mock_cursor = MagicMock()
+    mock_cursor.description = None
+    mock_connection.cursor.return_value = mock_cursor
+    client = TrinoClient(config)
+    client.schema_snapshot.load("test_catalog", [("test_schema", "orders", "id", "bigint")])
+    with patch.object(client, "execute_query_json", return_value="[]") as mock_describe:
+        client.describe_table("", "", "users")
+        client.execute_query("ALTER TABLE users ADD COLUMN note VARCHAR")
+        client.describe_table("", "", "users")
+    with client.iter_query("DROP TABLE orders") as stream:
+        assert list(stream) == []
+
+    assert mock_describe.call_count == 2
+    assert len(client.schema_snapshot) == 0
+
+
+def test_dml_keeps_cached_metadata(cached_config, mock_connection):
+    mock_cursor = MagicMock()
+    mock_cursor.description = None
+    mock_connection.cursor.return_value = mock_cursor
+    client = TrinoClient(cached_config)
+    with patch.object(client, "execute_query_json", return_value="[]") as mock_describe:
+        client.describe_table("", "", "orders")
+        client.execute_query("INSERT INTO orders VALUES (1)")
+        client.describe_table("", "", "orders")
+
+    mock_describe.assert_called_once()
+
+
+def test_invalidate_metadata(cached_config, mock_connection):
+    client = TrinoClient(cached_config)
+    with patch.object(client, "execute_query", return_value=[{"Schema": "web"}]) as mock_exec:
+        client.list_schemas("hive")
+        assert client.invalidate_metadata("hive") == 1
+        client.list_schemas("hive")
+
+    assert mock_exec.call_count == 2
+
+
+# ---------------------------------------------------------------------------
+# Schema snapshot
+# ---------------------------------------------------------------------------
+
+
+def test_snapshot_schema_answers_describe_locally(config, mock_connection):
+    """Test that one information_schema query serves every describe_table."""
+    config.query_timeout_minutes = 0
+    mock_cursor = MagicMock()
+    mock_cursor.description = [
+        ("table_schema", "varchar"), ("table_name", "varchar"),
+        ("column_name", "varchar"), ("data_type", "varchar"),
+    ]
+    mock_cursor.fetchmany.side_effect = _fetchmany_from([
+        ("web", "orders", "id", "bigint"),
+        ("web", "users", "name", "varchar"),
+    ])
+    mock_connection.cursor.return_value = mock_cursor
+    client = TrinoClient(config)
+
+    assert client.snapshot_schema("hive", "web") == (2, 2)
+
+    sql = mock_cursor.execute.call_args[0][0]
+    assert "FROM hive.information_schema.columns\nWHERE table_schema = 'web'" in sql
+    mock_cursor.execute.reset_mock()
+    described = json.loads(client.describe_table("hive", "web", "users"))
+    assert described == [{"Column": "name", "Type": "varchar", "Extra": "", "Comment": ""}]
+    mock_cursor.execute.assert_not_called()
+
+
+def test_snapshot_schema_requires_catalog(mock_connection):
+    client = TrinoClient(TrinoConfig(host="localhost", port=8080, user="trino"))
+
+    with pytest.raises(ValueError, match="Catalog must be specified"):
+        client.snapshot_schema("")
+
+
+def test_invalidate_metadata_drops_snapshot(config, mock_connection):
+    client = TrinoClient(config)
+    client.schema_snapshot.load("hive", [("web", "orders", "id", "bigint")])
+
+    client.invalidate_metadata("hive", "web")
+
+    assert len(client.schema_snapshot) == 0
+
+
+def test_list_tables_served_from_snapshot(config, mock_connection):
+    client = TrinoClient(config)
+    client.schema_snapshot.load("hive", [("web", "users", "id", "bigint")], "web")
+    mock_cursor = mock_connection.cursor.return_value
+    mock_cursor.execute.reset_mock()
+
+    assert client.list_tables("hive", "web") == ["users"]
+    mock_cursor.execute.assert_not_called()
+
+
+def test_metadata_store_persists_snapshot(config, mock_connection, tmp_path):
+    """Test that a snapshot saved by one client is restored by the next."""
+    config.metadata_store_path = str(tmp_path / "metadata.db")
+    client = TrinoClient(config)
+    client.schema_snapshot.load("hive", [("web", "users", "id", "bigint")])
+    client.close()
+
+    restarted = TrinoClient(config)
+
+    assert restarted.schema_snapshot.restore() == 1
+    assert restarted.list_tables("hive", "web") == ["users"]
+
+
+def test_refresh_snapshot_reloads_stale_schemas(config, mock_connection):
+    client = TrinoClient(config)
+    client.schema_snapshot.load("hive", [("web", "users", "id", "bigint"), ("sales", "leads", "id", "bigint")])
+    calls = []
+
+    def _snapshot(catalog, schema):
+        calls.append((catalog, schema))
+        if schema == "sales":
+            raise RuntimeError("Access Denied")
+        return 1, 1
+
+    with patch.object(client, "snapshot_schema", side_effect=_snapshot):
+        assert client.refresh_snapshot(3600) == 0
+        assert client.refresh_snapshot(0) == 1
+
+    assert sorted(calls) == [("hive", "sales"), ("hive", "web")]
+
+
+def test_search_tables_uses_snapshot(config, mock_connection):
+    client = TrinoClient(config)
+    client.schema_snapshot.load("hive", [("web", "orders", "revenue", "double")])
+    mock_cursor = mock_connection.cursor.return_value
+    mock_cursor.execute.reset_mock()
+
+    hits = client.search_tables("revenue")
+
+    assert [str(hit) for hit in hits] == ["hive.web.orders.revenue double (column)"]
+    mock_cursor.execute.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# Inline row cap
+# ---------------------------------------------------------------------------
+
+
+def test_execute_query_json_limited_injects_limit(config, mock_connection):
+    config.query_timeout_minutes = 0
+    mock_cursor = MagicMock()
+    mock_cursor.description = [("id", "bigint")]
+    mock_cursor.fetchmany.side_effect = _fetchmany_from([(1,), (2,), (3,)])
+    mock_connection.cursor.return_value = mock_cursor
+    client = TrinoClient(config)
+
+    result, truncated = client.execute_query_json_limited("SELECT id FROM t", 2)
+
+    assert mock_cursor.execute.call_args[0][0].endswith("SELECT * FROM (\nSELECT id FROM t\n) LIMIT 3")
+    assert json.loads(result) == [{"id": 1}, {"id": 2}]
+    assert truncated is True
+
+
+def test_execute_query_json_limited_stops_fetching(config, mock_connection):
+    """Test that results a LIMIT cannot cap are cut off at the cursor."""
+    mock_cursor = MagicMock()
+    mock_cursor.description = [("Table", "varchar")]
+    mock_cursor.fetchmany.side_effect = _fetchmany_from([(f"t{i}",) for i in range(5000)])
+    mock_connection.cursor.return_value = mock_cursor
+    client = TrinoClient(config)
+
+    result, truncated = client.execute_query_json_limited("SHOW TABLES", 10)
+
+    assert mock_cursor.execute.call_args[0][0].endswith("SHOW TABLES")
+    assert len(json.loads(result)) == 10
+    assert truncated is True
+    assert mock_cursor.fetchmany.call_count < 5
+
+
+def test_execute_query_json_limited_not_truncated(config, mock_connection):
+    config.query_timeout_minutes = 0
+    mock_cursor = MagicMock()
+    mock_cursor.description = [("id", "bigint")]
+    mock_cursor.fetchmany.side_effect = _fetchmany_from([(1,)])
+    mock_connection.cursor.return_value = mock_cursor
+    client = TrinoClient(config)
+
+    assert client.execute_query_json_limited("SELECT id FROM t LIMIT 1", 2) == ('[\n  {\n    "id": 1\n  }\n]', False)
+
+
+# ---------------------------------------------------------------------------
+# Early abandonment
+# ---------------------------------------------------------------------------
+
+
+def _streaming_cursor(mock_connection, n_rows):
+    mock_cursor = MagicMock()
+    mock_cursor.description = [("id", "bigint")]
+    mock_cursor.fetchmany.side_effect = _fetchmany_from([(i,) for i in range(n_rows)])
+    mock_connection.cursor.return_value = mock_cursor
+    return mock_cursor
+
+
+@pytest.mark.parametrize("timeout_minutes", [0, 5])
+def test_abandoned_stream_cancels_query(config, mock_connection, timeout_minutes):
+    """Test that closing a stream before its end cancels the query on Trino."""
+    config.query_timeout_minutes = timeout_minutes
+    mock_cursor = _streaming_cursor(mock_connection, 100_000)
+    client = TrinoClient(config)
+
+    with patch.object(client, "_cancel_query") as mock_cancel:
+        with client.iter_query("SELECT id FROM t", batch_size=10) as stream:
+            first = next(iter(stream))
+
+    assert first == [(i,) for i in range(10)]
+    mock_cancel.assert_called_once_with(mock_cursor)
+
+
+@pytest.mark.parametrize("timeout_minutes", [0, 5])
+def test_exhausted_stream_does_not_cancel(config, mock_connection, timeout_minutes):
+    config.query_timeout_minutes = timeout_minutes
+    _streaming_cursor(mock_connection, 25)
+    client = TrinoClient(config)
+
+    with patch.object(client, "_cancel_query") as mock_cancel:
+        with client.iter_query("SELECT id FROM t", batch_size=10) as stream:
+            assert sum(len(batch) for batch in stream) == 25
+
+    mock_cancel.assert_not_called()
+
+
+def test_row_cap_cancels_rest_of_query(config, mock_connection):
+    """Test that a capped inline result stops fetching and cancels the query."""
+    mock_cursor = _streaming_cursor(mock_connection, 100_000)
+    client = TrinoClient(config)
+
+    with patch.object(client, "_cancel_query") as mock_cancel:
+        _, truncated = client.execute_query_json_limited("SHOW TABLES", 5)
+
+    assert truncated is True
+    mock_cancel.assert_called_once_with(mock_cursor)
+
+
+def test_fetch_rows_statement_without_output(config, mock_connection):
+    config.query_timeout_minutes = 0
+    mock_cursor = MagicMock()
+    mock_cursor.description = None
+    mock_connection.cursor.return_value = mock_cursor
+    client = TrinoClient(config)
+
+    assert client.fetch_rows("CALL system.flush_metadata_cache()", 10) == (None, [], False)
+
+
+def test_fetch_into_streams_rows_into_spool(config, mock_connection):
+    config.query_timeout_minutes = 0
+    mock_cursor = _streaming_cursor(mock_connection, 5000)
+    client = TrinoClient(config)
+    spool = RowSpool(memory_bytes=100)
+
+    columns, truncated = client.fetch_into("SHOW TABLES", spool, 1000)
+
+    assert columns == ["id"]
+    assert truncated is True
+    assert spool.spilled
+    assert list(spool.rows()) == [(i,) for i in range(1000)]
+    mock_cursor.cancel.assert_called_once()
+
+
+def test_fetch_into_stops_when_spool_is_full(config, mock_connection):
+    config.query_timeout_minutes = 0
+    _streaming_cursor(mock_connection, 3)
+    client = TrinoClient(config)
+    spool = RowSpool(max_bytes=row_size((0,)) * 2)
+
+    assert client.fetch_into("SELECT id FROM t", spool, 10) == (["id"], True)
+    assert len(spool) == 2
+
+
+def test_fetch_into_complete_result(config, mock_connection):
+    config.query_timeout_minutes = 0
+    _streaming_cursor(mock_connection, 3)
+    client = TrinoClient(config)
+    spool = RowSpool()
+
+    assert client.fetch_into("SELECT id FROM t", spool, 3) == (["id"], False)
+    assert len(spool) == 3
@@ -14,6 +14,8 @@ from trino_mcp.config import (
     _AutoRefreshBearerAuth,
     _get_user_from_jwt,
     _make_github_actions_oidc_fetcher,
+    concurrency_limit,
+    connection_pool_size,
     load_config,
 )
 
@@ -1292,3 +1294,566 @@ def test_load_config_max_concurrent_queries_override():
     """Test max_concurrent_queries via overrides dict."""
     config = load_config(overrides={"MAX_CONCURRENT_QUERIES": "5"})
     assert config.max_concurrent_queries == 5
+
+
+# ---------------------------------------------------------------------------
+# load_config — connection_idle_timeout_seconds
+# ---------------------------------------------------------------------------
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+    },
+)
+def test_load_config_connection_idle_timeout_default():
+    """Test default connection_idle_timeout_seconds is 300."""
+    config = load_config()
+    assert config.connection_idle_timeout_seconds == 300
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "CONNECTION_IDLE_TIMEOUT_SECONDS": "30",
+    },
+)
+def test_load_config_connection_idle_timeout_custom():
+    """Test custom connection_idle_timeout_seconds from env var."""
+    config = load_config()
+    assert config.connection_idle_timeout_seconds == 30
+
+
+# ---------------------------------------------------------------------------
+# load_config — shared HTTP pool
+# ---------------------------------------------------------------------------
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+    },
+)
+def test_load_config_http_pool_defaults():
+    """Test default HTTP pool sizes and retries."""
+    config = load_config()
+    assert config.http_pool_connections == 10
+    assert config.http_pool_maxsize == 10
+    assert config.http_retries == 0
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "HTTP_POOL_CONNECTIONS": "2",
+        "HTTP_POOL_MAXSIZE": "32",
+        "HTTP_RETRIES": "3",
+    },
+)
+def test_load_config_http_pool_custom():
+    """Test custom HTTP pool settings from env vars."""
+    config = load_config()
+    assert config.http_pool_connections == 2
+    assert config.http_pool_maxsize == 32
+    assert config.http_retries == 3
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+    },
+)
+def test_load_config_async_client_default():
+    """Test the async client is disabled by default."""
+    config = load_config()
+    assert config.async_client is False
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "ASYNC_CLIENT": "true",
+    },
+)
+def test_load_config_async_client_enabled():
+    """Test ASYNC_CLIENT=true enables the async client."""
+    config = load_config()
+    assert config.async_client is True
+
+
+# ---------------------------------------------------------------------------
+# load_config — result cache
+# ---------------------------------------------------------------------------
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+    },
+)
+def test_load_config_result_cache_default():
+    """Test the result cache is disabled by default."""
+    config = load_config()
+    assert config.result_cache_ttl_seconds == 0
+    assert config.result_cache_max_bytes == 64 * 1024 * 1024
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "RESULT_CACHE_TTL_SECONDS": "120",
+        "RESULT_CACHE_MAX_BYTES": "1048576",
+    },
+)
+def test_load_config_result_cache_custom():
+    """Test custom result cache settings from env vars."""
+    config = load_config()
+    assert config.result_cache_ttl_seconds == 120
+    assert config.result_cache_max_bytes == 1048576
+
+
+# ---------------------------------------------------------------------------
+# load_config — metadata cache
+# ---------------------------------------------------------------------------
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+    },
+)
+def test_load_config_metadata_cache_default():
+    """Test the metadata cache is disabled by default."""
+    config = load_config()
+    assert set(config.metadata_cache_ttls.values()) == {0}
+    assert config.metadata_cache_negative_ttl_seconds == 30
+    assert config.metadata_cache_max_entries == 10_000
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "METADATA_CACHE_TTL_SECONDS": "300",
+        "METADATA_CACHE_TTLS": '{"catalogs": 3600, "columns": 60}',
+        "METADATA_CACHE_NEGATIVE_TTL_SECONDS": "10",
+        "METADATA_CACHE_MAX_ENTRIES": "500",
+    },
+)
+def test_load_config_metadata_cache_custom():
+    """Test per-type TTL overrides on top of the default TTL."""
+    config = load_config()
+    assert config.metadata_cache_ttls == {
+        "catalogs": 3600,
+        "schemas": 300,
+        "tables": 300,
+        "columns": 60,
+        "ddl": 300,
+    }
+    assert config.metadata_cache_negative_ttl_seconds == 10
+    assert config.metadata_cache_max_entries == 500
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "METADATA_CACHE_TTLS": '{"views": 60}',
+    },
+)
+def test_load_config_metadata_cache_unknown_type():
+    """Test that unknown metadata cache types raise ValueError."""
+    with pytest.raises(ValueError, match="Unknown METADATA_CACHE_TTLS types: views"):
+        load_config()
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "METADATA_CACHE_TTLS": "not json",
+    },
+)
+def test_load_config_metadata_cache_invalid_json():
+    """Test that invalid METADATA_CACHE_TTLS JSON raises ValueError."""
+    with pytest.raises(ValueError, match="METADATA_CACHE_TTLS must be valid JSON"):
+        load_config()
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+    },
+)
+def test_load_config_metadata_store_default():
+    """Test the persistent metadata store is disabled by default."""
+    config = load_config()
+    assert config.metadata_store_path is None
+    assert config.metadata_store_refresh_seconds == 3600
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "METADATA_STORE_PATH": "~/.cache/trino-mcp/metadata.db",
+        "METADATA_STORE_REFRESH_SECONDS": "600",
+    },
+)
+def test_load_config_metadata_store_custom():
+    """Test the metadata store path and refresh interval are read from env."""
+    config = load_config()
+    assert config.metadata_store_path == "~/.cache/trino-mcp/metadata.db"
+    assert config.metadata_store_refresh_seconds == 600
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+    },
+)
+def test_load_config_validation_defaults():
+    """Test query validation defaults."""
+    config = load_config()
+    assert config.max_query_length == 1_000_000
+    assert config.validation_executor == "thread"
+    assert config.validation_workers == 2
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "MAX_QUERY_LENGTH": "50000",
+        "VALIDATION_EXECUTOR": "Process",
+        "VALIDATION_WORKERS": "4",
+    },
+)
+def test_load_config_validation_custom():
+    """Test query validation settings are read from env."""
+    config = load_config()
+    assert config.max_query_length == 50000
+    assert config.validation_executor == "process"
+    assert config.validation_workers == 4
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "VALIDATION_EXECUTOR": "gpu",
+    },
+)
+def test_load_config_validation_executor_invalid():
+    """Test that an unknown validation executor raises ValueError."""
+    with pytest.raises(ValueError, match="Unsupported VALIDATION_EXECUTOR: gpu"):
+        load_config()
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "MAX_INLINE_ROWS": "500",
+    },
+)
+def test_load_config_max_inline_rows():
+    """Test MAX_INLINE_ROWS is read from env (0, unlimited, by default)."""
+    assert load_config().max_inline_rows == 500
+    assert TrinoConfig(host="localhost", port=8080, user="trino").max_inline_rows == 0
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "RESULT_BUFFER_TTL_SECONDS": "120",
+        "RESULT_BUFFER_MAX_BYTES": "1048576",
+        "RESULT_BUFFER_MAX_ROWS": "5000",
+    },
+)
+def test_load_config_result_buffer():
+    """Test result buffer limits are read from env."""
+    config = load_config()
+    assert config.result_buffer_ttl_seconds == 120
+    assert config.result_buffer_max_bytes == 1048576
+    assert config.result_buffer_max_rows == 5000
+    assert config.spill_threshold_bytes == 16 * 1024 * 1024
+    assert config.spill_dir is None
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "SPILL_THRESHOLD_BYTES": "0",
+        "SPILL_DIR": "/var/tmp/trino-mcp",
+    },
+)
+def test_load_config_spill():
+    """Test spill settings are read from env."""
+    config = load_config()
+    assert config.spill_threshold_bytes == 0
+    assert config.spill_dir == "/var/tmp/trino-mcp"
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "QUEUE_MAX_DEPTH": "4",
+        "QUEUE_MAX_WAIT_SECONDS": "2.5",
+        "QUEUE_ORDERING": "Priority",
+    },
+)
+def test_load_config_admission_queue():
+    """Test admission queue settings are read from env."""
+    config = load_config()
+    assert config.queue_max_depth == 4
+    assert config.queue_max_wait_seconds == 2.5
+    assert config.queue_ordering == "priority"
+    default = TrinoConfig(host="localhost", port=8080, user="trino")
+    assert (default.queue_max_depth, default.queue_max_wait_seconds, default.queue_ordering) == (
+        16,
+        30,
+        "fifo",
+    )
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "QUEUE_ORDERING": "lifo",
+    },
+)
+def test_load_config_queue_ordering_invalid():
+    """Test that an unknown queue ordering raises ValueError."""
+    with pytest.raises(ValueError, match="Unsupported QUEUE_ORDERING: lifo"):
+        load_config()
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "MAX_CONCURRENT_QUERIES": "2",
+        "CONCURRENCY_LIMITS": '{"metadata": 4, "export": 1}',
+    },
+)
+def test_load_config_concurrency_limits():
+    """Test that CONCURRENCY_LIMITS overrides MAX_CONCURRENT_QUERIES per class."""
+    config = load_config()
+    assert config.concurrency_limits == {"metadata": 4, "read": 2, "write": 2, "export": 1}
+    assert concurrency_limit(config, "metadata") == 4
+    assert connection_pool_size(config) == 9
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "CONCURRENCY_LIMITS": '{"ddl": 1}',
+    },
+)
+def test_load_config_concurrency_limits_unknown_class():
+    """Test that an unknown concurrency class raises ValueError."""
+    with pytest.raises(ValueError, match="Unknown CONCURRENCY_LIMITS classes: ddl"):
+        load_config()
+
+
+def test_concurrency_limit_without_classes():
+    """Test that a config without per-class limits uses MAX_CONCURRENT_QUERIES everywhere."""
+    config = TrinoConfig(host="localhost", port=8080, user="trino", max_concurrent_queries=3)
+    assert concurrency_limit(config, "export") == 3
+    assert connection_pool_size(config) == 3
+
+
+def test_connection_pool_size_reserves_refresh_connection():
+    """Test that the background snapshot refresh gets a connection of its own."""
+    config = TrinoConfig(
+        host="localhost",
+        port=8080,
+        user="trino",
+        max_concurrent_queries=3,
+        metadata_store_path="/tmp/snapshots.db",
+    )
+    assert connection_pool_size(config) == 4
+    config.metadata_store_refresh_seconds = 0
+    assert connection_pool_size(config) == 3
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "SESSION_MAX_CONCURRENT": "2",
+        "SESSION_RATE_LIMIT": "0.5",
+        "SESSION_RATE_BURST": "4",
+        "SESSION_WEIGHTS": '{"dashboard": 3, "notebook": 0.5}',
+    },
+)
+def test_load_config_session_limits():
+    """Test that the per-session fairness settings are loaded."""
+    config = load_config()
+    assert config.session_max_concurrent == 2
+    assert config.session_rate_limit == 0.5
+    assert config.session_rate_burst == 4
+    assert config.session_weights == {"dashboard": 3.0, "notebook": 0.5}
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "SESSION_WEIGHTS": "[1, 2]",
+    },
+)
+def test_load_config_session_weights_not_object():
+    """Test that SESSION_WEIGHTS must be a JSON object."""
+    with pytest.raises(ValueError, match="SESSION_WEIGHTS must be a JSON object"):
+        load_config()
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "MCP_TRANSPORT": "SSE",
+        "MCP_HOST": "0.0.0.0",
+        "MCP_PORT": "9000",
+        "MCP_ALLOWED_HOSTS": "trino-mcp.internal, 10.0.0.5",
+    },
+)
+def test_load_config_transport():
+    """Test that the MCP transport and its bind address are loaded."""
+    config = load_config()
+    assert config.transport == "sse"
+    assert config.mcp_host == "0.0.0.0"
+    assert config.mcp_port == 9000
+    assert config.mcp_allowed_hosts == ["trino-mcp.internal", "10.0.0.5"]
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "MCP_TRANSPORT": "streamable-http",
+        "MCP_HOST": "0.0.0.0",
+    },
+)
+def test_load_config_remote_host_requires_allowed_hosts():
+    """Test that listening beyond loopback requires MCP_ALLOWED_HOSTS."""
+    with pytest.raises(ValueError, match="MCP_ALLOWED_HOSTS is required"):
+        load_config()
+
+
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "MCP_TRANSPORT": "websocket",
+    },
+)
+def test_load_config_unsupported_transport():
+    """Test that an unknown MCP_TRANSPORT raises ValueError."""
+    with pytest.raises(ValueError, match="Unsupported MCP_TRANSPORT: websocket"):
+        load_config()
@@ -0,0 +1,314 @@
+"""Tests for trino_mcp.export module."""
+
+import csv
+import datetime
+import gzip
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+
+from trino_mcp.export import (
+    check_output_path,
+    open_output,
+    output_compression,
+    output_format,
+    write_file,
+    write_csv,
+    write_json,
+    record_batch_reader,
+    write_arrow,
+    write_ndjson,
+    write_parquet,
+)
+
+COLUMNS = ["id", "name", "created"]
+BATCHES = [
+    [(1, "alice", datetime.date(2024, 1, 1)), (2, 'has "quotes"\nand newline', None)],
+    [(3, "ünïcode", datetime.date(2024, 1, 3))],
+]
+
+
+def _expected_rows():
+    return [dict(zip(COLUMNS, row)) for batch in BATCHES for row in batch]
+
+
+@pytest.mark.parametrize("indent", [2, 4, 0, None])
+def test_write_json_matches_json_dump(indent):
+    """Streamed JSON output is identical to json.dump of the full list."""
+    f = io.StringIO()
+
+    row_count = write_json(f, COLUMNS, BATCHES, indent=indent)
+
+    assert row_count == 3
+    assert f.getvalue() == json.dumps(_expected_rows(), default=str, indent=indent)
+
+
+@pytest.mark.parametrize("indent", [2, None])
+def test_write_json_empty(indent):
+    """An empty result is written as an empty JSON array."""
+    f = io.StringIO()
+
+    row_count = write_json(f, COLUMNS, [], indent=indent)
+
+    assert row_count == 0
+    assert json.loads(f.getvalue()) == []
+    assert f.getvalue() == json.dumps([], indent=indent)
+
+
+def test_write_json_consumes_lazily():
+    """Rows are written as batches arrive, not after the input is exhausted."""
+    f = io.StringIO()
+
+    def _batches():
+        yield [(1, "a", None)]
+        # The first row must already be written before the next batch is pulled.
+        assert '"a"' in f.getvalue()
+        yield [(2, "b", None)]
+
+    assert write_json(f, COLUMNS, _batches()) == 2
+
+
+def test_write_csv():
+    """CSV output has a header row followed by every row."""
+    f = io.StringIO(newline="")
+
+    row_count = write_csv(f, COLUMNS, BATCHES)
+
+    assert row_count == 3
+    f.seek(0)
+    rows = list(csv.reader(f))
+    assert rows[0] == COLUMNS
+    assert rows[2] == ["2", 'has "quotes"\nand newline', ""]
+    assert len(rows) == 4
+
+
+def test_open_output_removes_partial_file(tmp_path):
+    """A failure while writing removes the partially written file."""
+    path = tmp_path / "out.json"
+
+    with pytest.raises(RuntimeError):
+        with open_output(str(path)) as f:
+            f.write("[")
+            raise RuntimeError("boom")
+
+    assert not path.exists()
+
+
+@pytest.mark.parametrize(
+    "path,expected",
+    [
+        ("out.csv", "csv"),
+        ("OUT.CSV", "csv"),
+        ("out.jsonl", "ndjson"),
+        ("out.ndjson", "ndjson"),
+        ("out.json", "json"),
+        ("out.parquet", "parquet"),
+        ("out.arrow", "arrow"),
+        ("out.feather", "arrow"),
+        ("out.txt", "json"),
+        ("out.csv.gz", "csv"),
+        ("out.jsonl.zst", "ndjson"),
+        ("out.json.gz", "json"),
+        ("out.gz", "json"),
+        ("out", "json"),
+    ],
+)
+def test_output_format(path, expected):
+    assert output_format(path) == expected
+
+
+def test_write_ndjson():
+    """Each row is written as one compact JSON object per line."""
+    f = io.StringIO()
+
+    row_count = write_ndjson(f, COLUMNS, BATCHES)
+
+    assert row_count == 3
+    lines = f.getvalue().splitlines()
+    assert len(lines) == 3
+    assert [json.loads(line) for line in lines] == json.loads(
+        json.dumps(_expected_rows(), default=str)
+    )
+    assert lines[0] == '{"id": 1, "name": "alice", "created": "2024-01-01"}'
+
+
+# ---------------------------------------------------------------------------
+# Parquet
+# ---------------------------------------------------------------------------
+
+
+def test_write_parquet_types_and_row_groups(tmp_path):
+    """Trino types map to Arrow types and each batch becomes a row group."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    import decimal
+    from zoneinfo import ZoneInfo
+
+    description = [
+        ("id", "bigint"),
+        ("name", "varchar(20)"),
+        ("price", "decimal(10,2)"),
+        ("ok", "boolean"),
+        ("day", "date"),
+        ("ts", "timestamp(3) with time zone"),
+        ("tags", "array(varchar)"),
+    ]
+    ts = datetime.datetime(2024, 1, 1, 12, tzinfo=ZoneInfo("Europe/Paris"))
+    batches = [
+        [(1, "a", decimal.Decimal("1.50"), True, datetime.date(2024, 1, 1), ts, ["x", "y"])],
+        [(2, None, None, None, None, None, None)],
+    ]
+    path = tmp_path / "out.parquet"
+
+    row_count = write_parquet(str(path), description, batches)
+
+    assert row_count == 2
+    parquet_file = pq.ParquetFile(path)
+    assert parquet_file.metadata.num_row_groups == 2
+    table = parquet_file.read()
+    assert str(table.schema.field("id").type) == "int64"
+    assert str(table.schema.field("price").type) == "decimal128(10, 2)"
+    assert str(table.schema.field("ts").type) == "timestamp[us, tz=UTC]"
+    rows = table.to_pylist()
+    assert rows[0]["price"] == decimal.Decimal("1.50")
+    assert rows[0]["ts"] == ts
+    assert rows[0]["tags"] == '["x", "y"]'
+    assert rows[1]["id"] == 2
+    assert all(rows[1][name] is None for name, _ in description[1:])
+
+
+def test_write_parquet_empty_result_keeps_schema(tmp_path):
+    """An empty result still produces a readable file with the full schema."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "out.parquet"
+
+    row_count = write_parquet(str(path), [("id", "integer"), ("name", "varchar")], [])
+
+    assert row_count == 0
+    table = pq.read_table(path)
+    assert table.num_rows == 0
+    assert table.schema.names == ["id", "name"]
+
+
+def test_write_parquet_without_type_codes_falls_back_to_text(tmp_path):
+    """Columns without a known Trino type are written as text."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "out.parquet"
+
+    write_parquet(str(path), [("col1",)], [[("val1",), (2,)]])
+
+    assert pq.read_table(path).column("col1").to_pylist() == ["val1", "2"]
+
+
+def test_write_parquet_requires_pyarrow(tmp_path):
+    """A helpful ImportError is raised when pyarrow is not installed."""
+    with patch.dict("sys.modules", {"pyarrow": None}):
+        with pytest.raises(ImportError, match=r"trino-mcp\[parquet\]"):
+            write_parquet(str(tmp_path / "out.parquet"), [("id", "bigint")], [])
+
+
+# ---------------------------------------------------------------------------
+# Arrow IPC
+# ---------------------------------------------------------------------------
+
+
+def test_write_arrow_is_memory_mappable(tmp_path):
+    """Arrow IPC output can be memory-mapped and read back with its types."""
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+
+    path = tmp_path / "out.arrow"
+    description = [("id", "integer"), ("name", "varchar")]
+
+    row_count = write_arrow(str(path), description, [[(1, "a")], [(2, "b")]])
+
+    assert row_count == 2
+    with pa.memory_map(str(path)) as source:
+        reader = pyarrow.ipc.open_file(source)
+        assert reader.num_record_batches == 2
+        table = reader.read_all()
+    assert str(table.schema.field("id").type) == "int32"
+    assert table.to_pylist() == [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+
+
+def test_record_batch_reader_is_lazy():
+    """Batches are converted only as the reader is consumed."""
+    pytest.importorskip("pyarrow")
+    pulled = []
+
+    def _batches():
+        for i in range(3):
+            pulled.append(i)
+            yield [(i,)]
+
+    reader = record_batch_reader([("n", "bigint")], _batches())
+    assert pulled == []
+
+    assert reader.read_next_batch().to_pylist() == [{"n": 0}]
+    assert pulled == [0]
+    assert reader.read_all().column("n").to_pylist() == [1, 2]
+
+
+def test_write_arrow_requires_pyarrow(tmp_path):
+    """A helpful ImportError names the arrow extra when pyarrow is missing."""
+    with patch.dict("sys.modules", {"pyarrow": None}):
+        with pytest.raises(ImportError, match=r"trino-mcp\[arrow\]"):
+            write_arrow(str(tmp_path / "out.arrow"), [("id", "bigint")], [])
+
+
+# ---------------------------------------------------------------------------
+# Compression
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "path,expected",
+    [
+        ("out.csv", None),
+        ("out.csv.gz", "gzip"),
+        ("OUT.JSON.GZ", "gzip"),
+        ("out.jsonl.zst", "zstd"),
+    ],
+)
+def test_output_compression(path, expected):
+    assert output_compression(path) == expected
+
+
+@pytest.mark.parametrize("name", ["out.csv.gz", "out.jsonl.gz", "out.json.gz"])
+def test_write_file_gzip(tmp_path, name):
+    """Compressed output decompresses to the same bytes as uncompressed output."""
+    description = [(col, "varchar") for col in COLUMNS]
+    compressed = tmp_path / name
+    plain = tmp_path / name[: -len(".gz")]
+
+    assert write_file(str(compressed), description, BATCHES) == 3
+    write_file(str(plain), description, BATCHES)
+
+    with gzip.open(compressed, "rb") as f:
+        assert f.read() == plain.read_bytes()
+
+
+def test_write_file_zstd(tmp_path):
+    """Zstandard output can be decompressed back into JSON Lines."""
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "out.jsonl.zst"
+
+    assert write_file(str(path), [(col, "varchar") for col in COLUMNS], BATCHES) == 3
+
+    with zstandard.open(path, "rt", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert [row["id"] for row in rows] == [1, 2, 3]
+
+
+def test_write_file_zstd_requires_zstandard(tmp_path):
+    """A helpful ImportError names the zstd extra when zstandard is missing."""
+    with patch.dict("sys.modules", {"zstandard": None}):
+        with pytest.raises(ImportError, match=r"trino-mcp\[zstd\]"):
+            write_file(str(tmp_path / "out.csv.zst"), [("id", "bigint")], [])
+
+
+@pytest.mark.parametrize("name", ["out.parquet.gz", "out.arrow.zst"])
+def test_check_output_path_rejects_compressed_binary_formats(name):
+    with pytest.raises(ValueError, match="compressed internally"):
+        check_output_path(name)
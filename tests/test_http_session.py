@@ -0,0 +1,49 @@
+"""Tests for trino_mcp.http_session module."""
+
+from unittest.mock import patch
+
+from trino_mcp.http_session import SharedHTTPAdapter, create_http_adapter, new_session
+
+
+def test_create_http_adapter_pool_sizes():
+    adapter = create_http_adapter(pool_connections=3, pool_maxsize=7, retries=2)
+
+    assert isinstance(adapter, SharedHTTPAdapter)
+    assert adapter._pool_connections == 3
+    assert adapter._pool_maxsize == 7
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == 7
+
+
+def test_create_http_adapter_retries_connect_errors_only():
+    """Requests that may have reached the server must not be resent."""
+    adapter = create_http_adapter(retries=2)
+
+    assert adapter.max_retries.total == 2
+    assert adapter.max_retries.read is False
+
+
+def test_new_session_mounts_shared_adapter():
+    adapter = create_http_adapter()
+
+    first = new_session(adapter)
+    second = new_session(adapter, verify=False)
+
+    assert first is not second
+    for session in (first, second):
+        assert session.get_adapter("http://coordinator:8080/v1/statement") is adapter
+        assert session.get_adapter("https://coordinator:443/v1/statement") is adapter
+    assert first.verify is True
+    assert second.verify is False
+
+
+def test_session_close_keeps_shared_sockets():
+    """Closing one connection's session must not drop the shared pool."""
+    adapter = create_http_adapter()
+    session = new_session(adapter)
+
+    with patch.object(adapter.poolmanager, "clear") as mock_clear:
+        session.close()
+        mock_clear.assert_not_called()
+
+        adapter.shutdown()
+        mock_clear.assert_called_once()
@@ -0,0 +1,114 @@
+"""Tests for trino_mcp.pool module."""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from trino_mcp.pool import ConnectionPool
+
+
+def _factory():
+    return MagicMock()
+
+
+def test_acquire_reuses_released_connection():
+    pool = ConnectionPool(_factory, max_size=2)
+
+    conn = pool.acquire()
+    pool.release(conn)
+
+    assert pool.acquire() is conn
+    assert pool.size == 1
+
+
+def test_acquire_creates_up_to_max_size():
+    pool = ConnectionPool(_factory, max_size=2)
+
+    first = pool.acquire()
+    second = pool.acquire()
+
+    assert first is not second
+    assert pool.size == 2
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.05)
+
+
+def test_acquire_blocks_until_release():
+    pool = ConnectionPool(_factory, max_size=1)
+    conn = pool.acquire()
+    acquired = []
+
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(timeout=5)))
+    waiter.start()
+    time.sleep(0.05)
+    assert acquired == []
+
+    pool.release(conn)
+    waiter.join(timeout=5)
+
+    assert acquired == [conn]
+
+
+def test_release_discard_closes_and_frees_slot():
+    pool = ConnectionPool(_factory, max_size=1)
+    conn = pool.acquire()
+
+    pool.release(conn, discard=True)
+
+    conn.close.assert_called_once()
+    assert pool.size == 0
+    assert pool.acquire() is not conn
+
+
+def test_idle_connections_are_evicted():
+    pool = ConnectionPool(_factory, max_size=1, idle_timeout=0.01)
+    conn = pool.acquire()
+    pool.release(conn)
+
+    time.sleep(0.05)
+
+    assert pool.acquire() is not conn
+    conn.close.assert_called_once()
+
+
+def test_factory_failure_frees_slot():
+    factory = MagicMock(side_effect=[RuntimeError("boom"), MagicMock()])
+    pool = ConnectionPool(factory, max_size=1)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        pool.acquire()
+
+    assert pool.size == 0
+    pool.acquire(timeout=0.05)
+
+
+def test_close_closes_idle_and_released_connections():
+    pool = ConnectionPool(_factory, max_size=2)
+    idle = pool.acquire()
+    busy = pool.acquire()
+    pool.release(idle)
+
+    pool.close()
+    idle.close.assert_called_once()
+
+    pool.release(busy)
+    busy.close.assert_called_once()
+    with pytest.raises(RuntimeError, match="closed"):
+        pool.acquire()
+
+
+def test_connection_context_manager_releases():
+    pool = ConnectionPool(_factory, max_size=1)
+
+    with pool.connection() as conn:
+        assert pool.idle_count == 0
+
+    assert pool.idle_count == 1
+    assert pool.acquire() is conn
+
+
+def test_invalid_max_size():
+    with pytest.raises(ValueError, match="max_size"):
+        ConnectionPool(_factory, max_size=0)
@@ -0,0 +1,108 @@
+"""Tests for trino_mcp.results module."""
+
+from unittest.mock import patch
+
+import pytest
+
+from trino_mcp.results import ResultBuffer
+from trino_mcp.spool import row_size as spool_row_size
+
+COLUMNS = ["id", "name"]
+ROWS = [(i, f"name-{i}") for i in range(10)]
+
+
+def test_put_and_page():
+    buffer = ResultBuffer(ttl_seconds=60, max_bytes=1024 * 1024)
+    handle = buffer.put(COLUMNS, ROWS)
+
+    first = buffer.page(handle, 0, 4)
+    last = buffer.page(handle, 8, 4)
+
+    assert first["rows"] == [{"id": i, "name": f"name-{i}"} for i in range(4)]
+    assert first["next_offset"] == 4
+    assert first["total_rows"] == 10
+    assert first["truncated"] is False
+    assert [row["id"] for row in last["rows"]] == [8, 9]
+    assert last["next_offset"] is None
+    assert buffer.page(handle, 20, 4)["rows"] == []
+
+
+def test_unknown_handle_and_invalid_arguments():
+    buffer = ResultBuffer(ttl_seconds=60, max_bytes=1024)
+    handle = buffer.put(COLUMNS, ROWS[:1])
+
+    assert buffer.page("missing", 0, 10) is None
+    with pytest.raises(ValueError):
+        buffer.page(handle, -1, 10)
+    with pytest.raises(ValueError):
+        buffer.page(handle, 0, 0)
+
+
+def test_results_expire_after_last_read():
+    buffer = ResultBuffer(ttl_seconds=10, max_bytes=1024)
+    with patch("trino_mcp.results.time.monotonic", return_value=100.0):
+        handle = buffer.put(COLUMNS, ROWS[:1])
+    with patch("trino_mcp.results.time.monotonic", return_value=109.0):
+        assert buffer.page(handle, 0, 1) is not None
+    with patch("trino_mcp.results.time.monotonic", return_value=118.0):
+        assert buffer.page(handle, 0, 1) is not None
+    with patch("trino_mcp.results.time.monotonic", return_value=128.0):
+        assert buffer.page(handle, 0, 1) is None
+    assert len(buffer) == 0
+
+
+def test_least_recently_used_result_is_evicted():
+    row_size = spool_row_size(ROWS[0])
+    buffer = ResultBuffer(ttl_seconds=60, max_bytes=row_size * 5)
+    first = buffer.put(COLUMNS, ROWS[:2])
+    second = buffer.put(COLUMNS, ROWS[:2])
+    buffer.get(first)
+
+    third = buffer.put(COLUMNS, ROWS[:2])
+
+    assert buffer.get(second) is None
+    assert buffer.get(first) is not None and buffer.get(third) is not None
+    assert buffer.size_bytes <= row_size * 5
+
+
+def test_oversized_result_keeps_rows_that_fit():
+    row_size = spool_row_size(ROWS[0])
+    buffer = ResultBuffer(ttl_seconds=60, max_bytes=row_size * 3)
+
+    page = buffer.page(buffer.put(COLUMNS, ROWS), 0, 100)
+
+    assert page["total_rows"] == 3
+    assert page["truncated"] is True
+
+
+def test_drop():
+    buffer = ResultBuffer(ttl_seconds=60, max_bytes=1024)
+    handle = buffer.put(COLUMNS, ROWS[:1])
+
+    assert buffer.drop(handle) is True
+    assert buffer.drop(handle) is False
+    assert buffer.size_bytes == 0
+
+
+def test_page_of_result_evicted_during_read():
+    """Test that a result whose spool is closed after lookup reads as expired."""
+    buffer = ResultBuffer(ttl_seconds=60, max_bytes=1024)
+    handle = buffer.put(COLUMNS, ROWS)
+    result = buffer.get(handle)
+    buffer.drop(handle)
+
+    with patch.object(buffer, "get", return_value=result):
+        assert buffer.page(handle, 0, 4) is None
+
+
+def test_results_spill_and_eviction_closes_spool(tmp_path):
+    buffer = ResultBuffer(ttl_seconds=60, max_bytes=1024 * 1024, spill_bytes=50, spill_dir=str(tmp_path))
+    spool = buffer.new_spool()
+    spool.extend(ROWS)
+    handle = buffer.put(COLUMNS, spool)
+
+    assert spool.spilled
+    assert buffer.page(handle, 6, 2)["rows"] == [{"id": 6, "name": "name-6"}, {"id": 7, "name": "name-7"}]
+
+    buffer.drop(handle)
+    assert len(spool) == 0
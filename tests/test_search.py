@@ -0,0 +1,66 @@
+"""Tests for trino_mcp.search module."""
+
+from trino_mcp.search import SearchHit, SearchIndex
+from trino_mcp.snapshot import SchemaSnapshot
+
+ROWS = [
+    ("sales", "daily_revenue", "day", "date"),
+    ("sales", "daily_revenue", "amount", "double"),
+    ("sales", "orders", "id", "bigint"),
+    ("sales", "orders", "revenue_usd", "decimal(18,2)"),
+    ("web", "sessions", "id", "bigint"),
+    ("web", "sessions", "user_agent", "varchar"),
+]
+
+
+def _index(rows=ROWS):
+    snapshot = SchemaSnapshot()
+    snapshot.load("hive", rows)
+    return SearchIndex(snapshot)
+
+
+def test_search_matches_tables_and_columns():
+    hits = _index().search("revenue")
+
+    assert [str(hit) for hit in hits] == [
+        "hive.sales.daily_revenue (table)",
+        "hive.sales.orders.revenue_usd decimal(18,2) (column)",
+    ]
+
+
+def test_search_exact_name_ranks_first():
+    hits = _index().search("id")
+
+    assert hits[0] == SearchHit("column", "hive", "sales", "orders", 2.0, "id", "bigint")
+    assert [hit.table for hit in hits[:2]] == ["orders", "sessions"]
+
+
+def test_search_tolerates_typos_and_separators():
+    index = _index()
+
+    assert str(index.search("revnue")[0]) == "hive.sales.daily_revenue (table)"
+    assert str(index.search("Daily Revenue")[0]) == "hive.sales.daily_revenue (table)"
+    assert str(index.search("user-agent")[0]) == "hive.web.sessions.user_agent varchar (column)"
+
+
+def test_search_no_match_and_empty_query():
+    index = _index()
+
+    assert index.search("inventory") == []
+    assert index.search("  --  ") == []
+
+
+def test_search_limit():
+    assert len(_index().search("a", limit=2)) == 2
+
+
+def test_search_index_follows_snapshot_changes():
+    snapshot = SchemaSnapshot()
+    index = SearchIndex(snapshot)
+    assert index.search("orders") == []
+
+    snapshot.load("hive", ROWS)
+    assert index.search("orders")[0].table == "orders"
+
+    snapshot.invalidate("hive", "sales", "orders")
+    assert [hit.table for hit in index.search("orders")] == []
@@ -3,11 +3,19 @@
 import asyncio
 import os
 import sys
-from unittest.mock import MagicMock, patch
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 
+def _default_admission_queues(**kwargs):
+    """Build one admission queue per concurrency class (one slot, no waiting by default)."""
+    from trino_mcp.admission import CONCURRENCY_CLASSES, AdmissionQueue
+
+    return {kind: AdmissionQueue(1, name=f"{kind} query", **kwargs) for kind in CONCURRENCY_CLASSES}
+
+
 # Set environment variables before importing server module
 @pytest.fixture(scope="module", autouse=True)
 def setup_env():
@@ -17,11 +25,10 @@ def setup_env():
     os.environ["TRINO_PORT"] = "8080"
     os.environ["TRINO_USER"] = "trino"
 
-    # Import and initialize _query_semaphore for async tool tests
+    # Import and initialize _admission_queues for async tool tests
     import trino_mcp.server as _srv
-    if _srv._query_semaphore is None:
-        import asyncio
-        _srv._query_semaphore = asyncio.Semaphore(1)
+    if not _srv._admission_queues:
+        _srv._admission_queues = _default_admission_queues()
 
     yield
     # Cleanup
@@ -183,6 +190,9 @@ def test_execute_query_tool_write_enabled(mock_config, mock_client):
     from trino_mcp.server import execute_query
 
     mock_config.allow_write_queries = True
+    mock_config.max_inline_rows = 0
+    mock_config.session_weights = None
+    mock_config.max_query_length = 0
     mock_client.execute_query_json.return_value = '[{"col": "value"}]'
 
     result = asyncio.run(execute_query("SELECT 1"))
@@ -250,6 +260,9 @@ def test_execute_query_output_file_csv(mock_config, mock_client):
     from trino_mcp.server import execute_query
 
     mock_config.allow_write_queries = True
+    mock_config.max_inline_rows = 0
+    mock_config.session_weights = None
+    mock_config.max_query_length = 0
     mock_client.execute_query_to_file.return_value = 2
 
     result = asyncio.run(execute_query("SELECT 1", output_file="/tmp/results.csv"))
@@ -284,6 +297,9 @@ def test_execute_query_output_file(mock_config, mock_client):
     from trino_mcp.server import execute_query
 
     mock_config.allow_write_queries = True
+    mock_config.max_inline_rows = 0
+    mock_config.session_weights = None
+    mock_config.max_query_length = 0
     mock_client.execute_query_to_file.return_value = 5
 
     result = asyncio.run(execute_query("SELECT 1", output_file="/tmp/results.json"))
@@ -480,6 +496,9 @@ def test_execute_query_query_error(mock_config, mock_client):
     from trino_mcp.server import execute_query
 
     mock_config.allow_write_queries = True
+    mock_config.max_inline_rows = 0
+    mock_config.session_weights = None
+    mock_config.max_query_length = 0
     mock_client.execute_query_json.side_effect = Exception("Timeout")
 
     result = asyncio.run(execute_query("INSERT INTO t VALUES (1)"))
@@ -492,13 +511,103 @@ def test_execute_query_query_error(mock_config, mock_client):
 @patch("trino_mcp.server._init_config")
 @patch("sys.argv", ["trino-mcp"])
 def test_main_calls_mcp_run(mock_init, mock_mcp):
-    """Test main() calls mcp.run()."""
+    """Test main() calls mcp.run() with the stdio transport by default."""
+    from trino_mcp.config import TrinoConfig
     from trino_mcp.server import main
 
-    main()
+    with patch("trino_mcp.server.config", TrinoConfig(host="localhost", port=8080, user="trino")):
+        main()
 
     mock_init.assert_called_once_with({})
-    mock_mcp.run.assert_called_once()
+    mock_mcp.run.assert_called_once_with(transport="stdio")
+
+
+@patch("trino_mcp.server.mcp")
+@patch("trino_mcp.server._init_config")
+@patch("sys.argv", ["trino-mcp", "--transport", "streamable-http", "--host", "0.0.0.0", "--port", "9000"])
+def test_main_runs_http_transport(mock_init, mock_mcp):
+    """Test main() binds the HTTP transport to the configured host and port."""
+    from trino_mcp.config import TrinoConfig
+    from trino_mcp.server import main
+
+    cfg = TrinoConfig(
+        host="localhost",
+        port=8080,
+        user="trino",
+        transport="streamable-http",
+        mcp_host="0.0.0.0",
+        mcp_port=9000,
+        mcp_allowed_hosts=["*"],
+    )
+    with patch("trino_mcp.server.config", cfg):
+        main()
+
+    mock_init.assert_called_once_with(
+        {"MCP_TRANSPORT": "streamable-http", "MCP_HOST": "0.0.0.0", "MCP_PORT": "9000"}
+    )
+    assert mock_mcp.settings.host == "0.0.0.0"
+    assert mock_mcp.settings.port == 9000
+    assert mock_mcp.settings.transport_security is None
+    mock_mcp.run.assert_called_once_with(transport="streamable-http")
+
+
+_INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-03-26",
+        "capabilities": {},
+        "clientInfo": {"name": "test", "version": "1"},
+    },
+}
+
+
+def _post_initialize(host, **config_kwargs):
+    """Run main() for streamable-http and POST an initialize request with *host*."""
+    from mcp.server.fastmcp import FastMCP
+    from starlette.testclient import TestClient
+
+    from trino_mcp.config import TrinoConfig
+    from trino_mcp.server import main
+
+    server = FastMCP(name="test")
+    cfg = TrinoConfig(
+        host="localhost", port=8080, user="trino", transport="streamable-http", **config_kwargs
+    )
+    with patch("trino_mcp.server.mcp", server), patch("trino_mcp.server._init_config"), patch(
+        "trino_mcp.server.config", cfg
+    ), patch.object(server, "run"), patch("sys.argv", ["trino-mcp"]):
+        main()
+    with TestClient(server.streamable_http_app(), base_url=f"http://{host}") as http:
+        response = http.post(
+            "/mcp",
+            json=_INITIALIZE,
+            headers={"Accept": "application/json, text/event-stream"},
+        )
+    return response.status_code
+
+
+def test_http_transport_allow_any_host():
+    """Test that MCP_ALLOWED_HOSTS=* accepts any Host header, with a warning."""
+    kwargs = {"mcp_host": "0.0.0.0", "mcp_allowed_hosts": ["*"]}
+
+    with patch("trino_mcp.server.logger") as mock_logger:
+        assert _post_initialize("trino-mcp.internal:8000", **kwargs) == 200
+    assert "DNS rebinding" in mock_logger.warning.call_args[0][0]
+
+
+def test_http_transport_allowed_hosts():
+    """Test that MCP_ALLOWED_HOSTS is enforced on the Host header."""
+    kwargs = {"mcp_host": "0.0.0.0", "mcp_allowed_hosts": ["trino-mcp.internal"]}
+
+    assert _post_initialize("trino-mcp.internal:8000", **kwargs) == 200
+    assert _post_initialize("evil.example:8000", **kwargs) == 421
+
+
+def test_http_transport_loopback_keeps_localhost_check():
+    assert _post_initialize("localhost:8000") == 200
+    assert _post_initialize("trino-mcp.internal:8000") == 421
 
 
 # ---------------------------------------------------------------------------
@@ -584,10 +693,12 @@ def test_cli_args_to_overrides_empty():
 @patch("sys.argv", ["trino-mcp", "--trino-host", "cli-host", "--auth-method", "NONE"])
 def test_main_cli_args_passed_as_overrides(mock_init, mock_mcp):
     """Test main() passes CLI args as overrides to _init_config (no env mutation)."""
+    from trino_mcp.config import TrinoConfig
     from trino_mcp.server import main
 
     old_host = os.environ.get("TRINO_HOST")
-    main()
+    with patch("trino_mcp.server.config", TrinoConfig(host="cli-host", port=8080, user="trino")):
+        main()
 
     # _init_config should receive the overrides dict
     mock_init.assert_called_once_with({"TRINO_HOST": "cli-host", "AUTH_METHOD": "NONE"})
@@ -624,23 +735,68 @@ def test_try_execute_query_handles_timeout(mock_client):
 
 @patch("trino_mcp.server.client")
 def test_concurrency_gate_rejects_when_locked(mock_client):
-    """Test that a tool call returns rejection message when semaphore is locked."""
-    from trino_mcp.server import list_catalogs, _query_semaphore
+    """Test that a tool call is rejected when every slot is taken and nothing may queue."""
+    from trino_mcp.server import list_catalogs, _admission_queues
 
     async def _test():
-        # Acquire the semaphore to simulate an in-progress call
-        await _query_semaphore.acquire()
+        # Take the only slot to simulate an in-progress call
+        slot = await _admission_queues["metadata"].acquire()
         try:
             result = await list_catalogs()
-            assert "concurrent query slot" in result
+            assert "concurrent metadata query slot" in result
             assert "Please wait" in result
             mock_client.list_catalogs.assert_not_called()
         finally:
-            _query_semaphore.release()
+            slot.release()
 
     asyncio.run(_test())
 
 
+@patch("trino_mcp.server.client")
+def test_concurrency_gate_queues_until_slot_is_free(mock_client):
+    """Test that a tool call waits for a slot instead of being rejected."""
+    from trino_mcp.server import list_catalogs
+
+    queues = _default_admission_queues(max_depth=4, max_wait_seconds=5)
+    queue = queues["metadata"]
+    mock_client.list_catalogs.return_value = ["cat1"]
+
+    async def _test():
+        slot = await queue.acquire()
+        call = asyncio.ensure_future(list_catalogs())
+        await asyncio.sleep(0.01)
+        assert queue.depth == 1
+        assert not call.done()
+        slot.release()
+        return await call
+
+    with patch("trino_mcp.server._admission_queues", queues):
+        assert asyncio.run(_test()) == "cat1"
+    assert queue.in_use == 0
+
+
+@patch("trino_mcp.server.client")
+def test_concurrency_gate_reports_queue_position_on_timeout(mock_client):
+    """Test that a call that waited too long is told where it was in the queue."""
+    from trino_mcp.server import list_catalogs
+
+    queues = _default_admission_queues(max_depth=4, max_wait_seconds=0.05)
+
+    async def _test():
+        slot = await queues["metadata"].acquire()
+        try:
+            return await list_catalogs()
+        finally:
+            slot.release()
+
+    with patch("trino_mcp.server._admission_queues", queues):
+        result = asyncio.run(_test())
+
+    assert "within 0.05 second(s)" in result
+    assert "position 1 of 1" in result
+    mock_client.list_catalogs.assert_not_called()
+
+
 @patch("trino_mcp.server.client")
 def test_concurrency_gate_allows_when_free(mock_client):
     """Test that a tool call proceeds normally when the semaphore is free."""
@@ -654,11 +810,127 @@ def test_concurrency_gate_allows_when_free(mock_client):
     mock_client.list_catalogs.assert_called_once()
 
 
-def test_concurrency_limit_message_content():
-    """Test the rejection message includes the configured limit."""
-    from trino_mcp.server import _concurrency_limit_message
+@patch("trino_mcp.server.client")
+def test_session_rate_limit_rejects_calls(mock_client):
+    """Test that a session calling faster than SESSION_RATE_LIMIT is told when to retry."""
+    from trino_mcp.admission import RateLimiter
+    from trino_mcp.server import list_catalogs
+
+    mock_client.list_catalogs.return_value = ["cat1"]
+
+    async def _test():
+        return await list_catalogs(), await list_catalogs()
+
+    with patch("trino_mcp.server._rate_limiter", RateLimiter(rate=0.5, burst=1)):
+        first, second = asyncio.run(_test())
+
+    assert first == "cat1"
+    assert "limit of 0.5 tool call(s) per second" in second
+    assert "Retry in" in second
+    assert "Please wait" not in second
+    mock_client.list_catalogs.assert_called_once()
+
+
+def test_session_key_outside_request():
+    """Test that calls made outside an MCP request share one anonymous session."""
+    from trino_mcp.server import _session_key
+
+    assert _session_key() is None
+
+
+def test_session_key_ignores_client_supplied_id():
+    """Test that a per-request _meta client id cannot change the session key."""
+    import trino_mcp.server as srv
+
+    ctx = MagicMock()
+    with patch.object(srv.mcp, "get_context", return_value=ctx):
+        ctx.client_id = "first"
+        first = srv._session_key()
+        ctx.client_id = "second"
+        second = srv._session_key()
+
+    assert first == second == f"session-{id(ctx.request_context.session):x}"
+
+
+def test_session_key_and_weight_from_authenticated_client():
+    """Test that an authenticated client is keyed and weighted by its OAuth client id."""
+    from mcp.server.auth.provider import AccessToken
+
+    import trino_mcp.server as srv
+    from trino_mcp.config import TrinoConfig
+
+    cfg = TrinoConfig(host="localhost", port=8080, user="trino", session_weights={"analyst": 2.0})
+    token = AccessToken(token="t", client_id="analyst", scopes=[])
+    with patch.object(srv.mcp, "get_context", return_value=MagicMock()), patch(
+        "trino_mcp.server.config", cfg
+    ):
+        assert srv._session_weight() == 1.0
+        with patch("trino_mcp.server.get_access_token", return_value=token):
+            assert srv._session_key() == "client-analyst"
+            assert srv._session_weight() == 2.0
+
+
+@patch("trino_mcp.server.client")
+def test_export_does_not_block_metadata_calls(mock_client, tmp_path):
+    """Test that concurrency classes have separate slots."""
+    from trino_mcp.config import TrinoConfig
+    from trino_mcp.server import execute_query_read_only, list_catalogs
+
+    cfg = TrinoConfig(host="localhost", port=8080, user="trino")
+    queues = _default_admission_queues()
+    mock_client.list_catalogs.return_value = ["cat1"]
+
+    async def _test():
+        export = await queues["export"].acquire()
+        try:
+            catalogs = await list_catalogs()
+            blocked = await execute_query_read_only(
+                "SELECT 1", output_file=str(tmp_path / "out.csv")
+            )
+        finally:
+            export.release()
+        return catalogs, blocked
+
+    with patch("trino_mcp.server.config", cfg), patch("trino_mcp.server._admission_queues", queues):
+        catalogs, blocked = asyncio.run(_test())
+
+    assert catalogs == "cat1"
+    assert "concurrent export query slot" in blocked
+
+
+@patch("trino_mcp.server.client")
+def test_execute_query_classifies_reads_and_writes(mock_client):
+    """Test that execute_query takes a write slot only for write statements."""
+    from trino_mcp.config import TrinoConfig
+    from trino_mcp.server import execute_query
+
+    cfg = TrinoConfig(host="localhost", port=8080, user="trino", allow_write_queries=True)
+    queues = _default_admission_queues()
+    mock_client.execute_query_json.return_value = "[]"
+
+    async def _test():
+        write = await queues["write"].acquire()
+        try:
+            return (
+                await execute_query("SELECT 1"),
+                await execute_query("DELETE FROM t"),
+            )
+        finally:
+            write.release()
+
+    with patch("trino_mcp.server.config", cfg), patch("trino_mcp.server._admission_queues", queues):
+        read_result, write_result = asyncio.run(_test())
+
+    assert read_result == "[]"
+    assert "concurrent write query slot" in write_result
+
+
+def test_admission_error_message_content():
+    """Test the rejection message carries the queue's reason."""
+    from trino_mcp.admission import QueueFullError
+    from trino_mcp.server import _admission_error_message
 
-    msg = _concurrency_limit_message()
+    msg = _admission_error_message(QueueFullError("All 1 concurrent query slot(s) are in use.", 0))
     assert "concurrent query slot" in msg
     assert "Please wait" in msg
 
@@ -680,19 +952,591 @@ def test_concurrency_limit_message_content():
         "QUERY_TIMEOUT_MINUTES": "10",
     },
 )
-def test_init_config_sets_instructions_and_semaphore(mock_trino_client):
-    """Test that _init_config sets up the semaphore and MCP instructions."""
-    from trino_mcp.server import _init_config, mcp, _query_semaphore, config
+def test_init_config_sets_instructions_and_admission_queues(mock_trino_client):
+    """Test that _init_config sets up the admission queues and MCP instructions."""
+    from trino_mcp.server import _init_config, mcp, config
 
     _init_config()
 
     # Re-import to get updated globals
     import trino_mcp.server as srv
 
-    assert srv._query_semaphore is not None
+    assert {kind: queue.slots for kind, queue in srv._admission_queues.items()} == {
+        "metadata": 2,
+        "read": 2,
+        "write": 2,
+        "export": 2,
+    }
+    assert srv._admission_queues["read"].max_wait_seconds == 30
     assert srv.config.max_concurrent_queries == 2
-    assert "2 tool call(s)" in srv.mcp.instructions
+    assert "2 metadata, 2 read, 2 write, 2 export tool call(s)" in srv.mcp.instructions
+    assert "up to 30 second(s)" in srv.mcp.instructions
     assert "10 minute(s)" in srv.mcp.instructions
 
-    # Restore default semaphore for other tests
-    srv._query_semaphore = asyncio.Semaphore(1)
+    # Restore the default queues (no waiting) for other tests
+    srv._admission_queues = _default_admission_queues()
+
+
+@patch("trino_mcp.server.TrinoClient")
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+        "METADATA_STORE_PATH": "/tmp/trino-mcp-test.db",
+        "METADATA_STORE_REFRESH_SECONDS": "600",
+    },
+)
+def test_init_config_restores_metadata_store(mock_trino_client):
+    """Test that creating the client preloads the snapshot and starts refreshing it."""
+    import trino_mcp.server as srv
+
+    mock_trino_client.return_value.schema_snapshot.restore.return_value = 5
+    mock_trino_client.return_value.refresh_snapshot.return_value = 0
+
+    srv._init_config()
+    try:
+        mock_trino_client.return_value.schema_snapshot.restore.assert_not_called()
+        assert srv._get_client() is mock_trino_client.return_value
+        mock_trino_client.return_value.schema_snapshot.restore.assert_called_once_with()
+        assert srv._snapshot_refresh_stop is not None
+        deadline = time.monotonic() + 5
+        while not mock_trino_client.return_value.refresh_snapshot.called:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        mock_trino_client.return_value.refresh_snapshot.assert_called_with(600)
+    finally:
+        srv._snapshot_refresh_stop.set()
+        srv._snapshot_refresh_stop = None
+        srv.client = None
+        srv._admission_queues = _default_admission_queues()
+
+
+@patch("trino_mcp.server.TrinoClient")
+@patch.dict(
+    os.environ,
+    {
+        "TRINO_HOST": "localhost",
+        "TRINO_PORT": "8080",
+        "TRINO_USER": "trino",
+        "AUTH_METHOD": "NONE",
+    },
+)
+def test_client_created_on_first_tool_call(mock_trino_client):
+    """Test that _init_config does not connect; the first tool call creates the client once."""
+    import trino_mcp.server as srv
+
+    mock_trino_client.return_value.list_catalogs.return_value = ["hive"]
+    srv._init_config()
+    try:
+        mock_trino_client.assert_not_called()
+        assert srv.client is None
+
+        assert asyncio.run(srv.list_catalogs()) == "hive"
+        assert asyncio.run(srv.list_catalogs()) == "hive"
+
+        mock_trino_client.assert_called_once_with(srv.config)
+        assert srv.async_client is None
+    finally:
+        srv.client = None
+        srv._admission_queues = _default_admission_queues()
+
+
+@patch("trino_mcp.server.async_client")
+@patch("trino_mcp.server.client")
+def test_tools_use_async_client_when_enabled(mock_client, mock_async_client):
+    """Test that tools await the async client instead of using a thread."""
+    from trino_mcp.server import execute_query_read_only, list_catalogs
+
+    mock_async_client.list_catalogs = AsyncMock(return_value=["hive"])
+    mock_async_client.execute_query_json = AsyncMock(return_value='[{"n": 1}]')
+
+    assert asyncio.run(list_catalogs()) == "hive"
+    assert asyncio.run(execute_query_read_only("SELECT 1")) == '[{"n": 1}]'
+    mock_client.list_catalogs.assert_not_called()
+    mock_client.execute_query_json.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# Result cache
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def result_cache():
+    """Enable a result cache on the server for the duration of a test."""
+    from trino_mcp.cache import ResultCache
+    from trino_mcp.config import TrinoConfig
+
+    cache = ResultCache(ttl_seconds=60, max_bytes=1024 * 1024)
+    cfg = TrinoConfig(
+        host="localhost", port=8080, user="trino", catalog="hive",
+        allow_write_queries=True,
+    )
+    with patch("trino_mcp.server.result_cache", cache), patch("trino_mcp.server.config", cfg):
+        yield cache
+
+
+@patch("trino_mcp.server.client")
+def test_read_only_query_served_from_cache(mock_client, result_cache):
+    """Test that an equivalent repeated query does not hit Trino again."""
+    from trino_mcp.server import execute_query_read_only
+
+    mock_client.execute_query_json.return_value = '[{"n": 1}]'
+
+    first = asyncio.run(execute_query_read_only("SELECT n FROM t"))
+    second = asyncio.run(execute_query_read_only("select  n\nfrom T"))
+
+    assert first == second == '[{"n": 1}]'
+    mock_client.execute_query_json.assert_called_once_with("SELECT n FROM t")
+
+
+@patch("trino_mcp.server.client")
+def test_read_only_query_use_cache_false(mock_client, result_cache):
+    """Test that use_cache=False always runs the query."""
+    from trino_mcp.server import execute_query_read_only
+
+    mock_client.execute_query_json.return_value = '[{"n": 1}]'
+
+    asyncio.run(execute_query_read_only("SELECT 1"))
+    asyncio.run(execute_query_read_only("SELECT 1", use_cache=False))
+
+    assert mock_client.execute_query_json.call_count == 2
+
+
+@patch("trino_mcp.server.client")
+def test_result_cache_key_includes_session_properties(mock_client, result_cache):
+    """Test that changed session properties miss the cache."""
+    from trino_mcp import server
+
+    mock_client.execute_query_json.return_value = "[]"
+
+    asyncio.run(server.execute_query_read_only("SELECT 1"))
+    server.config.session_properties = {"query_max_run_time": "30s"}
+    asyncio.run(server.execute_query_read_only("SELECT 1"))
+
+    assert mock_client.execute_query_json.call_count == 2
+
+
+@patch("trino_mcp.server.client")
+def test_result_cache_skips_errors_and_exports(mock_client, result_cache):
+    """Test that failed queries and file exports are not cached."""
+    from trino_mcp.server import execute_query_read_only
+
+    mock_client.execute_query_json.side_effect = Exception("boom")
+    mock_client.execute_query_to_file.return_value = 1
+
+    assert "boom" in asyncio.run(execute_query_read_only("SELECT 1"))
+    asyncio.run(execute_query_read_only("SELECT 1", output_file="/tmp/out.csv"))
+
+    assert len(result_cache) == 0
+
+
+@patch("trino_mcp.server.client")
+def test_write_query_clears_result_cache(mock_client, result_cache):
+    """Test that a write through execute_query drops cached results."""
+    from trino_mcp.server import execute_query, execute_query_read_only
+
+    mock_client.execute_query_json.return_value = "[]"
+    asyncio.run(execute_query_read_only("SELECT * FROM t"))
+    assert len(result_cache) == 1
+
+    asyncio.run(execute_query("INSERT INTO t VALUES (1)"))
+
+    assert len(result_cache) == 0
+
+
+@patch("trino_mcp.server.client")
+def test_invalidate_metadata_cache_tool(mock_client):
+    from trino_mcp.server import invalidate_metadata_cache
+
+    mock_client.invalidate_metadata.return_value = 3
+
+    result = asyncio.run(invalidate_metadata_cache("hive", "web", ""))
+
+    assert result == "Dropped 3 cached metadata entries."
+    mock_client.invalidate_metadata.assert_called_once_with("hive", "web", None)
+
+
+@patch("trino_mcp.server.client")
+def test_invalidate_metadata_cache_tool_disabled(mock_client):
+    from trino_mcp.server import invalidate_metadata_cache
+
+    mock_client.metadata_cache = None
+
+    result = asyncio.run(invalidate_metadata_cache("", "", ""))
+
+    assert "disabled" in result
+    mock_client.invalidate_metadata.assert_not_called()
+
+
+@patch("trino_mcp.server.client")
+def test_snapshot_schema_tool(mock_client):
+    from trino_mcp.server import snapshot_schema
+
+    mock_client.snapshot_schema.return_value = (2000, 31000)
+
+    result = asyncio.run(snapshot_schema("hive", "web"))
+
+    assert "2000 table(s) with 31000 column(s) from hive.web" in result
+    mock_client.snapshot_schema.assert_called_once_with("hive", "web")
+
+
+@patch("trino_mcp.server.client")
+def test_snapshot_schema_tool_whole_catalog_error(mock_client):
+    from trino_mcp.server import snapshot_schema
+
+    mock_client.snapshot_schema.side_effect = Exception("Access Denied")
+
+    result = asyncio.run(snapshot_schema("hive", ""))
+
+    assert result == "Error taking schema snapshot: Access Denied"
+    mock_client.snapshot_schema.assert_called_once_with("hive", None)
+
+
+@patch("trino_mcp.server.client")
+def test_search_tables_tool(mock_client):
+    from trino_mcp.search import SearchHit
+    from trino_mcp.server import search_tables
+
+    mock_client.schema_snapshot.__len__.return_value = 2
+    mock_client.search_tables.return_value = [
+        SearchHit("table", "hive", "sales", "daily_revenue", 1.0),
+        SearchHit("column", "hive", "sales", "orders", 1.0, "revenue_usd", "double"),
+    ]
+
+    result = asyncio.run(search_tables("revenue", 5))
+
+    assert result == (
+        "hive.sales.daily_revenue (table)\n"
+        "hive.sales.orders.revenue_usd double (column)"
+    )
+    mock_client.search_tables.assert_called_once_with("revenue", 5)
+
+
+@patch("trino_mcp.server.client")
+def test_search_tables_tool_without_snapshot(mock_client):
+    from trino_mcp.server import search_tables
+
+    mock_client.schema_snapshot.__len__.return_value = 0
+
+    result = asyncio.run(search_tables("revenue", 5))
+
+    assert "Call snapshot_schema" in result
+    mock_client.search_tables.assert_not_called()
+
+
+@patch("trino_mcp.server.client")
+def test_search_tables_tool_no_match(mock_client):
+    from trino_mcp.server import search_tables
+
+    mock_client.schema_snapshot.__len__.return_value = 1
+    mock_client.search_tables.return_value = []
+
+    assert asyncio.run(search_tables("revenue", 5)) == "No tables or columns match 'revenue'."
+
+
+def test_snapshot_tools_create_client_off_event_loop():
+    """Test that the lazily created client is never built on the event loop."""
+    import threading
+
+    from trino_mcp.server import invalidate_metadata_cache, search_tables
+
+    threads = []
+    mock_client = MagicMock()
+    mock_client.schema_snapshot.__len__.return_value = 0
+    mock_client.metadata_cache = None
+
+    def _get_client():
+        threads.append(threading.current_thread().name)
+        return mock_client
+
+    with patch("trino_mcp.server._get_client", side_effect=_get_client):
+        asyncio.run(search_tables("revenue", 5))
+        asyncio.run(invalidate_metadata_cache("", "", ""))
+
+    assert len(threads) == 2
+    assert threading.main_thread().name not in threads
+
+
+# ---------------------------------------------------------------------------
+# Query validation off the event loop
+# ---------------------------------------------------------------------------
+
+
+LONG_QUERY = "SELECT 1 AS x" + " -- padding\n" * 1000
+
+
+@patch("trino_mcp.server.client")
+def test_long_query_validated_off_event_loop(mock_client):
+    """Test that a long query is parsed on the validation executor."""
+    import threading
+
+    import trino_mcp.server as srv
+
+    mock_client.execute_query_json.return_value = '[{"x": 1}]'
+    threads = []
+    derive = srv.derive_query_facts
+
+    def _derive(query, row_limits):
+        threads.append(threading.current_thread().name)
+        return derive(query, row_limits)
+
+    with patch("trino_mcp.server.derive_query_facts", side_effect=_derive):
+        assert asyncio.run(srv.execute_query_read_only(LONG_QUERY)) == '[{"x": 1}]'
+        asyncio.run(srv.execute_query_read_only("SELECT 1"))
+
+    # Only the long query is analysed, and not on the event loop's thread.
+    assert len(threads) == 1
+    assert threads[0] != threading.main_thread().name
+
+
+@patch("trino_mcp.server.client")
+def test_process_validation_executor(mock_client):
+    """Test that read-only checks work on a process pool."""
+    import trino_mcp.server as srv
+
+    mock_client.execute_query_json.return_value = "[]"
+    executor = srv._create_validation_executor("process", 1)
+    try:
+        with patch("trino_mcp.server._validation_executor", executor):
+            assert asyncio.run(srv.execute_query_read_only(LONG_QUERY)) == "[]"
+            result = asyncio.run(
+                srv.execute_query_read_only("DROP TABLE t" + " -- padding\n" * 1000)
+            )
+    finally:
+        executor.shutdown()
+
+    assert "does not appear to be read-only" in result
+
+
+@patch("trino_mcp.server.client")
+def test_broken_validation_executor_falls_back_to_thread(mock_client):
+    """Test that a failed validation executor is replaced and the call still answered."""
+    from concurrent.futures.process import BrokenProcessPool
+
+    import trino_mcp.server as srv
+    from trino_mcp.config import TrinoConfig
+
+    cfg = TrinoConfig(host="localhost", port=8080, user="trino", validation_executor="thread")
+    mock_client.execute_query_json.return_value = "[]"
+    broken = MagicMock()
+    broken.submit.side_effect = BrokenProcessPool("worker died")
+    with patch("trino_mcp.server.config", cfg), patch(
+        "trino_mcp.server._validation_executor", broken
+    ):
+        assert asyncio.run(srv.execute_query_read_only(LONG_QUERY)) == "[]"
+        replacement = srv._validation_executor
+
+    broken.shutdown.assert_called_once_with(wait=False)
+    assert replacement is not broken
+    replacement.shutdown()
+
+
+@patch("trino_mcp.server.client")
+def test_process_validation_parses_query_once(mock_client):
+    """Test that a query analysed on a worker process is not re-parsed here."""
+    import trino_mcp.server as srv
+    from trino_mcp import utils
+    from trino_mcp.config import TrinoConfig
+
+    cfg = TrinoConfig(host="localhost", port=8080, user="trino", max_inline_rows=10)
+    query = "SELECT a FROM t" + " -- padding\n" * 1000
+    mock_client.execute_query_json_limited.return_value = ("[]", False)
+    utils.clear_parse_cache()
+    executor = srv._create_validation_executor("process", 1)
+    try:
+        with patch("trino_mcp.server._validation_executor", executor), patch(
+            "trino_mcp.server.config", cfg
+        ), patch("trino_mcp.utils._parse", side_effect=AssertionError("parsed")):
+            assert asyncio.run(srv.execute_query_read_only(query)) == "[]"
+            assert utils.normalize_query(query) == "SELECT a FROM t"
+            assert utils.changed_objects(query) == []
+            assert utils.limit_query(query, 11).endswith(" LIMIT 11")
+    finally:
+        executor.shutdown()
+        utils.clear_parse_cache()
+
+
+@patch("trino_mcp.server.client")
+def test_query_length_limit(mock_client):
+    """Test that oversized queries are rejected before they are parsed."""
+    from trino_mcp.config import TrinoConfig
+    from trino_mcp.server import execute_query_read_only
+
+    cfg = TrinoConfig(host="localhost", port=8080, user="trino", max_query_length=100)
+    with patch("trino_mcp.server.config", cfg), patch(
+        "trino_mcp.server._is_read_only_query"
+    ) as mock_check:
+        result = asyncio.run(execute_query_read_only("SELECT " + "1, " * 50 + "1"))
+
+    assert "exceeds the limit of 100 (MAX_QUERY_LENGTH)" in result
+    mock_check.assert_not_called()
+    mock_client.execute_query_json.assert_not_called()
+
+
+@patch("trino_mcp.server.client")
+def test_query_length_limit_for_write_queries(mock_client):
+    """Test that execute_query rejects oversized queries before parsing too."""
+    from trino_mcp.config import TrinoConfig
+    from trino_mcp.server import execute_query
+
+    cfg = TrinoConfig(
+        host="localhost", port=8080, user="trino", allow_write_queries=True, max_query_length=100
+    )
+    with patch("trino_mcp.server.config", cfg), patch(
+        "trino_mcp.server._is_read_only_query"
+    ) as mock_check:
+        result = asyncio.run(execute_query("INSERT INTO t VALUES " + "(1), " * 30 + "(1)"))
+
+    assert "exceeds the limit of 100 (MAX_QUERY_LENGTH)" in result
+    mock_check.assert_not_called()
+    mock_client.execute_query_json.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# Inline row cap
+# ---------------------------------------------------------------------------
+
+
+@patch("trino_mcp.server.client")
+def test_inline_row_cap_reports_truncation(mock_client):
+    from trino_mcp.config import TrinoConfig
+    from trino_mcp.server import execute_query_read_only
+
+    cfg = TrinoConfig(host="localhost", port=8080, user="trino", max_inline_rows=2)
+    mock_client.execute_query_json_limited.return_value = ('[{"n": 1}, {"n": 2}]', True)
+
+    with patch("trino_mcp.server.config", cfg):
+        result = asyncio.run(execute_query_read_only("SELECT n FROM t"))
+
+    assert result.startswith('[{"n": 1}, {"n": 2}]\n\nNote: results truncated to the first 2 row(s)')
+    mock_client.execute_query_json_limited.assert_called_once_with("SELECT n FROM t", 2)
+    mock_client.execute_query_json.assert_not_called()
+
+
+@patch("trino_mcp.server.client")
+def test_inline_row_cap_skips_file_exports(mock_client):
+    from trino_mcp.config import TrinoConfig
+    from trino_mcp.server import execute_query_read_only
+
+    cfg = TrinoConfig(host="localhost", port=8080, user="trino", max_inline_rows=2)
+    mock_client.execute_query_to_file.return_value = 10
+
+    with patch("trino_mcp.server.config", cfg):
+        result = asyncio.run(execute_query_read_only("SELECT n FROM t", output_file="/tmp/out.csv"))
+
+    assert "(10 row(s))" in result
+    mock_client.execute_query_json_limited.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# Paged results
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def result_buffer():
+    """Give the server a result buffer for the duration of a test."""
+    from trino_mcp.results import ResultBuffer
+
+    buffer = ResultBuffer(ttl_seconds=60, max_bytes=1024 * 1024)
+    with patch("trino_mcp.server.result_buffer", buffer):
+        yield buffer
+
+
+def _fetch_into(columns, rows, truncated):
+    """Build a ``fetch_into`` side effect that fills the spool with *rows*."""
+
+    def _fetch(query, spool, max_rows):
+        spool.extend(rows)
+        return columns, truncated
+
+    return _fetch
+
+
+@patch("trino_mcp.server.client")
+def test_paged_query_returns_handle_and_fetch_more(mock_client, result_buffer):
+    import json
+
+    from trino_mcp.config import TrinoConfig
+    from trino_mcp.server import execute_query_read_only, fetch_more
+
+    cfg = TrinoConfig(host="localhost", port=8080, user="trino", result_buffer_max_rows=500)
+    mock_client.fetch_into.side_effect = _fetch_into(["n"], [(i,) for i in range(5)], True)
+
+    with patch("trino_mcp.server.config", cfg):
+        first = asyncio.run(execute_query_read_only("SELECT n FROM t", page_size=2))
+        page = json.loads(first.split("\n\n")[0])
+        second = asyncio.run(fetch_more(page["handle"], page["next_offset"], 10))
+
+    query, _, max_rows = mock_client.fetch_into.call_args.args
+    assert (query, max_rows) == ("SELECT n FROM t", 500)
+    assert page["rows"] == [{"n": 0}, {"n": 1}]
+    assert page["truncated"] is True
+    assert f"call fetch_more with handle='{page['handle']}' and offset=2" in first
+    assert json.loads(second)["rows"] == [{"n": 2}, {"n": 3}, {"n": 4}]
+    assert "More rows available" not in second
+
+
+@patch("trino_mcp.server.client")
+def test_paged_query_respects_max_inline_rows(mock_client, result_buffer):
+    import json
+
+    from trino_mcp.config import TrinoConfig
+    from trino_mcp.server import execute_query_read_only
+
+    cfg = TrinoConfig(host="localhost", port=8080, user="trino", max_inline_rows=3)
+    mock_client.fetch_into.side_effect = _fetch_into(["n"], [(i,) for i in range(10)], False)
+
+    with patch("trino_mcp.server.config", cfg):
+        result = asyncio.run(execute_query_read_only("SELECT n FROM t", page_size=50))
+
+    assert len(json.loads(result.split("\n\n")[0])["rows"]) == 3
+
+
+def test_fetch_more_unknown_handle(result_buffer):
+    from trino_mcp.server import fetch_more
+
+    result = asyncio.run(fetch_more("deadbeef", 0, 10))
+
+    assert "unknown or has expired" in result
+
+
+@patch("trino_mcp.server.client")
+def test_paged_query_error(mock_client, result_buffer):
+    from trino_mcp.config import TrinoConfig
+    from trino_mcp.server import execute_query_read_only
+
+    cfg = TrinoConfig(host="localhost", port=8080, user="trino")
+    mock_client.fetch_into.side_effect = Exception("Table not found")
+
+    with patch("trino_mcp.server.config", cfg):
+        result = asyncio.run(execute_query_read_only("SELECT n FROM t", page_size=2))
+
+    assert result == "Error executing query: Table not found"
+    assert len(result_buffer) == 0
+
+
+@patch("trino_mcp.server.client")
+def test_paged_query_spills_to_disk(mock_client, tmp_path):
+    import json
+
+    from trino_mcp.config import TrinoConfig
+    from trino_mcp.results import ResultBuffer
+    from trino_mcp.server import execute_query_read_only, fetch_more
+
+    cfg = TrinoConfig(host="localhost", port=8080, user="trino")
+    buffer = ResultBuffer(60, 1024 * 1024, spill_bytes=100, spill_dir=str(tmp_path))
+    mock_client.fetch_into.side_effect = _fetch_into(["n"], [(i,) for i in range(100)], False)
+
+    with patch("trino_mcp.server.config", cfg), patch("trino_mcp.server.result_buffer", buffer):
+        first = asyncio.run(execute_query_read_only("SELECT n FROM t", page_size=10))
+        handle = json.loads(first.split("\n\n")[0])["handle"]
+        assert buffer.get(handle).rows.spilled
+        page = json.loads(asyncio.run(fetch_more(handle, 95, 10)))
+
+    assert page["rows"] == [{"n": i} for i in range(95, 100)]
+    assert page["next_offset"] is None
@@ -0,0 +1,142 @@
+"""Tests for trino_mcp.snapshot module."""
+
+import json
+
+from trino_mcp.snapshot import SchemaSnapshot, snapshot_query
+from trino_mcp.store import MetadataStore
+
+ROWS = [
+    ("web", "orders", "id", "bigint"),
+    ("web", "orders", "total", "decimal(10,2)"),
+    ("web", "users", "id", "bigint"),
+    ("sales", "leads", "email", "varchar"),
+]
+
+
+def test_snapshot_query_for_catalog():
+    assert snapshot_query("hive") == (
+        "SELECT table_schema, table_name, column_name, data_type\n"
+        "FROM hive.information_schema.columns\n"
+        "ORDER BY table_schema, table_name, ordinal_position"
+    )
+
+
+def test_snapshot_query_for_schema_escapes_literal():
+    assert "WHERE table_schema = 'o''brien'\n" in snapshot_query("hive", "o'brien")
+
+
+def test_load_and_lookup():
+    snapshot = SchemaSnapshot()
+
+    assert snapshot.load("hive", ROWS) == (3, 4)
+
+    assert len(snapshot) == 3
+    assert snapshot.columns("HIVE", "web", "Orders") == (
+        ("id", "bigint"),
+        ("total", "decimal(10,2)"),
+    )
+    assert snapshot.columns("hive", "web", "missing") is None
+    assert snapshot.columns("hive", "other", "orders") is None
+    assert snapshot.loaded_at("hive", "web") is not None
+
+
+def test_describe_json_matches_describe_shape():
+    snapshot = SchemaSnapshot()
+    snapshot.load("hive", ROWS)
+
+    described = json.loads(snapshot.describe_json("hive", "web", "users"))
+
+    assert described == [{"Column": "id", "Type": "bigint", "Extra": "", "Comment": ""}]
+    assert snapshot.describe_json("hive", "web", "missing") is None
+
+
+def test_load_schema_replaces_only_that_schema():
+    snapshot = SchemaSnapshot()
+    snapshot.load("hive", ROWS)
+
+    snapshot.load("hive", [("web", "events", "ts", "timestamp(3)")], schema="web")
+
+    assert snapshot.columns("hive", "web", "orders") is None
+    assert snapshot.columns("hive", "web", "events") == (("ts", "timestamp(3)"),)
+    assert snapshot.columns("hive", "sales", "leads") is not None
+
+
+def test_load_empty_schema_is_recorded():
+    snapshot = SchemaSnapshot()
+
+    assert snapshot.load("hive", [], schema="empty") == (0, 0)
+    assert snapshot.loaded_at("hive", "empty") is not None
+
+
+def test_invalidate_table_schema_and_all():
+    snapshot = SchemaSnapshot()
+    snapshot.load("hive", ROWS)
+
+    snapshot.invalidate("hive", "web", "orders")
+    assert snapshot.columns("hive", "web", "orders") is None
+    assert snapshot.columns("hive", "web", "users") is not None
+
+    snapshot.invalidate("hive", "web")
+    assert snapshot.columns("hive", "web", "users") is None
+    assert snapshot.columns("hive", "sales", "leads") is not None
+
+    snapshot.invalidate()
+    assert len(snapshot) == 0
+
+
+def test_invalidate_query():
+    snapshot = SchemaSnapshot()
+    snapshot.load("hive", ROWS)
+
+    snapshot.invalidate_query("ALTER TABLE orders ADD COLUMN note varchar", "hive", "web")
+    snapshot.invalidate_query("INSERT INTO users VALUES (1)", "hive", "web")
+
+    assert snapshot.columns("hive", "web", "orders") is None
+    assert snapshot.columns("hive", "web", "users") is not None
+
+    snapshot.invalidate_query("CREATE CATALOG lake USING iceberg")
+    assert len(snapshot) == 0
+
+
+def test_tables_listing_until_a_table_changes():
+    snapshot = SchemaSnapshot()
+    snapshot.load("hive", ROWS)
+
+    assert snapshot.tables("hive", "WEB") == ["orders", "users"]
+    assert snapshot.tables("hive", "missing") is None
+
+    snapshot.invalidate("hive", "web", "orders")
+
+    assert snapshot.tables("hive", "web") is None
+    assert snapshot.stale(3600) == [("hive", "web")]
+
+
+def test_stale_oldest_first():
+    snapshot = SchemaSnapshot()
+    snapshot.load("hive", ROWS)
+    snapshot._loaded_at[("hive", "sales")] -= 100
+
+    assert snapshot.stale(3600) == []
+    assert snapshot.stale(0) == [("hive", "sales"), ("hive", "web")]
+
+
+def test_store_write_through_and_restore(tmp_path):
+    path = str(tmp_path / "metadata.db")
+    snapshot = SchemaSnapshot(MetadataStore(path))
+    snapshot.load("Hive", ROWS)
+    snapshot.invalidate("hive", "web", "orders")
+    snapshot.invalidate_query("DROP SCHEMA sales", "hive")
+    loaded_at = snapshot.loaded_at("hive", "web")
+
+    restored = SchemaSnapshot(MetadataStore(path))
+
+    assert restored.restore() == 1
+    assert restored.columns("hive", "web", "users") == (("id", "bigint"),)
+    assert restored.columns("hive", "web", "orders") is None
+    assert restored.columns("hive", "sales", "leads") is None
+    assert restored.loaded_at("hive", "web") == loaded_at
+    assert restored.tables("hive", "web") is None
+
+
+def test_restore_without_store():
+    assert SchemaSnapshot().restore() == 0
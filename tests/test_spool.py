@@ -0,0 +1,83 @@
+"""Tests for trino_mcp.spool module."""
+
+import datetime
+import json
+import sys
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from trino_mcp.spool import RowSpool, row_size
+
+ROWS = [(i, f"name-{i}") for i in range(1000)]
+
+
+def test_rows_stay_in_memory_below_threshold():
+    spool = RowSpool(memory_bytes=1024 * 1024)
+    spool.extend(ROWS)
+
+    assert not spool.spilled
+    assert len(spool) == 1000
+    assert list(spool.rows()) == ROWS
+    assert spool.size == sum(row_size(row) for row in ROWS)
+
+
+def test_row_size_counts_python_objects():
+    """Test that row sizes reflect the memory a row takes, not its JSON length."""
+    row = (1, "x" * 100, [Decimal("1.5"), {"k": "v"}])
+
+    assert row_size(row) > len(json.dumps(row, default=str))
+    assert row_size(row) > sys.getsizeof(row) + sys.getsizeof(row[1]) + sys.getsizeof(row[2])
+    assert row_size((1, ["a", "b"])) > row_size((1, []))
+
+
+def test_spills_past_threshold_and_reads_back(tmp_path):
+    with patch("trino_mcp.spool.SPILL_CHUNK_BYTES", 500):
+        spool = RowSpool(memory_bytes=200, directory=str(tmp_path))
+        spool.extend(ROWS)
+
+    assert spool.spilled
+    assert len(spool) == 1000
+    assert list(spool.rows()) == ROWS
+    assert len(list(spool.batches())) > 10
+    spool.close()
+
+
+@pytest.mark.parametrize("offset,limit", [(0, 5), (17, 40), (990, 50), (2000, 5), (0, 1000)])
+def test_slice_matches_list_slicing(offset, limit):
+    with patch("trino_mcp.spool.SPILL_CHUNK_BYTES", 300):
+        spool = RowSpool(memory_bytes=1000)
+        spool.extend(ROWS)
+
+    assert spool.slice(offset, limit) == ROWS[offset : offset + limit]
+
+
+def test_spilled_values_keep_their_types():
+    row = (Decimal("1.10"), datetime.date(2024, 1, 2), [1, 2], {"k": None})
+    spool = RowSpool(memory_bytes=1)
+    spool.append(row)
+    spool.append(row)
+
+    assert spool.spilled
+    assert spool.slice(0, 1) == [row]
+
+
+def test_max_bytes_rejects_rows_that_do_not_fit():
+    spool = RowSpool(max_bytes=row_size(ROWS[0]) * 3)
+
+    assert spool.extend(ROWS) == 3
+    assert spool.append(ROWS[0]) is False
+    assert len(spool) == 3
+
+
+def test_close_releases_rows():
+    spool = RowSpool(memory_bytes=10)
+    spool.extend(ROWS[:50])
+    spool.close()
+    spool.close()
+
+    with pytest.raises(ValueError, match="closed"):
+        spool.slice(0, 10)
+    with pytest.raises(ValueError):
+        spool.append(ROWS[0])
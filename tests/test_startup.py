@@ -0,0 +1,52 @@
+"""Startup benchmark: the cost of importing the server, measured with ``python -X importtime``."""
+
+import os
+import subprocess
+import sys
+
+# Budget for importing trino_mcp.server, most of which is the mcp SDK and
+# pydantic. Generous enough for slow CI machines; tighten locally with
+# IMPORT_TIME_BUDGET_MS to catch regressions.
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "3000"))
+
+# Modules that must only be imported when a tool or option first needs them.
+LAZY_MODULES = ("sqlglot", "azure.identity", "pyarrow", "trino_mcp.async_client")
+
+
+def _import_times(module: str) -> dict:
+    """Import *module* in a fresh interpreter and return ``{module: cumulative µs}``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_server_import_skips_lazy_modules():
+    """Test that importing the server does not load sqlglot, auth or export libraries."""
+    times = _import_times("trino_mcp.server")
+
+    loaded = [name for name in LAZY_MODULES if name in times]
+    assert loaded == []
+
+
+def test_server_import_time_within_budget():
+    """Test that importing the server stays within IMPORT_TIME_BUDGET_MS."""
+    # The first run warms the bytecode cache, which a real start-up reuses.
+    _import_times("trino_mcp.server")
+    elapsed_ms = _import_times("trino_mcp.server")["trino_mcp.server"] / 1000
+
+    assert elapsed_ms < IMPORT_TIME_BUDGET_MS, (
+        f"Importing trino_mcp.server took {elapsed_ms:.0f} ms "
+        f"(budget: {IMPORT_TIME_BUDGET_MS:.0f} ms)"
+    )
@@ -0,0 +1,76 @@
+"""Tests for trino_mcp.store module."""
+
+import sqlite3
+
+from trino_mcp.store import MetadataStore
+
+ORDERS = (("id", "bigint"), ("total", "decimal(10,2)"))
+
+
+def _load(store):
+    return {(c, s): (complete, tables) for c, s, _, complete, tables in store.load()}
+
+
+def test_replace_and_load_round_trip(tmp_path):
+    path = tmp_path / "cache" / "metadata.db"
+    store = MetadataStore(str(path))
+    store.replace("hive", None, {"web": {"orders": ORDERS}, "empty": {}}, 1000.0)
+    store.close()
+
+    reopened = MetadataStore(str(path))
+
+    assert _load(reopened) == {
+        ("hive", "web"): (True, {"orders": ORDERS}),
+        ("hive", "empty"): (True, {}),
+    }
+    assert [loaded_at for *_, loaded_at, _, _ in reopened.load()] == [1000.0, 1000.0]
+
+
+def test_replace_schema_keeps_other_schemas(tmp_path):
+    store = MetadataStore(str(tmp_path / "metadata.db"))
+    store.replace("hive", None, {"web": {"orders": ORDERS}, "sales": {"leads": ORDERS}}, 1.0)
+
+    store.replace("hive", "web", {"web": {"users": (("id", "bigint"),)}}, 2.0)
+
+    assert _load(store) == {
+        ("hive", "web"): (True, {"users": (("id", "bigint"),)}),
+        ("hive", "sales"): (True, {"leads": ORDERS}),
+    }
+
+
+def test_delete_table_marks_schema_incomplete(tmp_path):
+    store = MetadataStore(str(tmp_path / "metadata.db"))
+    store.replace("hive", None, {"web": {"orders": ORDERS, "users": ORDERS}}, 1.0)
+
+    store.delete("hive", "web", "orders")
+
+    assert _load(store) == {("hive", "web"): (False, {"users": ORDERS})}
+
+
+def test_delete_schema_catalog_and_all(tmp_path):
+    store = MetadataStore(str(tmp_path / "metadata.db"))
+    store.replace("hive", None, {"web": {"orders": ORDERS}, "sales": {"leads": ORDERS}}, 1.0)
+    store.replace("iceberg", None, {"web": {"events": ORDERS}}, 1.0)
+
+    store.delete("hive", "web")
+    assert set(_load(store)) == {("hive", "sales"), ("iceberg", "web")}
+
+    store.delete("hive")
+    assert set(_load(store)) == {("iceberg", "web")}
+
+    store.delete()
+    assert _load(store) == {}
+
+
+def test_incompatible_file_is_reset(tmp_path):
+    path = str(tmp_path / "metadata.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE columns (whatever TEXT)")
+    conn.execute("PRAGMA user_version = 99")
+    conn.commit()
+    conn.close()
+
+    store = MetadataStore(path)
+    store.replace("hive", None, {"web": {"orders": ORDERS}}, 1.0)
+
+    assert _load(store) == {("hive", "web"): (True, {"orders": ORDERS})}
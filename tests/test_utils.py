@@ -1,8 +1,26 @@
 """Tests for trino_mcp.utils module."""
 
+from unittest.mock import patch
+
 import pytest
+import sqlglot
+
+from trino_mcp import utils
+from trino_mcp.utils import (
+    changed_objects,
+    clear_parse_cache,
+    is_read_only_query,
+    normalize_query,
+    parse_query,
+)
 
-from trino_mcp.utils import is_read_only_query
+
+@pytest.fixture(autouse=True)
+def _empty_parse_cache():
+    """Start every test with an empty parse cache."""
+    clear_parse_cache()
+    yield
+    clear_parse_cache()
 
 
 @pytest.mark.parametrize(
@@ -59,3 +77,178 @@ def test_is_read_only_query_importable_from_package():
     from trino_mcp import is_read_only_query as pkg_func
 
     assert pkg_func("SELECT 1") is True
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "select a, b from t where x = 'Foo'",
+        "SELECT  a,\n  b\nFROM T WHERE X = 'Foo'",
+        "-- comment\nSELECT a, b FROM t WHERE x = 'Foo'",
+    ],
+)
+def test_normalize_query_equivalent_spellings(query):
+    assert normalize_query(query) == "SELECT a, b FROM t WHERE x = 'Foo'"
+
+
+def test_normalize_query_keeps_literals_distinct():
+    assert normalize_query("SELECT 'a'") != normalize_query("SELECT 'A'")
+
+
+def test_normalize_query_parse_failure_collapses_whitespace():
+    assert normalize_query("THIS IS  NOT\nVALID SQL @@@ !!!") == "THIS IS NOT VALID SQL @@@ !!!"
+
+
+@pytest.mark.parametrize(
+    "query,expected",
+    [
+        ("CREATE TABLE c.s.t (x INT)", [("c", "s", "t")]),
+        ("CREATE TABLE s.t AS SELECT * FROM o JOIN p ON TRUE", [(None, "s", "t")]),
+        ("DROP TABLE IF EXISTS t", [(None, None, "t")]),
+        ("ALTER TABLE s.t RENAME TO s.u", [(None, "s", "t"), (None, "s", "u")]),
+        ("CREATE VIEW c.s.v AS SELECT * FROM c.s.t", [("c", "s", "v")]),
+        ("COMMENT ON TABLE t IS 'x'", [(None, None, "t")]),
+        ("CREATE SCHEMA c.s", [("c", "s", None)]),
+        ("DROP SCHEMA s", [(None, "s", None)]),
+    ],
+)
+def test_changed_objects_ddl(query, expected):
+    assert changed_objects(query) == expected
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["SELECT * FROM t", "INSERT INTO t VALUES (1)", "DELETE FROM t", "SHOW TABLES", "SET SESSION a = 1"],
+)
+def test_changed_objects_non_ddl(query):
+    assert changed_objects(query) == []
+
+
+@pytest.mark.parametrize(
+    "query", ["CREATE CATALOG lake USING iceberg", "ALTER SCHEMA c.s RENAME TO s2"]
+)
+def test_changed_objects_unknown_ddl(query):
+    assert changed_objects(query) is None
+
+
+# ---------------------------------------------------------------------------
+# Parse cache
+# ---------------------------------------------------------------------------
+
+
+def test_query_is_parsed_once_across_stages():
+    """Test the read-only check, cache key and DDL check share one parse."""
+    query = "SELECT a FROM t WHERE b > 1"
+
+    with patch("trino_mcp.utils.sqlglot.parse_one", wraps=sqlglot.parse_one) as parse_one:
+        assert is_read_only_query(query) is True
+        normalize_query(query)
+        changed_objects(query)
+        assert is_read_only_query(query) is True
+
+    assert parse_one.call_count == 1
+    assert parse_query(query) is parse_query(query)
+
+
+def test_query_facts_parse_uncacheable_query_once():
+    """Test that a query too large for the parse cache is still parsed once."""
+    query = "SELECT a FROM t WHERE b > 1"
+
+    with patch.object(utils, "_parse_cache", utils._LRUCache(256, 10)), patch(
+        "trino_mcp.utils.sqlglot.parse_one", wraps=sqlglot.parse_one
+    ) as parse_one:
+        facts = dict(utils.derive_query_facts(query, (10, 100)))
+
+    assert [call.args[0] for call in parse_one.call_args_list].count(query) == 1
+    assert facts[("limit", 10, utils._digest(query))] is not None
+
+
+def test_parse_failure_is_cached_and_reraised():
+    query = "THIS IS NOT VALID SQL @@@ !!!"
+
+    with patch("trino_mcp.utils.sqlglot.parse_one", wraps=sqlglot.parse_one) as parse_one:
+        for _ in range(2):
+            with pytest.raises(sqlglot.errors.ParseError):
+                parse_query(query)
+
+    assert parse_one.call_count == 1
+
+
+def test_normalize_query_leaves_cached_ast_unchanged():
+    query = "SELECT MyCol FROM MyTable"
+
+    assert normalize_query(query) == "SELECT mycol FROM mytable"
+    assert parse_query(query).sql(dialect="trino") == query
+
+
+def test_query_facts_fill_cache_without_parsing():
+    query = "CREATE TABLE hive.web.t AS SELECT a FROM src"
+    facts = utils.derive_query_facts(query, (5,))
+    clear_parse_cache()
+
+    utils.remember_query_facts(facts)
+    with patch("trino_mcp.utils._parse", side_effect=AssertionError("parsed")):
+        assert is_read_only_query(query) is False
+        assert changed_objects(query) == [("hive", "web", "t")]
+        assert utils.limit_query(query, 5) is None
+
+
+def test_parse_cache_bounded_by_entries_and_size():
+    cache = utils._LRUCache(max_entries=2, max_weight=10)
+
+    cache.put("a", 1, 4)
+    cache.put("b", 2, 4)
+    cache.get("a")
+    cache.put("c", 3, 4)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+
+    cache.put("d", 4, 8)
+    assert len(cache) == 1
+    assert cache.get("d") == (True, 4)
+
+    cache.put("huge", 5, 11)
+    assert cache.get("huge") == (False, None)
+
+
+# ---------------------------------------------------------------------------
+# limit_query
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT a FROM t",
+        "SELECT a FROM t LIMIT ALL",
+        "SELECT a FROM t LIMIT 5000",
+        "SELECT a FROM t FETCH FIRST 5000 ROWS ONLY",
+        "SELECT 1 UNION ALL SELECT 2",
+        "WITH x AS (SELECT a FROM t) SELECT * FROM x",
+        "SELECT x AT TIME ZONE 'UTC' FROM t FOR TIMESTAMP AS OF TIMESTAMP '2024-01-01 00:00:00'",
+        "SELECT a FROM t -- trailing comment",
+    ],
+)
+def test_limit_query_wraps_original_text(query):
+    assert utils.limit_query(query, 100) == f"SELECT * FROM (\n{query}\n) LIMIT 100"
+
+
+def test_limit_query_drops_trailing_semicolon():
+    assert utils.limit_query("SELECT a FROM t;", 100) == "SELECT * FROM (\nSELECT a FROM t\n) LIMIT 100"
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT a FROM t LIMIT 10",
+        "SELECT a FROM t FETCH FIRST 10 ROWS ONLY",
+        "SELECT a FROM t ORDER BY a FETCH FIRST 5000 ROWS WITH TIES",
+        "SELECT a FROM t ORDER BY a",
+        "SELECT a FROM t ORDER BY a OFFSET 10 LIMIT 5000",
+        "SHOW TABLES",
+        "INSERT INTO t SELECT a FROM s",
+        "THIS IS NOT VALID SQL @@@ !!!",
+    ],
+)
+def test_limit_query_leaves_query_alone(query):
+    assert utils.limit_query(query, 100) is None